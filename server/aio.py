@@ -0,0 +1,106 @@
+# server/aio.py
+import asyncio
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from engines import sqlite_file, sqlite_pragmas, tune_sqlite
+from queries import list_statement, trim_page, period_exists_statement, summary_statements, build_summary, \
+    user_data_statements
+from serializers import dump_user_data
+from versions import versions_statement, versions_from_rows
+
+ASYNC_DB_EXTENSION = 'async_db'
+
+# Async driver for each synchronous backend
+ASYNC_DRIVERS = {
+    'sqlite': 'aiosqlite',
+    'postgresql': 'asyncpg',
+}
+
+def async_url(url):
+    """The same database as url, through the backend's async driver."""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise RuntimeError(f'No async driver for {backend} databases')
+    return url.set(drivername=f'{backend}+{ASYNC_DRIVERS[backend]}')
+
+class AsyncDatabase:
+    """Async engine for the read-only requests served by asgi.py.
+
+    Uses SQLALCHEMY_ASYNC_DATABASE_URI, or else the read database (or the
+    primary one) through its async driver. Every statement runs in its own
+    short session, so statements passed to gather run on separate
+    connections at the same time; a read spread over several statements is
+    not one snapshot, but the ETag is read first, so a concurrent write can
+    only make a response newer than its tag, never older.
+    """
+    def __init__(self, app=None):
+        self.engine = None
+        self.sessions = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        uri = app.config.get('SQLALCHEMY_ASYNC_DATABASE_URI') or async_url(
+            app.config.get('SQLALCHEMY_READ_DATABASE_URI') or app.config['SQLALCHEMY_DATABASE_URI']
+        )
+        options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+        local = sqlite_file(uri)
+        if local:
+            # Each check of a local file connection is one more round trip to its thread
+            options['pool_pre_ping'] = False
+        self.engine = create_async_engine(uri, **options)
+        if local and app.config.get('SQLITE_TUNING'):
+            # Sessions here run one statement each, which is already its own snapshot
+            tune_sqlite(self.engine.sync_engine, dict(sqlite_pragmas(app.config), query_only='ON'), begin=None)
+        self.sessions = async_sessionmaker(self.engine, expire_on_commit=False)
+        app.extensions[ASYNC_DB_EXTENSION] = self
+
+    async def execute(self, statement):
+        """Run one statement and return its fully fetched result."""
+        async with self.sessions() as session:
+            return await session.execute(statement)
+
+    async def gather(self, *statements):
+        """Run statements concurrently and return their results in order."""
+        return await asyncio.gather(*(self.execute(statement) for statement in statements))
+
+    async def dispose(self):
+        await self.engine.dispose()
+
+async_db = AsyncDatabase()
+
+async def current_versions_async(user_id):
+    return versions_from_rows(user_id, (await async_db.execute(versions_statement(user_id))).all())
+
+async def list_rows_async(model, user_id, args, time_period_id=None):
+    """list_rows on the async engine."""
+    result = await async_db.execute(list_statement(model, user_id, args, time_period_id))
+    return trim_page(result.all(), model, args['limit'])
+
+async def period_exists_async(time_period_id):
+    result = await async_db.execute(period_exists_statement(time_period_id))
+    return result.first() is not None
+
+async def summarize_async(user_id, filters):
+    """summarize on the async engine, with its statements run concurrently.
+
+    report_currency may load exchange rates through the synchronous session,
+    so building that summary is moved off the event loop.
+    """
+    statements = summary_statements(user_id, filters)
+    results = await async_db.gather(*statements.values())
+    results = {name: result.all() for name, result in zip(statements, results)}
+    if filters.get('report_currency'):
+        return await asyncio.to_thread(build_summary, results, filters)
+    return build_summary(results, filters)
+
+async def user_data_async(user_id):
+    """user_data on the async engine, with the user, their rows and the time periods read concurrently."""
+    user, expenses, paychecks, periods = await async_db.gather(*user_data_statements(user_id))
+    user = user.first()
+    if user is None:
+        return None
+    return dump_user_data(user, expenses.all(), paychecks.all(), periods.all())
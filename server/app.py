@@ -1,27 +1,84 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, abort, jsonify, request, current_app, stream_with_context
 from flask_restful import Api, Resource
 from flask_cors import CORS
-from flask_jwt_extended import JWTManager, create_access_token, create_refresh_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity, \
+    get_jwt, decode_token
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt.exceptions import PyJWTError
 from flask_migrate import Migrate
+from datetime import date, timedelta
+from sqlalchemy import inspect
 from sqlalchemy.exc import IntegrityError
 from marshmallow import ValidationError
+from werkzeug.middleware.proxy_fix import ProxyFix
 
-from config import Config
+from config import Config, config_for
 from models import db, User, TimePeriod, Expense, Paycheck
-from schemas import user_schema, users_schema, time_period_schema, time_periods_schema, \
-                    expense_schema, expenses_schema, paycheck_schema, paychecks_schema, \
-                    user_data_schema
+from schemas import user_schema, time_period_schema, \
+                    expense_schema, paycheck_schema, parse_includes, \
+                    list_query_schema, summary_query_schema, \
+                    bulk_expenses_schema, bulk_expense_updates_schema, \
+                    bulk_paychecks_schema, bulk_paycheck_updates_schema, import_query_schema, \
+                    export_query_schema, sync_query_schema, forecast_query_schema
+from queries import list_rows, summarize, changes_since, user_data, time_periods, period_exists
+from serializers import output_json, expense_rows, paycheck_rows
+from rollups import rebuild_rollups_command, check_rollups_command
+from rates import RateNotFound, load_exchange_rates_command
+from bulk import BulkError, parse_bulk_request, bulk_create, bulk_update, bulk_delete
+from importer import parse_upload, run_import
+from exporter import export_stream
+from forecast import project, simulate, MAX_SIMULATION_CELLS
+from versions import conditional_get
+from engines import init_database, read_only
+from cache import response_cache, shared_time_periods, current_user_data
+from compression import response_compression
+from metrics import request_metrics
+from passwords import password_hasher, HasherBusy
+from throttle import login_throttle
+from tokens import CachingJWTManager, token_denylist
+
+class JWTApi(Api):
+    """Api that leaves token errors to Flask-JWT-Extended.
+    
+    Flask-RESTful would turn a revoked or expired token into a bare 500; raising
+    here hands the exception back to Flask, where JWTManager answers with 401/422.
+    """
+    def handle_error(self, e):
+        if isinstance(e, (JWTExtendedException, PyJWTError)):
+            raise e
+        return super().handle_error(e)
 
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
+    # request.remote_addr is the client, not the proxy, for the login throttle
+    proxies = app.config.get('PROXY_COUNT', 0)
+    if proxies:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxies, x_proto=proxies)
     
-    db.init_app(app)
+    init_database(app, db)
     Migrate(app, db)
     CORS(app)
-    JWTManager(app)
+    jwt = CachingJWTManager(app)
+    token_denylist.init_app(app)
+    # Revocation check on the already decoded claims, no database query
+    jwt.token_in_blocklist_loader(token_denylist.blocklist_loader)
+    response_cache.init_app(app)
+    # Before compression, so the size measured is the size sent
+    request_metrics.init_app(app)
+    response_compression.init_app(app)
+    password_hasher.init_app(app)
+    login_throttle.init_app(app)
+    
+    # flask rebuild-rollups / flask check-rollups
+    app.cli.add_command(rebuild_rollups_command)
+    app.cli.add_command(check_rollups_command)
+    # flask load-exchange-rates rates.csv
+    app.cli.add_command(load_exchange_rates_command)
     
-    api = Api(app)
+    api = JWTApi(app)
+    # Row serializer output, compact through orjson with JSON_COMPACT
+    api.representation('application/json')(output_json)
     
     # Home route to document available endpoints
     @app.route('/')
@@ -32,24 +89,58 @@ def create_app(config_class=Config):
                 "POST /api/auth/register": "Register a new user",
                 "POST /api/auth/login": "Login and get access token",
                 "POST /api/auth/refresh": "Refresh access token",
+                # {"refresh_token": "..."} revokes it too, {"all": true} revokes every token you were issued
+                "POST /api/auth/logout": "Revoke the access (or refresh) token sent with the request",
                 
                 # Time Period endpoints 
-                "GET /api/time_periods": "Get all time periods (shared resource)",
+                "GET /api/time_periods": "Get all time periods (shared resource), ?include=expenses,paychecks nests your own rows",
                 "POST /api/time_periods": "Create a new time period",
                 # TimePeriodDetailResource provides a complete RESTful API
                 # Frontend components should use context state rather than calling this endpoint directly
-                "GET /api/time_periods/:id": "Get a specific time period",
+                "GET /api/time_periods/:id": "Get a specific time period, ?include=expenses,paychecks nests your own rows",
                 
                 # Expense endpoints through time periods - full CRUD
+                "GET /api/time_periods/:id/expenses": "List your expenses in a time period (paginated, filterable)",
                 "POST /api/time_periods/:id/expenses": "Add an expense to a time period",
                 "PUT /api/time_periods/:id/expenses/:expense_id": "Update specific expense in a time period",
                 "DELETE /api/time_periods/:id/expenses/:expense_id": "Delete specific expense in a time period",
                 
                 # Paycheck endpoints through time periods - full CRUD
+                "GET /api/time_periods/:id/paychecks": "List your paychecks in a time period (paginated, filterable)",
                 "POST /api/time_periods/:id/paychecks": "Add a paycheck to a time period",
                 "PUT /api/time_periods/:id/paychecks/:paycheck_id": "Update specific paycheck in a time period",
                 "DELETE /api/time_periods/:id/paychecks/:paycheck_id": "Delete specific paycheck in a time period",
                 
+                # Bulk endpoints: {"items": [...], "mode": "atomic" | "best_effort"} ({"ids": [...]} for DELETE)
+                "POST /api/time_periods/:id/expenses/bulk": "Add many expenses to a time period",
+                "PUT /api/time_periods/:id/expenses/bulk": "Update many expenses in a time period",
+                "DELETE /api/time_periods/:id/expenses/bulk": "Delete many expenses in a time period",
+                "POST /api/time_periods/:id/paychecks/bulk": "Add many paychecks to a time period",
+                "PUT /api/time_periods/:id/paychecks/bulk": "Update many paychecks in a time period",
+                "DELETE /api/time_periods/:id/paychecks/bulk": "Delete many paychecks in a time period",
+                
+                # File imports: multipart "file" or raw body, ?format=csv|qif|ofx&on_error=stop|skip&start_line=
+                "POST /api/time_periods/:id/expenses/import": "Import expenses from a CSV, QIF or OFX file",
+                "POST /api/time_periods/:id/paychecks/import": "Import paychecks from a CSV, QIF or OFX file",
+                
+                # Cross-period lists with ?cursor=&limit= and filters
+                # (category, date_from, date_to, min_amount, max_amount, is_recurring);
+                # ?layout=columns sends one array per field instead of one object per row
+                "GET /api/expenses": "List your expenses across all time periods (paginated, filterable)",
+                "GET /api/paychecks": "List your paychecks across all time periods (paginated, filterable)",
+                
+                # Totals per time period and category, ?date_from=&date_to=&currency=
+                "GET /api/summary": "Get your income, expense and balance totals",
+                
+                # Full history, ?format=csv|ndjson&date_from=&date_to=, gzip with Accept-Encoding
+                "GET /api/export": "Stream all your expenses and paychecks",
+                
+                # Changes since ?since=<cursor>, pass the returned cursor next time
+                "GET /api/sync": "Get expenses and paychecks created, updated or deleted since a cursor",
+                
+                # Projection, ?from=&to=&granularity=day|week|month&starting_balance=
+                "GET /api/forecast": "Project your recurring expenses and paychecks forward",
+                
                 # All user data in a single request
                 "GET /api/user_data": "Get all user data in a single request (efficient loading)"
             }
@@ -64,6 +155,9 @@ def create_app(config_class=Config):
     def internal_error(error):
         db.session.rollback()
         return jsonify({"error": "Internal server error"}), 500
+    
+    # Every password hashing slot is taken; shed the request rather than queue it
+    HASHER_BUSY = {"error": "Server busy, try again shortly"}, 503, {"Retry-After": "1"}
 
     class RegisterResource(Resource):
         def post(self):
@@ -89,6 +183,9 @@ def create_app(config_class=Config):
                     "access_token": access_token,
                     "refresh_token": refresh_token
                 }, 201
+            except HasherBusy:
+                db.session.rollback()
+                return HASHER_BUSY
             except IntegrityError:
                 db.session.rollback()
                 return {"error": "Username already exists"}, 409
@@ -104,9 +201,30 @@ def create_app(config_class=Config):
             if not data or not data.get('username') or not data.get('password'):
                 return {"error": "Username and password are required"}, 400
             
-            user = User.query.filter_by(username=data['username']).first()
+            username, address = data['username'], request.remote_addr
+            
+            # Refuse brute-force bursts before loading the user or hashing anything
+            retry_after = login_throttle.retry_after(username, address)
+            if retry_after:
+                return {"error": "Too many failed login attempts, try again later"}, 429, \
+                    {"Retry-After": str(retry_after)}
+            
+            user = User.query.filter_by(username=username).first()
+            # Hashing may wait for a free worker; don't hold a pooled connection meanwhile
+            db.session.close()
+            
+            try:
+                verified = user is not None and user.verify_password(data['password'])
+            except HasherBusy:
+                return HASHER_BUSY
             
-            if user and user.verify_password(data['password']):
+            if verified:
+                login_throttle.succeeded(username, address)
+                # verify_password upgrades hashes made with an old method or cost
+                if inspect(user).modified:
+                    db.session.add(user)
+                    db.session.commit()
+                
                 # Create tokens
                 access_token = create_access_token(identity=str(user.id))
                 refresh_token = create_refresh_token(identity=str(user.id))
@@ -118,6 +236,7 @@ def create_app(config_class=Config):
                     "refresh_token": refresh_token
                 }, 200
             
+            login_throttle.failed(username, address)
             return {"error": "Invalid username or password"}, 401
     
     class TokenRefreshResource(Resource):
@@ -130,13 +249,45 @@ def create_app(config_class=Config):
                 "access_token": access_token
             }, 200
     
+    class LogoutResource(Resource):
+        @jwt_required(verify_type=False)
+        def post(self):
+            data = request.get_json(silent=True) or {}
+            
+            if data.get('all'):
+                token_denylist.revoke_user(get_jwt_identity())
+                return {"message": "Logged out everywhere"}, 200
+            
+            revoked = [get_jwt()]
+            if data.get('refresh_token'):
+                try:
+                    refresh_claims = decode_token(data['refresh_token'])
+                except (JWTExtendedException, PyJWTError):
+                    refresh_claims = None
+                if refresh_claims is None or refresh_claims['sub'] != get_jwt_identity():
+                    return {"error": "Invalid refresh token"}, 400
+                revoked.append(refresh_claims)
+            
+            for claims in revoked:
+                token_denylist.revoke(claims)
+            return {"message": "Logged out"}, 200
+    
     # Time Period Resources - Only create, no update/delete
     class TimePeriodListResource(Resource):
+        @read_only
         @jwt_required()
+        @conditional_get
+        @response_cache.cached(shared_time_periods)
         def get(self):
-            # Get all time periods (shared resource)
-            time_periods = TimePeriod.query.all()
-            return time_periods_schema.dump(time_periods), 200
+            current_user_id = get_jwt_identity()
+            
+            try:
+                includes = parse_includes(request.args.get('include'))
+            except ValidationError as err:
+                return {"error": err.messages}, 400
+            
+            # Get all time periods (shared resource), nesting only the caller's rows
+            return time_periods(current_user_id, includes), 200
         
         @jwt_required()
         def post(self):
@@ -151,10 +302,22 @@ def create_app(config_class=Config):
                 return {"error": err.messages}, 400
     
     class TimePeriodDetailResource(Resource):
+        @read_only
         @jwt_required()
+        @conditional_get
+        @response_cache.cached(shared_time_periods)
         def get(self, time_period_id):
-            time_period = TimePeriod.query.get_or_404(time_period_id)
-            return time_period_schema.dump(time_period), 200
+            current_user_id = get_jwt_identity()
+            
+            try:
+                includes = parse_includes(request.args.get('include'))
+            except ValidationError as err:
+                return {"error": err.messages}, 400
+            
+            periods = time_periods(current_user_id, includes, time_period_id)
+            if periods is None:
+                abort(404)
+            return periods[0], 200
         
         @jwt_required()
         def put(self, time_period_id):
@@ -166,6 +329,24 @@ def create_app(config_class=Config):
     
     # Time Period Expenses Resources - Full CRUD
     class TimePeriodExpenseCollectionResource(Resource):
+        @read_only
+        @jwt_required()
+        @conditional_get
+        def get(self, time_period_id):
+            current_user_id = get_jwt_identity()
+            
+            # Verify time period exists
+            if not period_exists(time_period_id):
+                abort(404)
+            
+            try:
+                args = list_query_schema.load(request.args)
+                expenses, next_cursor = list_rows(Expense, current_user_id, args, time_period_id)
+            except ValidationError as err:
+                return {"error": err.messages}, 400
+            
+            return expense_rows.dump_page(expenses, next_cursor, args['layout']), 200
+        
         @jwt_required()
         def post(self, time_period_id):
             current_user_id = get_jwt_identity()
@@ -223,6 +404,24 @@ def create_app(config_class=Config):
     
     # Time Period Paychecks Resources - Full CRUD
     class TimePeriodPaycheckCollectionResource(Resource):
+        @read_only
+        @jwt_required()
+        @conditional_get
+        def get(self, time_period_id):
+            current_user_id = get_jwt_identity()
+            
+            # Verify time period exists
+            if not period_exists(time_period_id):
+                abort(404)
+            
+            try:
+                args = list_query_schema.load(request.args)
+                paychecks, next_cursor = list_rows(Paycheck, current_user_id, args, time_period_id)
+            except ValidationError as err:
+                return {"error": err.messages}, 400
+            
+            return paycheck_rows.dump_page(paychecks, next_cursor, args['layout']), 200
+        
         @jwt_required()
         def post(self, time_period_id):
             current_user_id = get_jwt_identity()
@@ -278,34 +477,265 @@ def create_app(config_class=Config):
             db.session.commit()
             return '', 204
 
+    # Bulk Resources - Many expenses or paychecks in one request and one transaction
+    def bulk_response(ids, errors, status):
+        if not ids:
+            return {"ids": [], "errors": errors}, 400
+        return {"ids": ids, "errors": errors}, status
+    
+    class BulkResource(Resource):
+        model = None
+        create_schema = None
+        update_schema = None
+        
+        @jwt_required()
+        def post(self, time_period_id):
+            current_user_id = get_jwt_identity()
+            TimePeriod.query.get_or_404(time_period_id)
+            
+            try:
+                items, mode = parse_bulk_request(request.get_json(), 'items', current_app.config['BULK_MAX_ITEMS'])
+            except BulkError as err:
+                return {"error": err.messages}, err.status
+            
+            ids, errors = bulk_create(self.model, self.create_schema, items,
+                                      current_user_id, time_period_id, mode)
+            return bulk_response(ids, errors, 201)
+        
+        @jwt_required()
+        def put(self, time_period_id):
+            current_user_id = get_jwt_identity()
+            TimePeriod.query.get_or_404(time_period_id)
+            
+            try:
+                items, mode = parse_bulk_request(request.get_json(), 'items', current_app.config['BULK_MAX_ITEMS'])
+            except BulkError as err:
+                return {"error": err.messages}, err.status
+            
+            ids, errors = bulk_update(self.model, self.update_schema, items,
+                                      current_user_id, time_period_id, mode)
+            return bulk_response(ids, errors, 200)
+        
+        @jwt_required()
+        def delete(self, time_period_id):
+            current_user_id = get_jwt_identity()
+            TimePeriod.query.get_or_404(time_period_id)
+            
+            try:
+                ids, mode = parse_bulk_request(request.get_json(), 'ids', current_app.config['BULK_MAX_ITEMS'])
+            except BulkError as err:
+                return {"error": err.messages}, err.status
+            
+            deleted, errors = bulk_delete(self.model, ids, current_user_id, time_period_id, mode)
+            return bulk_response(deleted, errors, 200)
+    
+    class TimePeriodExpenseBulkResource(BulkResource):
+        model = Expense
+        create_schema = bulk_expenses_schema
+        update_schema = bulk_expense_updates_schema
+    
+    class TimePeriodPaycheckBulkResource(BulkResource):
+        model = Paycheck
+        create_schema = bulk_paychecks_schema
+        update_schema = bulk_paycheck_updates_schema
+
+    # Import Resources - Stream a CSV, QIF or OFX file into expenses or paychecks
+    class ImportResource(Resource):
+        model = None
+        schema = None
+        
+        @jwt_required()
+        def post(self, time_period_id):
+            current_user_id = get_jwt_identity()
+            TimePeriod.query.get_or_404(time_period_id)
+            
+            try:
+                args = import_query_schema.load(request.args)
+            except ValidationError as err:
+                return {"error": err.messages}, 400
+            
+            # Accept a multipart upload or the raw request body
+            upload = request.files.get('file')
+            stream = upload.stream if upload else request.stream
+            import_format = args.get('format')
+            if not import_format and upload and upload.filename:
+                extension = upload.filename.rsplit('.', 1)[-1].lower()
+                import_format = extension if extension in ('qif', 'ofx') else 'csv'
+            
+            records, signed = parse_upload(stream, import_format or 'csv')
+            report = run_import(
+                self.model, self.schema, records, current_user_id, time_period_id,
+                signed=signed,
+                batch_size=current_app.config['IMPORT_BATCH_SIZE'],
+                start_line=args['start_line'],
+                on_error=args['on_error']
+            )
+            
+            status = 400 if report['errors'] and not report['imported'] else 200
+            return report, status
+    
+    class TimePeriodExpenseImportResource(ImportResource):
+        model = Expense
+        schema = bulk_expenses_schema
+    
+    class TimePeriodPaycheckImportResource(ImportResource):
+        model = Paycheck
+        schema = bulk_paychecks_schema
+
+    # Cross-period lists - Read only, keyset paginated
+    class ExpenseListResource(Resource):
+        @read_only
+        @jwt_required()
+        @conditional_get
+        def get(self):
+            current_user_id = get_jwt_identity()
+            
+            try:
+                args = list_query_schema.load(request.args)
+                expenses, next_cursor = list_rows(Expense, current_user_id, args)
+            except ValidationError as err:
+                return {"error": err.messages}, 400
+            
+            return expense_rows.dump_page(expenses, next_cursor, args['layout']), 200
+    
+    class PaycheckListResource(Resource):
+        @read_only
+        @jwt_required()
+        @conditional_get
+        def get(self):
+            current_user_id = get_jwt_identity()
+            
+            try:
+                args = list_query_schema.load(request.args)
+                paychecks, next_cursor = list_rows(Paycheck, current_user_id, args)
+            except ValidationError as err:
+                return {"error": err.messages}, 400
+            
+            return paycheck_rows.dump_page(paychecks, next_cursor, args['layout']), 200
+
+    # Summary Resource - Totals aggregated in the database
+    class SummaryResource(Resource):
+        @read_only
+        @jwt_required()
+        @conditional_get
+        @response_cache.cached(current_user_data)
+        def get(self):
+            current_user_id = get_jwt_identity()
+            
+            try:
+                filters = summary_query_schema.load(request.args)
+                return summarize(current_user_id, filters), 200
+            except ValidationError as err:
+                return {"error": err.messages}, 400
+            except RateNotFound as err:
+                return {"error": {"report_currency": [str(err)]}}, 400
+
+    # Export Resource - Stream the user's full history as CSV or NDJSON
+    class ExportResource(Resource):
+        @read_only
+        @jwt_required()
+        @conditional_get
+        def get(self):
+            current_user_id = get_jwt_identity()
+            
+            try:
+                args = export_query_schema.load(request.args)
+            except ValidationError as err:
+                return {"error": err.messages}, 400
+            
+            export_format = args.pop('format')
+            compress = request.accept_encodings.best_match(['gzip']) == 'gzip'
+            stream = export_stream(current_user_id, args, export_format, compress,
+                                   current_app.config['EXPORT_BATCH_SIZE'])
+            
+            mimetype = 'text/csv' if export_format == 'csv' else 'application/x-ndjson'
+            response = Response(stream_with_context(stream), mimetype=mimetype)
+            response.headers['Content-Disposition'] = f'attachment; filename=paycheck-buddy-export.{export_format}'
+            # The body depends on Accept-Encoding whether or not this one is compressed
+            response.vary.add('Accept-Encoding')
+            if compress:
+                response.headers['Content-Encoding'] = 'gzip'
+            return response
+
+    # Sync Resource - Only what changed since the client's cursor
+    class SyncResource(Resource):
+        @read_only
+        @jwt_required()
+        @conditional_get
+        def get(self):
+            current_user_id = get_jwt_identity()
+            
+            try:
+                args = sync_query_schema.load(request.args)
+            except ValidationError as err:
+                return {"error": err.messages}, 400
+            
+            changes = changes_since(current_user_id, args.get('since'))
+            return {
+                "cursor": changes['cursor'],
+                "reset": changes['reset'],
+                "expenses": expense_rows.dump(changes['expenses']),
+                "paychecks": paycheck_rows.dump(changes['paychecks']),
+                "deleted": changes['deleted']
+            }, 200
+
+    # Forecast Resource - Recurring expenses and paychecks projected forward
+    class ForecastResource(Resource):
+        # No conditional_get: the default window moves with today's date
+        @read_only
+        @jwt_required()
+        def get(self):
+            current_user_id = get_jwt_identity()
+            
+            try:
+                args = forecast_query_schema.load(request.args)
+            except ValidationError as err:
+                return {"error": err.messages}, 400
+            
+            start = args.get('start') or date.today()
+            end = args.get('end') or start + timedelta(days=365)
+            if end < start:
+                return {"error": {"to": ["to must not be before from"]}}, 400
+            
+            if args['mode'] == 'monte_carlo' and \
+                    args['scenarios'] * ((end - start).days + 1) > MAX_SIMULATION_CELLS:
+                return {"error": {"scenarios": [
+                    f"scenarios x days must not exceed {MAX_SIMULATION_CELLS}"
+                ]}}, 400
+            
+            try:
+                if args['mode'] == 'monte_carlo':
+                    return simulate(current_user_id, start, end, args['granularity'],
+                                    args['starting_balance'], args['scenarios'],
+                                    args['paycheck_jitter_days'], args['spend_variation'],
+                                    args['shortfall_threshold'], args.get('seed'),
+                                    args.get('report_currency')), 200
+                return project(current_user_id, start, end, args['granularity'],
+                               args['starting_balance'], args.get('report_currency')), 200
+            except RateNotFound as err:
+                return {"error": {"report_currency": [str(err)]}}, 400
+
     # User Data Resource - Single efficient data loading
     class UserDataResource(Resource):
+        @read_only
         @jwt_required()
+        @conditional_get
         def get(self):
             current_user_id = get_jwt_identity()
-            user = User.query.get_or_404(current_user_id)
             
-            all_time_periods = TimePeriod.query.all()
-            
-            # Get user's expenses and paychecks
-            user_expenses = Expense.query.filter_by(user_id=current_user_id).all()
-            user_paychecks = Paycheck.query.filter_by(user_id=current_user_id).all()
+            # User, expenses, paychecks and time periods in four column queries
+            data = user_data(current_user_id)
+            if data is None:
+                abort(404)
             
             # Efficiently bundle all user financial information into one neat package
-            response = {
-                "id": user.id,
-                "username": user.username,
-                "time_periods": time_periods_schema.dump(all_time_periods),
-                "expenses": expenses_schema.dump(user_expenses),
-                "paychecks": paychecks_schema.dump(user_paychecks)
-            }
-            
-            return response, 200
+            return data, 200
     
     # Register resources with the API
     api.add_resource(RegisterResource, '/api/auth/register')
     api.add_resource(LoginResource, '/api/auth/login')
     api.add_resource(TokenRefreshResource, '/api/auth/refresh')
+    api.add_resource(LogoutResource, '/api/auth/logout')
     
     # Time Periods - Only create, no update/delete
     api.add_resource(TimePeriodListResource, '/api/time_periods')
@@ -323,12 +753,41 @@ def create_app(config_class=Config):
     api.add_resource(TimePeriodPaycheckDetailResource, 
                     '/api/time_periods/<int:time_period_id>/paychecks/<int:paycheck_id>')
     
+    # Bulk resources - create, update and delete many rows at once
+    api.add_resource(TimePeriodExpenseBulkResource,
+                     '/api/time_periods/<int:time_period_id>/expenses/bulk')
+    api.add_resource(TimePeriodPaycheckBulkResource,
+                     '/api/time_periods/<int:time_period_id>/paychecks/bulk')
+    
+    # File imports
+    api.add_resource(TimePeriodExpenseImportResource,
+                     '/api/time_periods/<int:time_period_id>/expenses/import')
+    api.add_resource(TimePeriodPaycheckImportResource,
+                     '/api/time_periods/<int:time_period_id>/paychecks/import')
+    
+    # Cross-period lists - Read only
+    api.add_resource(ExpenseListResource, '/api/expenses')
+    api.add_resource(PaycheckListResource, '/api/paychecks')
+    
+    # Aggregated totals
+    api.add_resource(SummaryResource, '/api/summary')
+    
+    # Streaming export
+    api.add_resource(ExportResource, '/api/export')
+    
+    # Delta sync
+    api.add_resource(SyncResource, '/api/sync')
+    
+    # Forecast
+    api.add_resource(ForecastResource, '/api/forecast')
+    
     # Single API endpoint for efficient data loading
     api.add_resource(UserDataResource, '/api/user_data')
     
     return app
 
-app = create_app()
+app = create_app(config_for())
 
+# Development server only; see wsgi.py and gunicorn.conf.py for production
 if __name__ == '__main__':
-    app.run(debug=True, port=5555)
\ No newline at end of file
+    app.run(debug=app.config['DEBUG'], port=5555)
\ No newline at end of file
@@ -0,0 +1,185 @@
+# server/asgi.py
+# Async entry point, with APP_ENV=production:
+#
+#   GUNICORN_WORKER_CLASS=uvicorn_worker.UvicornWorker gunicorn -c gunicorn.conf.py asgi:app
+#
+# The read-only routes in VIEWS are served on the async engine (aio.py), so a
+# worker keeps taking requests while their queries are in flight. Everything
+# else, and any request the async views do not answer themselves, goes to the
+# Flask app on a thread pool and behaves exactly as under wsgi.py.
+import asyncio
+import io
+
+from a2wsgi import WSGIMiddleware
+from a2wsgi.wsgi import build_environ
+from flask import request
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt.exceptions import PyJWTError
+from marshmallow import ValidationError
+
+from wsgi import app as flask_app
+from aio import async_db, current_versions_async, list_rows_async, period_exists_async, \
+    summarize_async, user_data_async
+from cache import response_cache, current_user_data
+from models import Expense, Paycheck
+from rates import RateNotFound
+from schemas import list_query_schema, summary_query_schema
+from serializers import output_json, expense_rows, paycheck_rows
+from tokens import token_denylist
+from versions import etag_for, etag_matches, not_modified, tag_result, remember_versions
+
+class Fallback(Exception):
+    """Raised by an async view to hand its request to the Flask app instead.
+
+    Used for every error response (bad arguments, missing rows, unknown
+    rates), so those come from the resources themselves.
+    """
+
+async def off_loop(blocking, fn, *args):
+    """fn(*args), on a worker thread when it waits on the network (a Redis backend).
+    
+    The thread gets a copy of the request's context, so fn sees the same
+    request, g and app as the view.
+    """
+    if blocking:
+        return await asyncio.to_thread(fn, *args)
+    return fn(*args)
+
+def list_view(model, serializer):
+    async def view(user_id, time_period_id=None):
+        try:
+            args = list_query_schema.load(request.args)
+            if time_period_id is None:
+                rows, next_cursor = await list_rows_async(model, user_id, args)
+            else:
+                exists, (rows, next_cursor) = await asyncio.gather(
+                    period_exists_async(time_period_id),
+                    list_rows_async(model, user_id, args, time_period_id)
+                )
+                if not exists:
+                    raise Fallback
+        except ValidationError:
+            raise Fallback
+        return serializer.dump_page(rows, next_cursor, args['layout']), 200
+    return view
+
+async def summary_view(user_id):
+    try:
+        filters = summary_query_schema.load(request.args)
+    except ValidationError:
+        raise Fallback
+
+    # The same entries as SummaryResource's @response_cache.cached
+    namespaces = current_user_data()
+    blocking = response_cache.backend.blocking
+    data = await off_loop(blocking, response_cache.get, namespaces, request.full_path)
+    if data is None:
+        try:
+            data = await summarize_async(user_id, filters)
+        except RateNotFound:
+            raise Fallback
+        await off_loop(blocking, response_cache.set, namespaces, request.full_path, data)
+    return data, 200
+
+async def user_data_view(user_id):
+    data = await user_data_async(user_id)
+    if data is None:
+        raise Fallback
+    return data, 200
+
+# Flask endpoint of each resource served here, and its async view
+VIEWS = {
+    'expenselistresource': list_view(Expense, expense_rows),
+    'paychecklistresource': list_view(Paycheck, paycheck_rows),
+    'timeperiodexpensecollectionresource': list_view(Expense, expense_rows),
+    'timeperiodpaycheckcollectionresource': list_view(Paycheck, paycheck_rows),
+    'summaryresource': summary_view,
+    'userdataresource': user_data_view,
+}
+
+async def conditional_view(view, view_args):
+    """Run an async view the way @conditional_get runs a resource."""
+    user_id = get_jwt_identity()
+    versions = await current_versions_async(user_id)
+    remember_versions(user_id, versions)
+    etag = etag_for(request.full_path, user_id, versions)
+    if etag_matches(etag):
+        return not_modified(etag)
+    data, status, headers = tag_result(await view(user_id, **view_args), etag)
+    # Api.make_response sets the media type over output_json's default
+    response = output_json(data, status, headers)
+    response.headers['Content-Type'] = 'application/json'
+    return response
+
+class AsyncReads:
+    """ASGI app serving VIEWS asynchronously in front of the Flask app.
+
+    Each request runs inside a Flask request context, so authentication, the
+    response cache, the JSON body and request hooks (CORS, timings) are the
+    same code the synchronous resources use.
+    """
+    def __init__(self, app, threads=10):
+        self.app = app
+        self.wsgi = WSGIMiddleware(app, workers=threads)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+            return
+        if scope['type'] == 'http' and scope['method'] == 'GET':
+            response = await self.dispatch(scope)
+            if response is not None:
+                await self.send_response(response, send)
+                return
+        await self.wsgi(scope, receive, send)
+
+    async def dispatch(self, scope):
+        """The Flask response for an async view, or None to pass the request to Flask."""
+        with self.app.request_context(build_environ(scope, io.BytesIO())):
+            view = VIEWS.get(request.endpoint)
+            if view is None:
+                return None
+            try:
+                # Includes the denylist check, a round trip with DENYLIST_BACKEND=redis
+                await off_loop(token_denylist.store.blocking, verify_jwt_in_request)
+            except (JWTExtendedException, PyJWTError):
+                # Flask answers with the resources' own 401 or 422
+                return None
+            except Exception as error:
+                return self.app.finalize_request(self.app.handle_exception(error))
+
+            # before_request hooks (request timings) run as they do under Flask
+            response = self.app.preprocess_request()
+            if response is None:
+                try:
+                    response = await conditional_view(view, request.view_args)
+                except Fallback:
+                    return None
+                except Exception as error:
+                    response = self.app.handle_exception(error)
+            return self.app.finalize_request(response)
+
+    @staticmethod
+    async def send_response(response, send):
+        await send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                        for name, value in response.headers.items()],
+        })
+        await send({'type': 'http.response.body', 'body': response.get_data()})
+
+    @staticmethod
+    async def lifespan(receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await async_db.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+async_db.init_app(flask_app)
+app = AsyncReads(flask_app, flask_app.config['ASGI_WSGI_THREADS'])
@@ -0,0 +1,108 @@
+# server/benchmarks/async_reads.py
+# Read throughput and latency at high concurrency, served synchronously
+# (gunicorn gthread, wsgi:app) and asynchronously (uvicorn workers, asgi:app),
+# both as one worker process over the same seeded SQLite file. Like
+# production, the servers need Redis at CACHE_REDIS_URL for the token denylist.
+#
+# Run from the server directory:  python -m benchmarks.async_reads [connections]
+import http.client
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from app import create_app
+from benchmarks.load import call, free_port, login, seed, start_server
+from config import Config
+from models import db
+
+WORKERS = 1
+CONNECTIONS = 64
+CLIENT_PROCESSES = 4
+DURATION = 10.0
+WARMUP = 1.0
+PATHS = (
+    "/api/expenses?limit=50",
+    "/api/summary?date_from=2025-01-01&date_to=2025-12-31",
+    "/api/user_data",
+)
+MODES = (
+    # name, gunicorn target, settings
+    ("sync, gthread x 4 threads", "wsgi:app", {"GUNICORN_THREADS": "4"}),
+    ("sync, gthread x 32 threads", "wsgi:app", {"GUNICORN_THREADS": "32", "DB_POOL_SIZE": "32"}),
+    ("async, uvicorn", "asgi:app", {"GUNICORN_WORKER_CLASS": "uvicorn_worker.UvicornWorker"}),
+)
+
+def client(port, path, headers, results):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+    started = time.perf_counter()
+    latencies = []
+    while (now := time.perf_counter()) - started < DURATION:
+        status, _ = call(connection, "GET", path, headers=headers)
+        assert status == 200, status
+        if now - started >= WARMUP:
+            latencies.append(time.perf_counter() - now)
+    results.extend(latencies)
+
+def client_process(port, path, headers, threads, queue):
+    results = []
+    clients = [threading.Thread(target=client, args=(port, path, headers, results)) for _ in range(threads)]
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    queue.put(results)
+
+def measure(port, path, headers, connections):
+    queue = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=client_process,
+                                         args=(port, path, headers, connections // CLIENT_PROCESSES, queue))
+                 for _ in range(CLIENT_PROCESSES)]
+    for process in processes:
+        process.start()
+    latencies = [latency for _ in processes for latency in queue.get()]
+    for process in processes:
+        process.join()
+
+    p99 = statistics.quantiles(latencies, n=100)[98]
+    print(f"    {path:55} {len(latencies) / (DURATION - WARMUP):7.1f} req/s  "
+          f"p50 {statistics.median(latencies) * 1000:7.1f} ms  p99 {p99 * 1000:7.1f} ms")
+
+def main():
+    connections = int(sys.argv[1]) if len(sys.argv) > 1 else CONNECTIONS
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+
+    class BenchmarkConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+
+    try:
+        with create_app(BenchmarkConfig).app_context():
+            db.create_all()
+            db.engine.dispose()
+
+        print(f"{connections} connections per path for {DURATION:.0f}s, {WORKERS} worker, "
+              f"{os.cpu_count()} CPU(s):")
+        for index, (name, target, settings) in enumerate(MODES):
+            port = free_port()
+            server = start_server(WORKERS, port, path, target, **settings)
+            try:
+                if index == 0:
+                    seed(port)
+                headers = login(port)
+                print(f"  {name}:")
+                for read_path in PATHS:
+                    measure(port, read_path, headers, connections)
+            finally:
+                server.terminate()
+                server.wait(timeout=60)
+    finally:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+# server/benchmarks/bulk.py
+# Compare rows/sec for creating expenses one POST at a time against the bulk endpoint.
+#
+# Run from the server directory:  python -m benchmarks.bulk
+import os
+import tempfile
+import time
+
+from app import create_app
+from config import Config
+from models import db, TimePeriod
+
+SINGLE_ROWS = 500
+BULK_ROWS = 5000
+
+def make_expense(i):
+    return {
+        "description": f"Imported expense {i}",
+        "amount": 10 + i % 90,
+        "due_date": f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+        "category": ("Food", "Housing", "Travel")[i % 3]
+    }
+
+def main():
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    
+    class BenchmarkConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+    
+    app = create_app(BenchmarkConfig)
+    client = app.test_client()
+    try:
+        with app.app_context():
+            db.create_all()
+            db.session.add(TimePeriod(type="monthly"))
+            db.session.commit()
+        
+        token = client.post("/api/auth/register", json={
+            "username": "bench", "password": "bench"
+        }).get_json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        
+        started = time.perf_counter()
+        for i in range(SINGLE_ROWS):
+            response = client.post("/api/time_periods/1/expenses", json=make_expense(i), headers=headers)
+            assert response.status_code == 201, response.get_json()
+        single_elapsed = time.perf_counter() - started
+        
+        items = [make_expense(i) for i in range(BULK_ROWS)]
+        started = time.perf_counter()
+        response = client.post("/api/time_periods/1/expenses/bulk", json={"items": items}, headers=headers)
+        bulk_elapsed = time.perf_counter() - started
+        assert response.status_code == 201, response.get_json()
+        
+        single_rate = SINGLE_ROWS / single_elapsed
+        bulk_rate = BULK_ROWS / bulk_elapsed
+        print(f"single-row POST: {SINGLE_ROWS} rows in {single_elapsed:.2f}s ({single_rate:,.0f} rows/sec)")
+        print(f"bulk POST:       {BULK_ROWS} rows in {bulk_elapsed:.2f}s ({bulk_rate:,.0f} rows/sec)")
+        print(f"speedup: {bulk_rate / single_rate:.1f}x")
+    finally:
+        os.remove(path)
+
+if __name__ == '__main__':
+    main()
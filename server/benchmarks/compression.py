@@ -0,0 +1,65 @@
+# server/benchmarks/compression.py
+# Bytes on the wire for user_data and a full list page, sent as is, gzipped
+# and brotli-compressed, in the row and column layouts, with the server's
+# time to compress each body and a client's time to decompress and parse it.
+#
+# Run from the server directory:  python -m benchmarks.compression [rows]
+import gzip
+import json
+import random
+import sys
+import time
+
+from flask_jwt_extended import create_access_token
+
+from app import create_app
+from benchmarks.read_layer import seed
+from compression import brotli
+from config import TestingConfig
+from models import db
+
+ROWS = 20_000
+REPEAT = 5
+PATHS = (
+    "/api/user_data",
+    "/api/expenses?limit=500",
+    "/api/expenses?limit=500&layout=columns",
+)
+
+def best(fn):
+    times = []
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else ROWS
+    app = create_app(TestingConfig)
+    client = app.test_client()
+    with app.app_context():
+        db.create_all()
+        user_id = seed(count, random.Random(7))
+        headers = {"Authorization": f"Bearer {create_access_token(identity=str(user_id))}"}
+
+    encoders = app.extensions["compression"].encoders
+    decoders = {"gzip": gzip.decompress, "br": brotli and brotli.decompress}
+    print(f"{count} expenses, {count // 10} paychecks; gzip level {app.config['COMPRESS_GZIP_LEVEL']}, "
+          f"brotli quality {app.config['COMPRESS_BROTLI_QUALITY']}, best of {REPEAT}:")
+    for path in PATHS:
+        response = client.get(path, headers=headers)
+        assert response.status_code == 200, response.status_code
+        body = response.get_data()
+        print(f"  {path}")
+        print(f"    {'identity':9} {len(body):>10,} bytes  {'':>16}  parse {best(lambda: json.loads(body)) * 1000:7.1f} ms")
+        for encoding, encode in encoders.items():
+            compressed = encode(body)
+            decode = decoders[encoding]
+            print(f"    {encoding:9} {len(compressed):>10,} bytes  "
+                  f"compress {best(lambda: encode(body)) * 1000:7.1f} ms  "
+                  f"parse {best(lambda: json.loads(decode(compressed))) * 1000:7.1f} ms  "
+                  f"({len(body) / len(compressed):.1f}x smaller)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+# server/benchmarks/forecast.py
+# Compare the vectorized forecast and Monte Carlo simulation against naive
+# per-day Python loops over the same schedules.
+#
+# Run from the server directory:  python -m benchmarks.forecast
+import calendar
+import math
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+from app import create_app
+from config import Config
+from forecast import projection, simulation, _expense_schedules, _paycheck_schedules, _discretionary_rate
+from models import db, User, TimePeriod, Expense, Paycheck
+from money import to_cents
+
+RECURRING_EXPENSES = 60
+ONE_OFF_EXPENSES = 300
+START = date(2025, 1, 1)
+END = date(2025, 12, 31)
+SCENARIOS = 1000
+NAIVE_SCENARIOS = 50
+JITTER = 3
+REPEATS = 5
+STARTING_BALANCE = 4000.0
+
+def seed(rng):
+    db.session.add(User(username="bench", password_hash="x"))
+    db.session.add_all([TimePeriod(type="monthly"), TimePeriod(type="bi-weekly")])
+    db.session.flush()
+    db.session.execute(Expense.__table__.insert(), [
+        dict(user_id=1, time_period_id=1, description=f"Bill {i}", amount=round(rng.uniform(5, 120), 2),
+             due_date=date(2024, 1, 1) + timedelta(days=rng.randint(0, 365)),
+             is_recurring=True, recurrence_interval=rng.choice(["weekly", "bi-weekly", "monthly", "yearly"]))
+        for i in range(RECURRING_EXPENSES)
+    ] + [
+        dict(user_id=1, time_period_id=1, description=f"Spend {i}", amount=round(rng.uniform(1, 60), 2),
+             due_date=START - timedelta(days=rng.randint(1, 90)), is_recurring=False,
+             recurrence_interval=None)
+        for i in range(ONE_OFF_EXPENSES)
+    ])
+    db.session.add_all([
+        Paycheck(user_id=1, time_period_id=2, amount=4800, date_received=date(2024, 12, 6)),
+        Paycheck(user_id=1, time_period_id=2, amount=4800, date_received=date(2024, 12, 20)),
+        Paycheck(user_id=1, time_period_id=1, amount=650, date_received=date(2024, 11, 1)),
+        Paycheck(user_id=1, time_period_id=1, amount=650, date_received=date(2024, 12, 1)),
+    ])
+    db.session.commit()
+
+def occurs_on(day, anchor, interval):
+    """Naive check for whether a schedule falls on day."""
+    if interval is None:
+        return day == anchor
+    if day < anchor:
+        return False
+    unit, step = interval
+    if unit == "days":
+        return (day - anchor).days % step == 0
+    months = (day.year - anchor.year) * 12 + day.month - anchor.month
+    last = calendar.monthrange(day.year, day.month)[1]
+    return months % step == 0 and day.day == min(anchor.day, last)
+
+def naive_project(schedules, start, end, starting_balance):
+    balance = lowest = to_cents(starting_balance)
+    day = start
+    while day <= end:
+        for anchor, interval, amount in schedules:
+            if occurs_on(day, anchor, interval):
+                balance += to_cents(amount)
+        lowest = min(lowest, balance)
+        day += timedelta(days=1)
+    return balance / 100, lowest / 100
+
+def naive_simulate(scheduled, paydays, rate, days, scenarios, rng, variation=0.25):
+    sigma = math.sqrt(math.log1p(variation ** 2))
+    shortfalls = 0
+    for _ in range(scenarios):
+        income = [0.0] * days
+        for offset, amount in paydays:
+            landed = offset + rng.randint(-JITTER, JITTER)
+            if 0 <= landed < days:
+                income[landed] += amount
+        balance = lowest = to_cents(STARTING_BALANCE)
+        for offset in range(days):
+            balance += income[offset] - scheduled[offset] - rate * rng.lognormvariate(-sigma ** 2 / 2, sigma)
+            lowest = min(lowest, balance)
+        shortfalls += lowest < 0
+    return shortfalls / scenarios
+
+def best_of(repeats, fn, *args, **kwargs):
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = fn(*args, **kwargs)
+        timings.append(time.perf_counter() - started)
+    return result, min(timings)
+
+def main():
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+
+    class BenchmarkConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+
+    app = create_app(BenchmarkConfig)
+    rng = random.Random(7)
+    days = (END - START).days + 1
+    try:
+        with app.app_context():
+            db.create_all()
+            seed(rng)
+
+            padding = timedelta(days=JITTER)
+            expenses = list(_expense_schedules(1, START, END))
+            paychecks = list(_paycheck_schedules(1, START, END))
+            padded_paychecks = list(_paycheck_schedules(1, START - padding, END + padding))
+            rate = _discretionary_rate(1, START)
+            
+            result, fast = best_of(REPEATS, projection, expenses + paychecks, START, END, "month", STARTING_BALANCE)
+            (balance, lowest), slow = best_of(1, naive_project, expenses + paychecks, START, END, STARTING_BALANCE)
+            assert abs(balance - result["ending_balance"]) < 0.01, (balance, result["ending_balance"])
+            assert abs(lowest - result["lowest_balance"]) < 0.01, (lowest, result["lowest_balance"])
+            print(f"projection, {len(expenses + paychecks)} schedules over {days} days:")
+            print(f"  vectorized:   {fast * 1000:8.1f} ms")
+            print(f"  per-day loop: {slow * 1000:8.1f} ms ({slow / fast:.0f}x slower)")
+            
+            result, fast = best_of(REPEATS, simulation, expenses, padded_paychecks, rate, START, END, "month",
+                                   STARTING_BALANCE, SCENARIOS, JITTER, seed=1)
+            scheduled = [0.0] * days
+            for anchor, interval, amount in expenses:
+                for offset in range(days):
+                    if occurs_on(START + timedelta(days=offset), anchor, interval):
+                        scheduled[offset] -= to_cents(amount)
+            paydays = [
+                (offset - JITTER, to_cents(amount))
+                for anchor, interval, amount in padded_paychecks
+                for offset in range(days + 2 * JITTER)
+                if occurs_on(START - padding + timedelta(days=offset), anchor, interval)
+            ]
+            probability, slow = best_of(1, naive_simulate, scheduled, paydays, rate, days, NAIVE_SCENARIOS, rng)
+            estimated = slow / NAIVE_SCENARIOS * SCENARIOS
+            print(f"monte carlo, {SCENARIOS} scenarios over {days} days:")
+            print(f"  vectorized:   {fast * 1000:8.1f} ms (shortfall probability {result['shortfall_probability']:.3f})")
+            print(f"  per-day loop: {estimated * 1000:8.1f} ms, estimated from {NAIVE_SCENARIOS} scenarios "
+                  f"({estimated / fast:.0f}x slower, shortfall probability {probability:.3f})")
+    finally:
+        os.remove(path)
+
+if __name__ == '__main__':
+    main()
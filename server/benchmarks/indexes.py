@@ -0,0 +1,138 @@
+# server/benchmarks/indexes.py
+# Compare query plans and latency for the per-user access patterns with and
+# without the composite indexes on expenses/paychecks.
+#
+# Run from the server directory:  python -m benchmarks.indexes
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import text
+
+from app import create_app
+from config import Config
+from models import db, User, TimePeriod, Expense, Paycheck
+
+USERS = 500
+PERIODS = 3
+ROWS_PER_USER = 400
+
+QUERIES = {
+    "expenses by user": (
+        "SELECT * FROM expenses WHERE user_id = :user_id",
+        {}
+    ),
+    "expenses by user and period": (
+        "SELECT * FROM expenses WHERE user_id = :user_id AND time_period_id = :time_period_id",
+        {"time_period_id": 2}
+    ),
+    "expense detail": (
+        "SELECT * FROM expenses WHERE id = :id AND time_period_id = :time_period_id AND user_id = :user_id",
+        {"id": 1234, "time_period_id": 2}
+    ),
+    "expenses by user and date range": (
+        "SELECT * FROM expenses WHERE user_id = :user_id AND due_date BETWEEN :start AND :end",
+        {"start": "2024-01-01", "end": "2024-03-31"}
+    ),
+    "paychecks by user and period": (
+        "SELECT * FROM paychecks WHERE user_id = :user_id AND time_period_id = :time_period_id",
+        {"time_period_id": 1}
+    ),
+    "paychecks by user and date range": (
+        "SELECT * FROM paychecks WHERE user_id = :user_id AND date_received BETWEEN :start AND :end",
+        {"start": "2024-01-01", "end": "2024-03-31"}
+    ),
+}
+
+INDEXES = [
+    index
+    for model in (Expense, Paycheck)
+    for index in model.__table__.indexes
+]
+
+def generate_dataset():
+    rng = random.Random(42)
+    start = date(2020, 1, 1)
+    
+    db.session.bulk_insert_mappings(TimePeriod, [
+        {"id": i + 1, "type": f"period-{i + 1}"} for i in range(PERIODS)
+    ])
+    db.session.bulk_insert_mappings(User, [
+        {"id": i + 1, "username": f"user{i + 1}", "password_hash": "x"} for i in range(USERS)
+    ])
+    
+    expenses = []
+    paychecks = []
+    for user_id in range(1, USERS + 1):
+        for _ in range(ROWS_PER_USER):
+            day = start + timedelta(days=rng.randrange(5 * 365))
+            expenses.append({
+                "user_id": user_id,
+                "time_period_id": rng.randint(1, PERIODS),
+                "description": "Generated expense",
+                "amount": round(rng.uniform(1, 500), 2),
+                "due_date": day,
+                "currency": "USD"
+            })
+        for _ in range(ROWS_PER_USER // 4):
+            day = start + timedelta(days=rng.randrange(5 * 365))
+            paychecks.append({
+                "user_id": user_id,
+                "time_period_id": rng.randint(1, PERIODS),
+                "amount": round(rng.uniform(500, 3000), 2),
+                "date_received": day,
+                "currency": "USD"
+            })
+    db.session.bulk_insert_mappings(Expense, expenses)
+    db.session.bulk_insert_mappings(Paycheck, paychecks)
+    db.session.commit()
+    return len(expenses), len(paychecks)
+
+def run_queries(label, repeat=200):
+    print(f"\n== {label} ==")
+    with db.engine.connect() as conn:
+        for name, (sql, params) in QUERIES.items():
+            params = dict(params, user_id=USERS // 2)
+            plan = conn.execute(text("EXPLAIN QUERY PLAN " + sql), params).fetchall()
+            
+            started = time.perf_counter()
+            for _ in range(repeat):
+                conn.execute(text(sql), params).fetchall()
+            elapsed_ms = (time.perf_counter() - started) * 1000 / repeat
+            
+            print(f"{name}: {elapsed_ms:.3f} ms/query")
+            for row in plan:
+                print(f"    {row[-1]}")
+
+def main():
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    
+    class BenchmarkConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+    
+    app = create_app(BenchmarkConfig)
+    try:
+        with app.app_context():
+            db.create_all()
+            for index in INDEXES:
+                index.drop(db.engine)
+            
+            expense_count, paycheck_count = generate_dataset()
+            print(f"Generated {expense_count} expenses and {paycheck_count} paychecks for {USERS} users")
+            
+            run_queries("without composite indexes")
+            
+            for index in INDEXES:
+                index.create(db.engine)
+            with db.engine.connect() as conn:
+                conn.execute(text("ANALYZE"))
+            
+            run_queries("with composite indexes")
+    finally:
+        os.remove(path)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+# server/benchmarks/load.py
+# Throughput of the production server (gunicorn -c gunicorn.conf.py wsgi:app)
+# as the number of worker processes grows. Like production, the servers need
+# Redis at CACHE_REDIS_URL for the token denylist.
+#
+# Run from the server directory:  python -m benchmarks.load [workers ...]
+import http.client
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from app import create_app
+from config import Config
+from models import db
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKER_COUNTS = (1, 2, 4)
+THREADS = 4
+CLIENT_PROCESSES = 4
+CLIENT_THREADS = 4
+DURATION = 10.0
+WARMUP = 1.0
+EXPENSES = 2000
+PATH = "/api/expenses?limit=50"
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def call(connection, method, path, body=None, headers=None):
+    connection.request(method, path, body=json.dumps(body) if body is not None else None,
+                       headers={"Content-Type": "application/json", **(headers or {})})
+    response = connection.getresponse()
+    return response.status, response.read()
+
+def start_server(workers, port, database_path, target="wsgi:app", **settings):
+    env = dict(
+        os.environ,
+        APP_ENV="production",
+        SECRET_KEY="load-test",
+        JWT_SECRET_KEY="load-test",
+        DATABASE_URL=f"sqlite:///{database_path}",
+        PORT=str(port),
+        WEB_CONCURRENCY=str(workers),
+        GUNICORN_THREADS=str(THREADS),
+        PASSWORD_HASH_WORKERS="0",
+        CACHE_BACKEND="null",
+    )
+    env.update(settings)
+    server = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", target],
+                              cwd=SERVER_DIR, env=env, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+            if call(connection, "GET", "/")[0] == 200:
+                return server
+        except OSError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError("gunicorn did not start")
+
+def client(port, headers, results):
+    """Keep one connection busy until DURATION elapses; latencies after WARMUP go to results."""
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    started = time.perf_counter()
+    latencies = []
+    while (now := time.perf_counter()) - started < DURATION:
+        status, _ = call(connection, "GET", PATH, headers=headers)
+        assert status == 200, status
+        if now - started >= WARMUP:
+            latencies.append(time.perf_counter() - now)
+    results.extend(latencies)
+
+def client_process(port, headers, queue):
+    results = []
+    threads = [threading.Thread(target=client, args=(port, headers, results)) for _ in range(CLIENT_THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    queue.put(results)
+
+def seed(port):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    status, body = call(connection, "POST", "/api/auth/register", {"username": "load", "password": "load"})
+    assert status == 201, body
+    headers = {"Authorization": f"Bearer {json.loads(body)['access_token']}"}
+    status, body = call(connection, "POST", "/api/time_periods", {"type": "monthly"}, headers)
+    assert status == 201, body
+    items = [{"description": f"Expense {i}", "amount": 5 + i % 100, "due_date": f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}"}
+             for i in range(EXPENSES)]
+    status, body = call(connection, "POST", "/api/time_periods/1/expenses/bulk", {"items": items}, headers)
+    assert status == 201, body
+
+def login(port):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    status, body = call(connection, "POST", "/api/auth/login", {"username": "load", "password": "load"})
+    assert status == 200, body
+    return {"Authorization": f"Bearer {json.loads(body)['access_token']}"}
+
+def run(workers, database_path, seeded):
+    port = free_port()
+    server = start_server(workers, port, database_path)
+    try:
+        if not seeded:
+            seed(port)
+        headers = login(port)
+        queue = multiprocessing.Queue()
+        clients = [multiprocessing.Process(target=client_process, args=(port, headers, queue))
+                   for _ in range(CLIENT_PROCESSES)]
+        for process in clients:
+            process.start()
+        latencies = [latency for _ in clients for latency in queue.get()]
+        for process in clients:
+            process.join()
+    finally:
+        # SIGTERM lets workers finish in-flight requests and release their connections
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+
+    measured = DURATION - WARMUP
+    p99 = statistics.quantiles(latencies, n=100)[98]
+    print(f"  {workers} worker(s) x {THREADS} threads: {len(latencies) / measured:8.1f} req/s  "
+          f"p50 {statistics.median(latencies) * 1000:6.1f} ms  p99 {p99 * 1000:6.1f} ms")
+
+def main():
+    worker_counts = [int(arg) for arg in sys.argv[1:]] or WORKER_COUNTS
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+
+    class BenchmarkConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+
+    try:
+        with create_app(BenchmarkConfig).app_context():
+            db.create_all()
+        print(f"GET {PATH} from {CLIENT_PROCESSES * CLIENT_THREADS} connections for {DURATION:.0f}s, "
+              f"{os.cpu_count()} CPU(s):")
+        for index, workers in enumerate(worker_counts):
+            run(workers, path, seeded=index > 0)
+    finally:
+        os.remove(path)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+# server/benchmarks/login_flood.py
+# Latency of a non-auth endpoint while a flood of logins hits the same server,
+# with password hashing inline, on the process pool, and against a brute-force
+# flood that the failed-login throttle turns away.
+#
+# Run from the server directory:  python -m benchmarks.login_flood
+import http.client
+import json
+import logging
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from werkzeug.serving import make_server
+
+from app import create_app
+from config import Config
+from models import db, TimePeriod
+from passwords import password_hasher
+
+FLOOD_THREADS = 16
+DURATION = 5.0
+PROBE_INTERVAL = 0.02
+PASSWORD = "correct horse battery staple"
+
+SCENARIOS = (
+    # name, config overrides, password sent by the flood
+    ("inline hashing", {"PASSWORD_HASH_WORKERS": 0, "LOGIN_MAX_FAILURES": 10 ** 9}, PASSWORD),
+    ("process pool", {"PASSWORD_HASH_WORKERS": 2}, PASSWORD),
+    ("brute force, unthrottled", {"LOGIN_MAX_FAILURES": 10 ** 9, "LOGIN_MAX_FAILURES_PER_USER": 10 ** 9,
+                                  "LOGIN_MAX_FAILURES_PER_ADDRESS": 10 ** 9}, "wrong"),
+    ("brute force, throttled", {}, "wrong"),
+)
+
+def request(port, method, path, body=None, headers=None):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    try:
+        connection.request(method, path, body=json.dumps(body) if body is not None else None,
+                           headers={"Content-Type": "application/json", **(headers or {})})
+        response = connection.getresponse()
+        return response.status, response.read()
+    finally:
+        connection.close()
+
+def flood(port, password, stop, statuses):
+    while not stop.is_set():
+        status, _ = request(port, "POST", "/api/auth/login", {"username": "bench", "password": password})
+        statuses.append(status)
+
+def probe(port, headers, stop, latencies):
+    while not stop.is_set():
+        started = time.perf_counter()
+        status, _ = request(port, "GET", "/api/expenses", headers=headers)
+        latencies.append(time.perf_counter() - started)
+        assert status == 200, status
+        time.sleep(PROBE_INTERVAL)
+
+def run(name, overrides, password, path):
+    class BenchmarkConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+        CACHE_BACKEND = "null"
+    for key, value in overrides.items():
+        setattr(BenchmarkConfig, key, value)
+
+    app = create_app(BenchmarkConfig)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_port
+    try:
+        status, body = request(port, "POST", "/api/auth/login", {"username": "bench", "password": PASSWORD})
+        assert status == 200, body
+        headers = {"Authorization": f"Bearer {json.loads(body)['access_token']}"}
+
+        stop = threading.Event()
+        latencies, statuses = [], []
+        threads = [threading.Thread(target=probe, args=(port, headers, stop, latencies))]
+        threads += [threading.Thread(target=flood, args=(port, password, stop, statuses))
+                    for _ in range(FLOOD_THREADS)]
+        for thread in threads:
+            thread.start()
+        time.sleep(DURATION)
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        p50 = statistics.median(latencies)
+        p99 = statistics.quantiles(latencies, n=100)[98]
+        counts = {code: statuses.count(code) for code in sorted(set(statuses))}
+        print(f"{name}:")
+        print(f"  GET /api/expenses  p50 {p50 * 1000:7.1f} ms  p99 {p99 * 1000:7.1f} ms  ({len(latencies)} requests)")
+        print(f"  logins             {len(statuses) / DURATION:7.1f}/sec  statuses {counts}")
+    finally:
+        server.shutdown()
+        password_hasher.shutdown()
+
+def main():
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+
+    class SetupConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+        PASSWORD_HASH_WORKERS = 0
+
+    try:
+        app = create_app(SetupConfig)
+        with app.app_context():
+            db.create_all()
+            db.session.add(TimePeriod(type="monthly"))
+            db.session.commit()
+        status = app.test_client().post("/api/auth/register", json={
+            "username": "bench", "password": PASSWORD
+        }).status_code
+        assert status == 201, status
+
+        print(f"{FLOOD_THREADS} login threads for {DURATION:.0f}s, {os.cpu_count()} CPU(s)")
+        for name, overrides, password in SCENARIOS:
+            run(name, overrides, password, path)
+    finally:
+        os.remove(path)
+
+if __name__ == '__main__':
+    main()
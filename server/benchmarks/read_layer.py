@@ -0,0 +1,95 @@
+# server/benchmarks/read_layer.py
+# Time per row and peak memory of the user_data and list reads for one user
+# with many rows, through ORM entities and the marshmallow schemas, against
+# the Core column selects and row serializers the endpoints use.
+#
+# Peak memory is measured with tracemalloc in a separate pass, since tracing
+# slows everything down; it covers the query, the serialized data and the
+# encoded body.
+#
+# Run from the server directory:  python -m benchmarks.read_layer [rows]
+import json
+import random
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from sqlalchemy import insert, select
+
+from app import create_app
+from config import TestingConfig
+from models import db, User, TimePeriod, Expense, Paycheck
+from queries import user_data, EXPENSES
+from schemas import expenses_schema
+from benchmarks.reference import user_data_schema, load_user_data
+from serializers import expense_rows, dumps
+
+ROWS = 100_000
+REPEAT = 3
+
+def seed(count, rng):
+    db.session.add_all(TimePeriod(type=kind) for kind in ("weekly", "biweekly", "monthly"))
+    user = User(username="many", password_hash="-")
+    db.session.add(user)
+    db.session.flush()
+    start = date(2020, 1, 1)
+    db.session.execute(insert(Expense), [
+        {
+            "user_id": user.id, "time_period_id": rng.randint(1, 3),
+            "description": f"Expense {i}", "amount": f"{rng.randint(1, 500_000) / 100:.2f}",
+            "due_date": start + timedelta(days=rng.randint(0, 2000)),
+            "is_recurring": rng.random() < 0.2, "recurrence_interval": None,
+            "category": rng.choice(("food", "rent", None)), "currency": "USD",
+        }
+        for i in range(count)
+    ])
+    db.session.execute(insert(Paycheck), [
+        {
+            "user_id": user.id, "time_period_id": rng.randint(1, 3),
+            "amount": f"{rng.randint(100_000, 500_000) / 100:.2f}",
+            "date_received": start + timedelta(days=rng.randint(0, 2000)), "currency": "USD",
+        }
+        for _ in range(count // 10)
+    ])
+    db.session.commit()
+    return user.id
+
+def measure(fn):
+    """Best wall time of REPEAT runs, then the traced peak of one more."""
+    best = float("inf")
+    for _ in range(REPEAT):
+        db.session.expunge_all()
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    db.session.expunge_all()
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else ROWS
+    app = create_app(TestingConfig)
+    with app.app_context():
+        db.create_all()
+        user_id = seed(count, random.Random(7))
+        rows = count + count // 10
+
+        print(f"One user with {count} expenses and {count // 10} paychecks, best of {REPEAT}:")
+        for label, fn, size in (
+            ("user_data, ORM + schema", lambda: json.dumps(user_data_schema.dump(load_user_data(user_id))), rows),
+            ("user_data, Core + row serializers", lambda: dumps(user_data(user_id)), rows),
+            ("expenses, ORM + schema", lambda: json.dumps(expenses_schema.dump(
+                Expense.query.filter_by(user_id=user_id).all())), count),
+            ("expenses, Core + row serializer", lambda: dumps(expense_rows.dump(db.session.execute(
+                select(*expense_rows.columns).where(EXPENSES.user_id == user_id)).all())), count),
+        ):
+            seconds, peak = measure(fn)
+            print(f"  {label:40} {seconds / size * 1e6:6.2f} us/row  {seconds * 1000:8.0f} ms  "
+                  f"peak {peak / 2**20:7.1f} MiB")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+# server/benchmarks/reference.py
+# The user_data read as it was before the row serializers: the user and their
+# rows loaded as ORM instances with selectinload and dumped by marshmallow
+# schemas. The benchmarks time the endpoints against it and check that both
+# give the same output.
+from collections import defaultdict
+
+from marshmallow import fields
+from sqlalchemy.orm import selectinload
+
+from models import User, TimePeriod
+from schemas import ma, ExpenseSchema, PaycheckSchema, period_expenses_schema, period_paychecks_schema
+
+def group_by_period(rows):
+    """Group expense or paycheck rows into lists keyed by time_period_id."""
+    grouped = defaultdict(list)
+    for row in rows:
+        grouped[row.time_period_id].append(row)
+    return grouped
+
+def dump_periods_with_rows(periods, expenses, paychecks):
+    """Serialize time periods, each with the given expenses and paychecks that belong to it."""
+    expenses_by_period = group_by_period(expenses)
+    paychecks_by_period = group_by_period(paychecks)
+    return [
+        {
+            'id': period.id,
+            'type': period.type,
+            'expenses': period_expenses_schema.dump(expenses_by_period[period.id]),
+            'paychecks': period_paychecks_schema.dump(paychecks_by_period[period.id])
+        }
+        for period in periods
+    ]
+
+class UserDataSchema(ma.SQLAlchemySchema):
+    class Meta:
+        model = User
+
+    id = ma.auto_field()
+    username = ma.auto_field()
+
+    # The user's own rows, loaded up front with selectinload (see load_user_data)
+    expenses = fields.List(fields.Nested(ExpenseSchema), dump_only=True)
+    paychecks = fields.List(fields.Nested(PaycheckSchema), dump_only=True)
+
+    # Every time period, with the user's rows nested
+    time_periods = fields.Method('get_time_periods_with_data')
+
+    def get_time_periods_with_data(self, obj):
+        periods = TimePeriod.query.order_by(TimePeriod.id).all()
+        return dump_periods_with_rows(periods, obj.expenses, obj.paychecks)
+
+def load_user_data(user_id):
+    """Load a user with their expenses and paychecks: one query for the user, one per relationship."""
+    return User.query.options(
+        selectinload(User.expenses),
+        selectinload(User.paychecks)
+    ).filter_by(id=user_id).first_or_404()
+
+user_data_schema = UserDataSchema()
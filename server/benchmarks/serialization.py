@@ -0,0 +1,87 @@
+# server/benchmarks/serialization.py
+# Rows per second serialized by the marshmallow schemas from ORM instances,
+# against the compiled row serializers (serializers.py) from Row tuples,
+# each encoded with the stdlib json module and with serializers.dumps (the
+# JSON_COMPACT encoding). tests/test_serializers.py checks that both paths
+# give the same output.
+#
+# Run from the server directory:  python -m benchmarks.serialization [rows]
+import json
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import select
+
+from app import create_app
+from config import TestingConfig
+from models import db, User, TimePeriod, Expense, Paycheck
+from schemas import expenses_schema
+import serializers
+from serializers import expense_rows, dumps
+
+ROWS = 20_000
+REPEAT = 5
+DESCRIPTIONS = ("Rent", "Café \"Le Zinc\"", "Tab\tand\nnewline", "Back\\slash", "日本語", "  separator",
+                "Control \x01 char", "")
+AMOUNTS = ("0.01", "0.1", "0.5", "1", "19.99", "20.005", "1234.5", "999999.99", "12345678901.23")
+
+def seed(count, rng):
+    db.session.add_all(TimePeriod(type=kind) for kind in ("weekly", "biweekly", "monthly", "unused"))
+    users = [User(username=f"user{i}", password_hash="-") for i in range(3)]
+    db.session.add_all(users)
+    db.session.flush()
+    start = date(2024, 1, 1)
+    for i in range(count):
+        owner = users[i % 2]
+        db.session.add(Expense(
+            user_id=owner.id, time_period_id=rng.randint(1, 3),
+            description=rng.choice(DESCRIPTIONS) + str(i), amount=rng.choice(AMOUNTS),
+            due_date=rng.choice((None, start + timedelta(days=rng.randint(0, 700)))),
+            is_recurring=rng.choice((True, False)),
+            recurrence_interval=rng.choice((None, "monthly", "weekly")),
+            category=rng.choice((None, "food", "Ünïcode", "rent")),
+            currency=rng.choice(("USD", "EUR", None)),
+        ))
+        if i % 4 == 0:
+            db.session.add(Paycheck(
+                user_id=owner.id, time_period_id=rng.randint(1, 3), amount=rng.choice(AMOUNTS),
+                date_received=rng.choice((None, start + timedelta(days=rng.randint(0, 700)))),
+                currency=rng.choice(("USD", "GBP")),
+            ))
+    db.session.commit()
+
+def rate(fn, count):
+    best = float("inf")
+    for _ in range(REPEAT):
+        db.session.expunge_all()
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return count / best
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else ROWS
+    app = create_app(TestingConfig)
+    with app.app_context():
+        db.create_all()
+        seed(count, random.Random(42))
+
+        instances = Expense.query.all()
+        rows = db.session.execute(select(*expense_rows.columns)).all()
+        schema_data = expenses_schema.dump(instances)
+        print(f"{len(rows)} expenses, best of {REPEAT}, orjson {'installed' if serializers.orjson else 'missing'}:")
+        for label, fn in (
+            ("ORM query + schema dump + json.dumps", lambda: json.dumps(expenses_schema.dump(Expense.query.all()))),
+            ("Row query + row dump + dumps", lambda: dumps(expense_rows.dump(db.session.execute(
+                select(*expense_rows.columns)).all()))),
+            ("schema dump only", lambda: expenses_schema.dump(instances)),
+            ("row dump only", lambda: expense_rows.dump(rows)),
+            ("json.dumps only", lambda: json.dumps(schema_data)),
+            ("dumps only", lambda: dumps(schema_data)),
+        ):
+            print(f"  {label:38} {rate(fn, len(rows)):12,.0f} rows/s")
+
+if __name__ == '__main__':
+    main()
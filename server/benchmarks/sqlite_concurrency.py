@@ -0,0 +1,107 @@
+# server/benchmarks/sqlite_concurrency.py
+# Read throughput while bulk writes are in flight, against gunicorn workers
+# sharing one SQLite file, with and without SQLITE_TUNING (WAL, pragmas,
+# a single writer connection per worker and a separate read engine). Like
+# production, the servers need Redis at CACHE_REDIS_URL for the token denylist.
+#
+# Run from the server directory:  python -m benchmarks.sqlite_concurrency
+import http.client
+import multiprocessing
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from app import create_app
+from benchmarks.load import call, free_port, login, seed, start_server
+from config import Config
+from models import db
+
+WORKERS = 2
+READERS = 8
+WRITERS = 2
+WRITE_ROWS = 200
+DURATION = 10.0
+READ_PATH = "/api/summary?date_from=2025-01-01&date_to=2025-12-31"
+
+def reader(port, headers, stop, results):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    while not stop.is_set():
+        started = time.perf_counter()
+        status, _ = call(connection, "GET", READ_PATH, headers=headers)
+        results.append((status, time.perf_counter() - started))
+
+def writer(port, headers, stop, results):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    items = [{"description": f"Write {i}", "amount": 1 + i % 50, "due_date": f"2025-06-{i % 28 + 1:02d}"}
+             for i in range(WRITE_ROWS)]
+    while not stop.is_set():
+        started = time.perf_counter()
+        status, _ = call(connection, "POST", "/api/time_periods/1/expenses/bulk", {"items": items}, headers)
+        results.append((status, time.perf_counter() - started))
+
+def clients(target, count, port, headers, queue):
+    stop = threading.Event()
+    results = []
+    threads = [threading.Thread(target=target, args=(port, headers, stop, results)) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    time.sleep(DURATION)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    queue.put((target.__name__, results))
+
+def report(kind, results):
+    ok = [latency for status, latency in results if status in (200, 201)]
+    errors = len(results) - len(ok)
+    p99 = statistics.quantiles(ok, n=100)[98] * 1000 if len(ok) > 1 else float("nan")
+    print(f"    {kind:7} {len(ok) / DURATION:8.1f}/s  p99 {p99:7.1f} ms  errors {errors}")
+
+def run(tuned):
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+
+    class BenchmarkConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+        SQLITE_TUNING = tuned
+
+    with create_app(BenchmarkConfig).app_context():
+        db.create_all()
+        db.engine.dispose()
+
+    port = free_port()
+    server = start_server(WORKERS, port, path, SQLITE_TUNING=str(tuned).lower())
+    try:
+        seed(port)
+        headers = login(port)
+        queue = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(target=clients, args=(reader, READERS, port, headers, queue)),
+            multiprocessing.Process(target=clients, args=(writer, WRITERS, port, headers, queue)),
+        ]
+        for process in processes:
+            process.start()
+        results = dict(queue.get() for _ in processes)
+        for process in processes:
+            process.join()
+    finally:
+        server.terminate()
+        server.wait(timeout=60)
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+    print(f"  SQLITE_TUNING={tuned}:")
+    report("reads", results["reader"])
+    report("writes", results["writer"])
+
+def main():
+    print(f"{WORKERS} gunicorn workers, {READERS} readers of {READ_PATH} and {WRITERS} writers "
+          f"of {WRITE_ROWS}-row bulk inserts for {DURATION:.0f}s, {os.cpu_count()} CPU(s):")
+    for tuned in (False, True):
+        run(tuned)
+
+if __name__ == '__main__':
+    main()
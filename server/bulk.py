@@ -0,0 +1,212 @@
+# server/bulk.py
+from datetime import datetime
+from itertools import islice
+
+from sqlalchemy import insert, update, delete, select
+from marshmallow import ValidationError
+
+from models import db, Expense, Paycheck, DeletedRecord
+from rollups import row_deltas, apply_deltas
+from versions import bump_user_versions, tombstones
+
+ATOMIC = 'atomic'
+BEST_EFFORT = 'best_effort'
+BULK_MODES = (ATOMIC, BEST_EFFORT)
+
+# Columns needed to compute rollup deltas for existing rows
+ROLLUP_COLUMNS = {
+    Expense: (Expense.id, Expense.user_id, Expense.time_period_id, Expense.amount,
+              Expense.category, Expense.currency),
+    Paycheck: (Paycheck.id, Paycheck.user_id, Paycheck.time_period_id, Paycheck.amount,
+               Paycheck.currency),
+}
+
+class BulkError(Exception):
+    """Raised when a bulk request cannot be processed at all."""
+    def __init__(self, messages, status=400):
+        super().__init__(messages)
+        self.messages = messages
+        self.status = status
+
+def parse_bulk_request(data, key, max_items):
+    """Validate the {"<key>": [...], "mode": ...} envelope and return (items, mode)."""
+    if not isinstance(data, dict) or not isinstance(data.get(key), list):
+        raise BulkError({key: [f"Must be a list of up to {max_items} items."]})
+    items = data[key]
+    if not items:
+        raise BulkError({key: ["Must not be empty."]})
+    if len(items) > max_items:
+        raise BulkError({key: [f"Must not contain more than {max_items} items."]})
+    
+    mode = data.get('mode', ATOMIC)
+    if mode not in BULK_MODES:
+        raise BulkError({"mode": [f"Must be one of: {', '.join(BULK_MODES)}."]})
+    return items, mode
+
+def _validate(schema, items):
+    """Validate every item in one pass, returning {index: row} and {index: errors}."""
+    try:
+        rows = schema.load(items)
+        return dict(enumerate(rows)), {}
+    except ValidationError as err:
+        errors = err.messages if isinstance(err.messages, dict) else {0: err.messages}
+        rows = {
+            index: row for index, row in enumerate(err.valid_data or [])
+            if index not in errors
+        }
+        return rows, errors
+
+def _is_id(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def _lock_user(user_id):
+    """Bump the user's version and return it as the change_seq for this write.
+    
+    The bump holds the user's data_versions row lock until commit, and every
+    write to the user's rows takes it first, so rows read after this call
+    cannot change under the rollup deltas computed from them.
+    """
+    return bump_user_versions(db.session.connection(), {user_id})[int(user_id)]
+
+def _existing_rows(model, ids, user_id, time_period_id):
+    """Current rollup-relevant columns for the user's rows in a time period, keyed by id.
+    
+    Call after _lock_user when the rows feed rollup deltas.
+    """
+    result = db.session.execute(
+        select(*ROLLUP_COLUMNS[model]).where(
+            model.id.in_(ids),
+            model.user_id == user_id,
+            model.time_period_id == time_period_id
+        )
+    )
+    return {row.id: dict(row._mapping) for row in result}
+
+def batched(iterable, size):
+    """Lists of up to size items from iterable, for inserting in batches."""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+def insert_rows(model, rows):
+    """Insert validated row dicts with one executemany INSERT and update the rollups.
+    
+    Does not commit; returns the new ids in the same order as rows.
+    """
+    versions = bump_user_versions(db.session.connection(), {row['user_id'] for row in rows})
+    for row in rows:
+        row['change_seq'] = versions[int(row['user_id'])]
+    
+    ids = db.session.scalars(
+        insert(model).returning(model.id, sort_by_parameter_order=True),
+        rows
+    ).all()
+    apply_deltas(db.session.connection(), row_deltas(model, rows))
+    return ids
+
+def bulk_create(model, schema, items, user_id, time_period_id, mode):
+    """Validate and insert many rows with one executemany INSERT.
+    
+    Returns (ids, errors) where errors maps item index to validation messages.
+    In atomic mode nothing is written if any item fails.
+    """
+    for item in items:
+        if isinstance(item, dict):
+            item['time_period_id'] = time_period_id
+            item['user_id'] = user_id
+    
+    rows, errors = _validate(schema, items)
+    if errors and (mode == ATOMIC or not rows):
+        return [], errors
+    
+    ids = insert_rows(model, [rows[index] for index in sorted(rows)])
+    db.session.commit()
+    return ids, errors
+
+def bulk_update(model, schema, items, user_id, time_period_id, mode):
+    """Validate and apply partial updates to many rows with one executemany UPDATE.
+    
+    Each item must carry the id of one of the user's rows in the time period,
+    at most once per request. Returns (ids, errors) like bulk_create.
+    """
+    errors = {}
+    ids = {}
+    payloads = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or not _is_id(item.get('id')):
+            errors[index] = {"id": ["Missing or invalid id."]}
+            payloads.append({})
+            continue
+        if item['id'] in ids.values():
+            errors[index] = {"id": ["Duplicate id."]}
+            payloads.append({})
+            continue
+        ids[index] = item['id']
+        # Cannot change id, user_id or time_period_id
+        payloads.append({
+            field: value for field, value in item.items()
+            if field not in ('id', 'user_id', 'time_period_id')
+        })
+    
+    rows, validation_errors = _validate(schema, payloads)
+    errors.update({index: messages for index, messages in validation_errors.items() if index not in errors})
+    
+    change_seq = _lock_user(user_id)
+    existing = _existing_rows(model, list(ids.values()), user_id, time_period_id)
+    for index, row_id in ids.items():
+        if index not in errors and row_id not in existing:
+            errors[index] = {"id": ["Not found."]}
+    
+    valid = [index for index in sorted(rows) if index not in errors and rows[index]]
+    if errors and (mode == ATOMIC or not valid):
+        db.session.rollback()
+        return [], errors
+    
+    changes = [dict(rows[index], id=ids[index]) for index in valid]
+    if not changes:
+        db.session.rollback()
+        return [], errors
+    
+    stamp = {'change_seq': change_seq, 'updated_at': datetime.utcnow()}
+    before = [existing[change['id']] for change in changes]
+    after = [dict(existing[change['id']], **change) for change in changes]
+    deltas = row_deltas(model, before, sign=-1)
+    row_deltas(model, after, deltas=deltas)
+    
+    db.session.execute(update(model), [dict(change, **stamp) for change in changes])
+    apply_deltas(db.session.connection(), deltas)
+    db.session.commit()
+    return [ids[index] for index in valid], errors
+
+def bulk_delete(model, ids, user_id, time_period_id, mode):
+    """Delete many of the user's rows in a time period with one DELETE.
+    
+    Returns (ids, errors) where errors maps item index to messages.
+    """
+    errors = {}
+    for index, row_id in enumerate(ids):
+        if not _is_id(row_id):
+            errors[index] = ["Must be an integer id."]
+    
+    change_seq = _lock_user(user_id)
+    existing = _existing_rows(model, [i for i in ids if _is_id(i)], user_id, time_period_id)
+    for index, row_id in enumerate(ids):
+        if index not in errors and row_id not in existing:
+            errors[index] = ["Not found."]
+    
+    if errors and (mode == ATOMIC or not existing):
+        db.session.rollback()
+        return [], errors
+    
+    db.session.execute(
+        delete(model).where(
+            model.id.in_(list(existing)),
+            model.user_id == user_id,
+            model.time_period_id == time_period_id
+        ),
+        execution_options={"synchronize_session": False}
+    )
+    db.session.execute(insert(DeletedRecord), tombstones(model, existing.values(), change_seq))
+    apply_deltas(db.session.connection(), row_deltas(model, existing.values(), sign=-1))
+    db.session.commit()
+    return list(existing), errors
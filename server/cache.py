@@ -0,0 +1,182 @@
+# server/cache.py
+import json
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import request
+from flask_jwt_extended import get_jwt_identity
+
+from metrics import count_cache_event
+from versions import TIME_PERIODS_KEY, EXCHANGE_RATES_KEY, user_key, request_versions
+
+# Namespaces are the data_versions keys an entry depends on
+TIME_PERIODS_NAMESPACE = TIME_PERIODS_KEY
+EXCHANGE_RATES_NAMESPACE = EXCHANGE_RATES_KEY
+user_namespace = user_key
+
+class NullBackend:
+    """Backend that stores nothing, for CACHE_BACKEND='null'."""
+    # Whether calls wait on the network (see asgi.off_loop)
+    blocking = False
+    
+    def get(self, key):
+        return None
+    
+    def set(self, key, value, ttl):
+        pass
+
+class MemoryBackend:
+    """In-process LRU cache with per-entry TTL."""
+    blocking = False
+    
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+    
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+    
+    def set(self, key, value, ttl):
+        """Store value; returns how many older entries were evicted to make room."""
+        with self.lock:
+            self.entries[key] = (value, time.monotonic() + ttl)
+            self.entries.move_to_end(key)
+            evicted = 0
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                evicted += 1
+            return evicted
+
+class RedisBackend:
+    """Backend for any client with the redis-py get/set interface.
+    
+    Eviction is left to Redis (TTL on every entry plus its maxmemory policy).
+    """
+    blocking = True
+    
+    def __init__(self, client, prefix='paycheck-buddy:'):
+        self.client = client
+        self.prefix = prefix
+    
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        if isinstance(value, bytes):
+            value = value.decode()
+        return value
+    
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, value, ex=max(1, int(ttl)))
+
+class ResponseCache:
+    """Cache for JSON response bodies, keyed by the data versions they depend on.
+    
+    Keys are prefixed with the current data_versions value of every
+    namespace they depend on, read from the database (see
+    versions.request_versions). Every write bumps its versions in the same
+    transaction, so each process stops using stale entries as soon as the
+    write commits, and the stale entries simply age out. That takes the
+    place of invalidation calls in the write handlers, which could only
+    reach the process that made the write.
+    
+    Hits, misses, stores, values over CACHE_MAX_VALUE_BYTES and evictions are
+    counted in the paycheck_buddy_response_cache_events Prometheus counter
+    served at /metrics.
+    """
+    def __init__(self, app=None):
+        self.backend = NullBackend()
+        self.default_ttl = 300
+        self.max_value_bytes = 256 * 1024
+        if app is not None:
+            self.init_app(app)
+    
+    def init_app(self, app):
+        backend = app.config.get('CACHE_BACKEND', 'memory')
+        if backend == 'memory':
+            self.backend = MemoryBackend(app.config.get('CACHE_MAX_ENTRIES', 1024))
+        elif backend == 'redis':
+            import redis
+            self.backend = RedisBackend(redis.Redis.from_url(app.config['CACHE_REDIS_URL']))
+        else:
+            self.backend = NullBackend()
+        self.default_ttl = app.config.get('CACHE_DEFAULT_TTL', 300)
+        self.max_value_bytes = app.config.get('CACHE_MAX_VALUE_BYTES', 256 * 1024)
+        app.extensions['response_cache'] = self
+    
+    @staticmethod
+    def _key(namespaces, key, versions):
+        generations = ','.join(f'{ns}@{versions[ns]}' for ns in namespaces)
+        return f'{generations}|{key}'
+    
+    def get(self, namespaces, key, versions=None):
+        """The cached data, or None. versions maps each namespace to its data version,
+        by default the current request's (request_versions)."""
+        value = self.backend.get(self._key(namespaces, key, versions or request_versions()))
+        if value is None:
+            count_cache_event('miss')
+            return None
+        count_cache_event('hit')
+        return json.loads(value)
+    
+    def set(self, namespaces, key, data, ttl=None, versions=None):
+        value = json.dumps(data, separators=(',', ':'))
+        if len(value) > self.max_value_bytes:
+            count_cache_event('too_large')
+            return False
+        evicted = self.backend.set(self._key(namespaces, key, versions or request_versions()), value,
+                                   ttl or self.default_ttl)
+        count_cache_event('set')
+        count_cache_event('eviction', evicted or 0)
+        return True
+    
+    def cached(self, namespaces, ttl=None):
+        """Cache a resource's (data, 200) result under request.full_path.
+        
+        namespaces is a callable returning the namespaces the response depends
+        on, or None to bypass the cache for this request. Must be applied inside
+        @jwt_required(), and is cheapest inside @conditional_get, which has
+        already read the versions.
+        """
+        def decorator(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                depends_on = namespaces()
+                if depends_on is None:
+                    return fn(*args, **kwargs)
+                
+                data = self.get(depends_on, request.full_path)
+                if data is not None:
+                    return data, 200
+                
+                result = fn(*args, **kwargs)
+                if isinstance(result, tuple) and len(result) == 2 and result[1] == 200:
+                    self.set(depends_on, request.full_path, result[0], ttl)
+                return result
+            return wrapper
+        return decorator
+
+def shared_time_periods():
+    """Namespaces for reads of the shared time period table alone."""
+    if request.args.get('include'):
+        return None
+    return (TIME_PERIODS_NAMESPACE,)
+
+def current_user_data():
+    """Namespaces for reads of the caller's own data (which also lists time periods)."""
+    namespaces = (TIME_PERIODS_NAMESPACE, user_namespace(get_jwt_identity()))
+    if request.args.get('report_currency'):
+        namespaces += (EXCHANGE_RATES_NAMESPACE,)
+    return namespaces
+
+response_cache = ResponseCache()
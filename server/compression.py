@@ -0,0 +1,64 @@
+# server/compression.py
+import gzip
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - gzip only
+    brotli = None
+
+# Media types worth compressing; everything else (e.g. images) is sent as is
+COMPRESSIBLE_MIMETYPES = ('application/json', 'text/csv', 'application/x-ndjson', 'text/html', 'text/plain')
+
+class ResponseCompression:
+    """Compresses response bodies with brotli or gzip, as the request's Accept-Encoding allows.
+
+    Bodies under COMPRESS_MIN_SIZE bytes are sent as they are, since the
+    framing costs more than it saves. Streamed responses are left alone: the
+    export compresses its own stream as it goes. A compressed response's
+    ETag is made weak, because its bytes differ from the uncompressed ones;
+    conditional requests compare tags weakly, so it still matches.
+    """
+    def __init__(self, app=None):
+        self.encoders = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.min_size = app.config.get('COMPRESS_MIN_SIZE', 1024)
+        gzip_level = app.config.get('COMPRESS_GZIP_LEVEL', 6)
+        brotli_quality = app.config.get('COMPRESS_BROTLI_QUALITY', 4)
+        # In order of preference when the client accepts both equally
+        self.encoders = {}
+        if brotli is not None:
+            self.encoders['br'] = lambda data: brotli.compress(data, quality=brotli_quality)
+        # mtime=0 keeps the output the same for the same body
+        self.encoders['gzip'] = lambda data: gzip.compress(data, compresslevel=gzip_level, mtime=0)
+        app.after_request(self.compress)
+        app.extensions['compression'] = self
+
+    def compress(self, response):
+        if response.mimetype not in COMPRESSIBLE_MIMETYPES or response.is_streamed \
+                or response.direct_passthrough or 'Content-Encoding' in response.headers:
+            return response
+        if response.status_code < 200 or response.status_code in (204, 206, 304):
+            return response
+
+        # The body depends on Accept-Encoding whether or not this one is compressed
+        response.vary.add('Accept-Encoding')
+        encoding = request.accept_encodings.best_match(list(self.encoders))
+        if encoding is None:
+            return response
+        data = response.get_data()
+        if len(data) < self.min_size:
+            return response
+
+        response.set_data(self.encoders[encoding](data))
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+response_compression = ResponseCompression()
@@ -15,7 +15,144 @@ class Config:
         f"sqlite:///{os.path.join(BASE_DIR, 'paycheck_buddy.db')}"
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Connection pool per process: size it to the worker's thread count, recycle connections
+    # before the server's idle timeout and test each one on checkout
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true',
+    }
+    
+    # Optional engine for read-only requests, e.g. a replica. With SQLITE_TUNING it defaults
+    # to the SQLite file itself.
+    SQLALCHEMY_READ_DATABASE_URI = os.environ.get('READ_DATABASE_URL')
+    
+    # SQLite file databases: WAL journal and per-connection pragmas, one writer connection per
+    # process and a separate pool of read-only connections (see engines.init_database)
+    SQLITE_TUNING = os.environ.get('SQLITE_TUNING', 'true').lower() == 'true'
+    SQLITE_WRITER_CONNECTIONS = int(os.environ.get('SQLITE_WRITER_CONNECTIONS', 1))
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    # Milliseconds to wait for a lock held by another process before failing
+    SQLITE_BUSY_TIMEOUT = int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000))
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+    # Page cache per connection; negative values are KiB
+    SQLITE_CACHE_SIZE = int(os.environ.get('SQLITE_CACHE_SIZE', -64 * 1024))
+
+    # Async serving (asgi.py): the async read database, by default the read database through
+    # aiosqlite or asyncpg, and the threads running the Flask app for all other requests
+    SQLALCHEMY_ASYNC_DATABASE_URI = os.environ.get('ASYNC_DATABASE_URL')
+    ASGI_WSGI_THREADS = int(os.environ.get('ASGI_WSGI_THREADS', 10))
+
     # JWT configuration
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-dev-key-for-development-only'
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
-    JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
\ No newline at end of file
+    JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
+    # Verified token claims remembered until expiry so repeat requests skip decoding (0 disables)
+    JWT_DECODE_CACHE_SIZE = int(os.environ.get('JWT_DECODE_CACHE_SIZE', 4096))
+    # Revoked tokens: 'memory' (per process) or 'redis' (CACHE_REDIS_URL, shared by all workers)
+    DENYLIST_BACKEND = os.environ.get('DENYLIST_BACKEND', 'memory')
+    
+    # Compact JSON responses (no spaces after separators, non-ASCII as UTF-8), through orjson when
+    # installed. Off by default, so responses keep the bytes existing clients get.
+    JSON_COMPACT = os.environ.get('JSON_COMPACT', 'false').lower() == 'true'
+    
+    # Maximum number of items accepted by a single bulk request
+    BULK_MAX_ITEMS = int(os.environ.get('BULK_MAX_ITEMS', 5000))
+    
+    # Rows validated and inserted per batch by file imports
+    IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE', 500))
+    
+    # Rows fetched per server-side cursor batch by streaming exports
+    EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 1000))
+    
+    # Response cache: 'memory' (in-process LRU), 'redis' or 'null' (disabled)
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'memory')
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    CACHE_DEFAULT_TTL = int(os.environ.get('CACHE_DEFAULT_TTL', 300))
+    CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', 1024))
+    CACHE_MAX_VALUE_BYTES = int(os.environ.get('CACHE_MAX_VALUE_BYTES', 256 * 1024))
+    
+    # Responses of at least COMPRESS_MIN_SIZE bytes are sent with brotli (when installed) or
+    # gzip if the client accepts it; a brotli quality of 4 is about as fast as gzip level 6
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+    COMPRESS_GZIP_LEVEL = int(os.environ.get('COMPRESS_GZIP_LEVEL', 6))
+    COMPRESS_BROTLI_QUALITY = int(os.environ.get('COMPRESS_BROTLI_QUALITY', 4))
+    
+    # Per-request timings: a Server-Timing header on every response, Prometheus histograms at
+    # /metrics (with prometheus_client), and a log line for each statement slower than the threshold
+    SERVER_TIMING = os.environ.get('SERVER_TIMING', 'true').lower() == 'true'
+    METRICS_ENDPOINT = os.environ.get('METRICS_ENDPOINT', 'true').lower() == 'true'
+    # When set, /metrics answers only requests with 'Authorization: Bearer <METRICS_TOKEN>'
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 500))
+    
+    # Password hashing: Werkzeug method and cost, e.g. 'scrypt:32768:8:1' or 'pbkdf2:sha256:1000000'.
+    # Stored hashes made with other settings are upgraded on the next successful login.
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    # Worker processes for hashing (0 hashes in the request thread), hashes allowed to
+    # run or wait before requests get a 503, and the workers' nice increment
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 16))
+    PASSWORD_HASH_NICE = int(os.environ.get('PASSWORD_HASH_NICE', 10))
+    
+    # Failed logins allowed per username from one client address, per username from any address
+    # and per client address within the window (seconds), counted in 'memory' or 'redis'
+    # (CACHE_REDIS_URL, shared by all workers). Keep the per-username limit above the per-address
+    # one, so a single address cannot lock an account.
+    LOGIN_MAX_FAILURES = int(os.environ.get('LOGIN_MAX_FAILURES', 5))
+    LOGIN_MAX_FAILURES_PER_USER = int(os.environ.get('LOGIN_MAX_FAILURES_PER_USER', 200))
+    LOGIN_MAX_FAILURES_PER_ADDRESS = int(os.environ.get('LOGIN_MAX_FAILURES_PER_ADDRESS', 50))
+    LOGIN_FAILURE_WINDOW = int(os.environ.get('LOGIN_FAILURE_WINDOW', 900))
+    LOGIN_THROTTLE_BACKEND = os.environ.get('LOGIN_THROTTLE_BACKEND', 'memory')
+    LOGIN_THROTTLE_MAX_KEYS = int(os.environ.get('LOGIN_THROTTLE_MAX_KEYS', 100_000))
+    # Reverse proxies in front of the app, whose X-Forwarded-For and X-Forwarded-Proto entries
+    # give the client address and scheme. Set it to the exact number of hops: any more lets
+    # clients pick the address the login throttle counts against.
+    PROXY_COUNT = int(os.environ.get('PROXY_COUNT', 0))
+
+class DevelopmentConfig(Config):
+    DEBUG = True
+
+class TestingConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    # In-memory SQLite shares one connection, which takes no pool options
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'
+    PASSWORD_HASH_WORKERS = 0
+    CACHE_BACKEND = 'null'
+
+class ProductionConfig(Config):
+    DEBUG = False
+    # No development fallbacks for the signing keys
+    SECRET_KEY = os.environ.get('SECRET_KEY')
+    JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY')
+    # /metrics is opt-in where it would face the public network
+    METRICS_ENDPOINT = os.environ.get('METRICS_ENDPOINT', 'false').lower() == 'true'
+    # A logout must reach every worker, so the denylist is always shared
+    DENYLIST_BACKEND = os.environ.get('DENYLIST_BACKEND', 'redis')
+    REQUIRED_SETTINGS = ('SECRET_KEY', 'JWT_SECRET_KEY')
+    REQUIRED_VALUES = {'DENYLIST_BACKEND': 'redis'}
+
+CONFIGS = {
+    'development': DevelopmentConfig,
+    'testing': TestingConfig,
+    'production': ProductionConfig,
+}
+
+def config_for(env=None):
+    """Config class for env, or the APP_ENV environment variable (default development)."""
+    env = env or os.environ.get('APP_ENV', 'development')
+    if env not in CONFIGS:
+        raise RuntimeError(f"Unknown APP_ENV {env!r}, expected one of {', '.join(CONFIGS)}")
+    config_class = CONFIGS[env]
+    missing = [name for name in getattr(config_class, 'REQUIRED_SETTINGS', ()) if not getattr(config_class, name)]
+    if missing:
+        raise RuntimeError(f"{env} configuration needs {', '.join(missing)} set in the environment")
+    wrong = [f'{name}={value}' for name, value in getattr(config_class, 'REQUIRED_VALUES', {}).items()
+             if getattr(config_class, name) != value]
+    if wrong:
+        raise RuntimeError(f"{env} configuration needs {', '.join(wrong)}")
+    return config_class
@@ -0,0 +1,100 @@
+# server/engines.py
+from functools import wraps
+
+from flask import current_app, g
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+
+READ_ENGINE_EXTENSION = 'read_engine'
+
+class RoutingSession(Session):
+    """Session that sends queries made in read-only requests to the read engine.
+
+    Anything flushed still goes to the primary engine, so a resource wrongly
+    marked read-only fails safe rather than writing through a read connection.
+    """
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and g.get('read_only'):
+            read_engine = current_app.extensions.get(READ_ENGINE_EXTENSION)
+            if read_engine is not None:
+                return read_engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+def read_only(fn):
+    """Run a resource method's queries on the read engine, when one is configured."""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        g.read_only = True
+        return fn(*args, **kwargs)
+    return wrapper
+
+def sqlite_file(url):
+    """True for a SQLite database stored in a file (not in memory)."""
+    url = make_url(url)
+    return url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:')
+
+def sqlite_pragmas(config):
+    return {
+        'journal_mode': 'WAL',
+        'synchronous': config['SQLITE_SYNCHRONOUS'],
+        'busy_timeout': config['SQLITE_BUSY_TIMEOUT'],
+        'mmap_size': config['SQLITE_MMAP_SIZE'],
+        'cache_size': config['SQLITE_CACHE_SIZE'],
+    }
+
+def tune_sqlite(engine, pragmas, begin='BEGIN'):
+    """Apply pragmas to every new connection and take over transaction control.
+
+    pysqlite only opens a transaction before data changes, so reads would
+    each see a different snapshot, and a read that later writes gets
+    SQLITE_BUSY with no waiting at all. Emitting BEGIN ourselves fixes both;
+    BEGIN IMMEDIATE on the writer takes the write lock up front, where
+    busy_timeout can wait for it. With begin=None every statement runs in
+    autocommit mode instead, for connections that only ever read once.
+    """
+    @event.listens_for(engine, 'connect')
+    def on_connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+        cursor.close()
+
+    if begin is None:
+        return
+    
+    @event.listens_for(engine, 'begin')
+    def on_begin(connection):
+        connection.exec_driver_sql(begin)
+
+def init_database(app, db):
+    """db.init_app, plus SQLite tuning and the read engine when configured.
+
+    With SQLITE_TUNING on a SQLite file, each process writes through at most
+    SQLITE_WRITER_CONNECTIONS connections (one by default), so its writers
+    queue in the pool instead of contending for the database lock, while
+    read-only requests use a separate pool of query_only connections that
+    WAL lets read alongside the writer. SQLALCHEMY_READ_DATABASE_URI points
+    the read engine at a replica for other databases.
+    """
+    uri = app.config['SQLALCHEMY_DATABASE_URI']
+    options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+    tuned = app.config.get('SQLITE_TUNING') and sqlite_file(uri)
+    if tuned:
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = dict(
+            options, pool_size=app.config['SQLITE_WRITER_CONNECTIONS'], max_overflow=0
+        )
+    db.init_app(app)
+
+    pragmas = sqlite_pragmas(app.config) if tuned else None
+    if tuned:
+        with app.app_context():
+            tune_sqlite(db.engine, pragmas, begin='BEGIN IMMEDIATE')
+
+    read_uri = app.config.get('SQLALCHEMY_READ_DATABASE_URI') or (uri if tuned else None)
+    if read_uri:
+        read_engine = create_engine(read_uri, **options)
+        if sqlite_file(read_uri):
+            tune_sqlite(read_engine, dict(pragmas or sqlite_pragmas(app.config), query_only='ON'))
+        app.extensions[READ_ENGINE_EXTENSION] = read_engine
@@ -0,0 +1,107 @@
+# server/exporter.py
+import csv
+import io
+import zlib
+
+from sqlalchemy import select
+
+from models import db, Expense, Paycheck
+from money import as_number
+from serializers import dumps
+
+EXPORT_FORMATS = ('csv', 'ndjson')
+
+# Columns written for each exported row, in CSV column order
+EXPORT_FIELDS = ('type', 'id', 'time_period_id', 'date', 'description', 'amount',
+                 'category', 'currency', 'is_recurring', 'recurrence_interval')
+
+EXPENSES = Expense.__table__.c
+PAYCHECKS = Paycheck.__table__.c
+
+EXPORT_COLUMNS = {
+    'expense': (EXPENSES.id, EXPENSES.time_period_id, EXPENSES.due_date, EXPENSES.description,
+                EXPENSES.amount, EXPENSES.category, EXPENSES.currency, EXPENSES.is_recurring,
+                EXPENSES.recurrence_interval),
+    'paycheck': (PAYCHECKS.id, PAYCHECKS.time_period_id, PAYCHECKS.date_received, PAYCHECKS.amount,
+                 PAYCHECKS.currency),
+}
+
+def _statement(row_type, user_id, filters):
+    columns = EXPENSES if row_type == 'expense' else PAYCHECKS
+    date_column = columns.due_date if row_type == 'expense' else columns.date_received
+    statement = select(*EXPORT_COLUMNS[row_type]).where(columns.user_id == user_id)
+    if 'date_from' in filters:
+        statement = statement.where(date_column >= filters['date_from'])
+    if 'date_to' in filters:
+        statement = statement.where(date_column <= filters['date_to'])
+    return statement.order_by(date_column, columns.id)
+
+def iter_records(user_id, filters, batch_size=1000):
+    """Yield lists of export records, one server-side cursor batch at a time."""
+    for row_type in ('expense', 'paycheck'):
+        result = db.session.execute(
+            _statement(row_type, user_id, filters).execution_options(yield_per=batch_size)
+        )
+        for rows in result.partitions():
+            if row_type == 'expense':
+                yield [
+                    {
+                        'type': 'expense', 'id': row[0], 'time_period_id': row[1],
+                        'date': row[2].isoformat() if row[2] else None,
+                        'description': row[3], 'amount': row[4], 'category': row[5],
+                        'currency': row[6], 'is_recurring': row[7],
+                        'recurrence_interval': row[8]
+                    }
+                    for row in rows
+                ]
+            else:
+                yield [
+                    {
+                        'type': 'paycheck', 'id': row[0], 'time_period_id': row[1],
+                        'date': row[2].isoformat() if row[2] else None,
+                        'description': None, 'amount': row[3], 'category': None,
+                        'currency': row[4], 'is_recurring': None,
+                        'recurrence_interval': None
+                    }
+                    for row in rows
+                ]
+
+# is_recurring as the JSON literals, which the importer reads back (csv would write True/False)
+CSV_BOOLEANS = {True: 'true', False: 'false'}
+
+def encode_csv(batches):
+    """Encode record batches as UTF-8 CSV, header first."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS, lineterminator='\n')
+    writer.writeheader()
+    yield buffer.getvalue().encode()
+    for records in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        for record in records:
+            record['is_recurring'] = CSV_BOOLEANS.get(record['is_recurring'])
+        writer.writerows(records)
+        yield buffer.getvalue().encode()
+
+def encode_ndjson(batches):
+    """Encode record batches as newline delimited JSON, compact like the API's JSON_COMPACT output."""
+    for records in batches:
+        # Decimal amounts are written as numbers, see money.as_number
+        yield b''.join(dumps(record, default=as_number) for record in records)
+
+def gzip_stream(chunks):
+    """Gzip a stream of byte chunks incrementally."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+def export_stream(user_id, filters, export_format, compress=False, batch_size=1000):
+    """Build the byte stream for an export without materializing the result set."""
+    batches = iter_records(user_id, filters, batch_size)
+    chunks = encode_csv(batches) if export_format == 'csv' else encode_ndjson(batches)
+    if compress:
+        return gzip_stream(chunks)
+    return chunks
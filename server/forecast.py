@@ -0,0 +1,388 @@
+# server/forecast.py
+import calendar
+from datetime import timedelta
+
+import numpy as np
+from sqlalchemy import func, select
+
+from models import db, TimePeriod, Expense, Paycheck
+from money import to_cents
+from rates import rate_cache, convert
+from rollups import DEFAULT_CURRENCY
+
+# Recurrence intervals as (unit, step); also used for time period types
+INTERVALS = {
+    'daily': ('days', 1),
+    'weekly': ('days', 7),
+    'bi-weekly': ('days', 14),
+    'biweekly': ('days', 14),
+    'fortnightly': ('days', 14),
+    'monthly': ('months', 1),
+    'bi-monthly': ('months', 2),
+    'quarterly': ('months', 3),
+    'semi-annually': ('months', 6),
+    'yearly': ('months', 12),
+    'annually': ('months', 12),
+}
+
+GRANULARITIES = ('day', 'week', 'month')
+
+# Monte Carlo limits: scenarios x days is the size of the simulated balance array
+MAX_SIMULATION_CELLS = 5_000_000
+DISCRETIONARY_LOOKBACK_DAYS = 90
+
+# Days a paycheck may land off its time period's cadence and still count as the next one
+CADENCE_TOLERANCE_DAYS = 3
+
+def parse_interval(value):
+    """Map a recurrence interval or time period type onto (unit, step), or None."""
+    if not value:
+        return None
+    return INTERVALS.get(value.strip().lower().replace('_', '-').replace(' ', '-'))
+
+def occurrence_offsets(anchor, interval, start, end):
+    """Day offsets from start of a schedule anchored at anchor that fall within [start, end].
+    
+    Starts from the first occurrence on or after start, so the cost is
+    proportional to the occurrences in the window, not to the schedule's age.
+    Month-based schedules are always computed from the anchor and clamped to
+    the end of shorter months, so a schedule on the 31st lands on Feb 28 and
+    then back on Mar 31, instead of drifting to the 28th.
+    """
+    unit, step = interval
+    days = (end - start).days + 1
+    if unit == 'days':
+        return np.arange(_first_offset(anchor, step, start), days, step)
+    
+    lo = max(0, ((start.year - anchor.year) * 12 + start.month - anchor.month) // step)
+    hi = ((end.year - anchor.year) * 12 + end.month - anchor.month) // step
+    months = np.datetime64(anchor, 'M') + np.arange(lo, hi + 1) * step
+    month_end = (months + 1).astype('datetime64[D]') - 1
+    dates = np.minimum(months.astype('datetime64[D]') + (anchor.day - 1), month_end)
+    offsets = (dates - np.datetime64(start, 'D')).astype(np.int64)
+    return offsets[(offsets >= 0) & (offsets < days)]
+
+def _first_offset(anchor, step, start):
+    """Day offset from start of the first occurrence on or after start of a schedule every step days."""
+    skip = max(0, -(-(start - anchor).days // step))
+    return (anchor - start).days + skip * step
+
+def report_rates(user_id, report_currency, on):
+    """Rates into report_currency for every currency the user has rows in, or None."""
+    if not report_currency:
+        return None
+    currencies = db.session.execute(
+        select(func.coalesce(Expense.currency, DEFAULT_CURRENCY)).where(Expense.user_id == user_id)
+        .union(select(func.coalesce(Paycheck.currency, DEFAULT_CURRENCY)).where(Paycheck.user_id == user_id))
+    ).scalars().all()
+    return rate_cache.rates(currencies, report_currency, on)
+
+def _in_report_currency(amount, currency, rates):
+    return amount if rates is None else convert(amount, rates[currency])
+
+def _expense_schedules(user_id, start, end, rates=None):
+    rows = db.session.execute(
+        select(Expense.due_date, Expense.amount, Expense.is_recurring, Expense.recurrence_interval,
+               func.coalesce(Expense.currency, DEFAULT_CURRENCY))
+        .where(Expense.user_id == user_id, Expense.due_date.isnot(None), Expense.due_date <= end)
+    )
+    for due_date, amount, is_recurring, recurrence_interval, currency in rows:
+        interval = parse_interval(recurrence_interval) if is_recurring else None
+        if interval is None and due_date < start:
+            continue
+        yield due_date, interval, -_in_report_currency(amount, currency, rates)
+
+def _add_months(day, months):
+    """day moved by whole months, clamped to the end of shorter months."""
+    month = day.month - 1 + months
+    year, month = day.year + month // 12, month % 12 + 1
+    return day.replace(year=year, month=month, day=min(day.day, calendar.monthrange(year, month)[1]))
+
+def _follows_cadence(previous, latest, interval):
+    """Whether latest falls one interval after previous, give or take CADENCE_TOLERANCE_DAYS."""
+    unit, step = interval
+    expected = previous + timedelta(days=step) if unit == 'days' else _add_months(previous, step)
+    return abs((latest - expected).days) <= CADENCE_TOLERANCE_DAYS
+
+def _paycheck_schedules(user_id, start, end, rates=None):
+    # Paychecks have no recurring flag, so a time period and currency only
+    # repeats when its latest two paychecks are one period apart. It repeats
+    # from the latest one, at its amount; everything else, including a lone
+    # paycheck, is one-off history.
+    currency = func.coalesce(Paycheck.currency, DEFAULT_CURRENCY)
+    recency = func.row_number().over(
+        partition_by=(Paycheck.time_period_id, currency),
+        order_by=(Paycheck.date_received.desc(), Paycheck.id.desc()),
+    )
+    ranked = (
+        select(Paycheck.id, Paycheck.time_period_id, Paycheck.amount, currency.label('currency'),
+               Paycheck.date_received, recency.label('recency'))
+        .where(Paycheck.user_id == user_id, Paycheck.date_received.isnot(None))
+        .subquery()
+    )
+    recent = db.session.execute(
+        select(ranked.c.id, ranked.c.time_period_id, ranked.c.amount, ranked.c.currency,
+               ranked.c.date_received, ranked.c.recency, TimePeriod.type)
+        .join(TimePeriod, TimePeriod.id == ranked.c.time_period_id)
+        .where(ranked.c.recency <= 2)
+    ).all()
+    previous = {(row.time_period_id, row.currency): row.date_received for row in recent if row.recency == 2}
+    anchors = set()
+    for row in recent:
+        interval = parse_interval(row.type)
+        before = previous.get((row.time_period_id, row.currency))
+        if row.recency != 1 or interval is None or before is None \
+                or not _follows_cadence(before, row.date_received, interval):
+            continue
+        anchors.add(row.id)
+        yield row.date_received, interval, _in_report_currency(row.amount, row.currency, rates)
+    
+    history = db.session.execute(
+        select(Paycheck.id, Paycheck.amount, currency, Paycheck.date_received)
+        .where(Paycheck.user_id == user_id, Paycheck.date_received.between(start, end))
+    )
+    for paycheck_id, amount, row_currency, date_received in history:
+        if paycheck_id not in anchors:
+            yield date_received, None, _in_report_currency(amount, row_currency, rates)
+
+def _discretionary_rate(user_id, start, rates=None):
+    """Average daily one-off spend in cents over the DISCRETIONARY_LOOKBACK_DAYS before start."""
+    since = start - timedelta(days=DISCRETIONARY_LOOKBACK_DAYS)
+    currency = func.coalesce(Expense.currency, DEFAULT_CURRENCY)
+    totals = db.session.execute(
+        select(currency, func.sum(Expense.amount))
+        .where(Expense.user_id == user_id, Expense.is_recurring.isnot(True),
+               Expense.due_date >= since, Expense.due_date < start)
+        .group_by(currency)
+    )
+    total = sum(_in_report_currency(amount, row_currency, rates) for row_currency, amount in totals)
+    return to_cents(total) / DISCRETIONARY_LOOKBACK_DAYS
+
+def daily_flows(schedules, start, end):
+    """Per-day income and expenses in cents of (anchor, interval, amount) schedules over [start, end].
+    
+    Each schedule is added straight into the days it falls on, as a strided
+    slice for day-based intervals, so occurrences are never collected. Amounts
+    are integer cents, so daily and running totals stay exact.
+    """
+    days = (end - start).days + 1
+    income = np.zeros(days, dtype=np.int64)
+    expenses = np.zeros(days, dtype=np.int64)
+    for anchor, interval, amount in schedules:
+        cents = to_cents(amount)
+        daily, cents = (income, cents) if cents > 0 else (expenses, -cents)
+        if not cents:
+            continue
+        if interval is None:
+            if start <= anchor <= end:
+                daily[(anchor - start).days] += cents
+        elif interval[0] == 'days':
+            daily[_first_offset(anchor, interval[1], start)::interval[1]] += cents
+        else:
+            # A schedule's month offsets are distinct, so a fancy-indexed add is exact
+            daily[occurrence_offsets(anchor, interval, start, end)] += cents
+    return income, expenses
+
+def flow_arrays(schedules, start, end):
+    """Day offsets from start and amounts in cents of every occurrence of (anchor, interval, amount) schedules.
+    
+    For flows that move one occurrence at a time, like the simulation's
+    jittered paychecks; daily_flows is cheaper when only the days matter.
+    """
+    offsets, amounts = [], []
+    for anchor, interval, amount in schedules:
+        if interval is not None:
+            hits = occurrence_offsets(anchor, interval, start, end)
+        elif start <= anchor <= end:
+            hits = np.array([(anchor - start).days])
+        else:
+            continue
+        offsets.append(hits)
+        amounts.append(np.full(hits.size, to_cents(amount), dtype=np.int64))
+    if not offsets:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return np.concatenate(offsets), np.concatenate(amounts)
+
+def bucket_keys(start, days, granularity):
+    """First day of the bucket each day offset falls in, as datetime64[D]."""
+    dates = np.datetime64(start, 'D') + np.arange(days)
+    if granularity == 'week':
+        # 1970-01-01 was a Thursday, weekday 3 counting from Monday
+        return dates - (dates.astype(np.int64) + 3) % 7
+    if granularity == 'month':
+        return dates.astype('datetime64[M]').astype('datetime64[D]')
+    return dates
+
+def bucket_bounds(keys):
+    """Index of the first and last entry of each run of equal keys."""
+    first = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    last = np.r_[first[1:], keys.size] - 1
+    return first, last
+
+def _amount(cents):
+    return round(float(cents) / 100, 2)
+
+def _day(start, offset):
+    return (start + timedelta(days=int(offset))).isoformat()
+
+def project(user_id, start, end, granularity='day', starting_balance=0, report_currency=None):
+    """Project a user's recurring and one-off flows over [start, end].
+    
+    Expenses recur when marked is_recurring with a recurrence_interval.
+    Paychecks recur at their time period's cadence only when the latest two
+    in the period (and currency) are one period apart, within
+    CADENCE_TOLERANCE_DAYS. With report_currency, amounts are converted at
+    the rates in effect on start.
+    """
+    rates = report_rates(user_id, report_currency, start)
+    schedules = (*_expense_schedules(user_id, start, end, rates),
+                 *_paycheck_schedules(user_id, start, end, rates))
+    result = projection(schedules, start, end, granularity, starting_balance)
+    if report_currency:
+        result['report_currency'] = report_currency
+    return result
+
+def projection(schedules, start, end, granularity='day', starting_balance=0):
+    """Project (anchor, interval, amount) schedules over [start, end].
+    
+    Returns per-bucket income, expenses and closing balance, only for buckets
+    with activity, together with the lowest end-of-day balance and the first
+    day the balance drops below zero.
+    """
+    days = (end - start).days + 1
+    income, expenses = daily_flows(schedules, start, end)
+    starting = to_cents(starting_balance)
+    balance = starting + np.cumsum(income - expenses)
+    
+    lowest = int(np.argmin(balance))
+    if balance[lowest] < starting:
+        lowest_balance, lowest_date = balance[lowest], _day(start, lowest)
+    else:
+        lowest_balance, lowest_date = starting, start.isoformat()
+    shortfall = np.flatnonzero(balance < 0)
+    
+    buckets = []
+    active = np.flatnonzero((income != 0) | (expenses != 0))
+    if active.size:
+        keys = bucket_keys(start, days, granularity)[active]
+        first, last = bucket_bounds(keys)
+        bucket_income = np.add.reduceat(income[active], first)
+        bucket_expenses = np.add.reduceat(expenses[active], first)
+        bucket_balance = balance[active[last]]
+        buckets = [
+            {
+                'start': str(keys[index]),
+                'income': _amount(bucket_income[i]),
+                'expenses': _amount(bucket_expenses[i]),
+                'balance': _amount(bucket_balance[i])
+            }
+            for i, index in enumerate(first)
+        ]
+    
+    return {
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'granularity': granularity,
+        'starting_balance': _amount(starting),
+        'ending_balance': _amount(balance[-1]),
+        'total_income': _amount(income.sum()),
+        'total_expenses': _amount(expenses.sum()),
+        'lowest_balance': _amount(lowest_balance),
+        'lowest_balance_date': lowest_date,
+        'shortfall_date': _day(start, shortfall[0]) if shortfall.size else None,
+        'buckets': buckets
+    }
+
+def _percentiles(values, axis=None):
+    p5, p50, p95 = np.percentile(values, (5, 50, 95), axis=axis)
+    return p5, p50, p95
+
+def simulate(user_id, start, end, granularity='month', starting_balance=0, scenarios=1000,
+             paycheck_jitter_days=3, spend_variation=0.25, shortfall_threshold=0, seed=None,
+             report_currency=None):
+    """Monte Carlo forecast of a user's flows over [start, end].
+    
+    With report_currency, amounts are converted at the rates in effect on start.
+    """
+    rates = report_rates(user_id, report_currency, start)
+    # Paychecks just outside the window can be shifted into it
+    padding = timedelta(days=paycheck_jitter_days)
+    result = simulation(
+        list(_expense_schedules(user_id, start, end, rates)),
+        list(_paycheck_schedules(user_id, start - padding, end + padding, rates)),
+        _discretionary_rate(user_id, start, rates), start, end, granularity, starting_balance,
+        scenarios, paycheck_jitter_days, spend_variation, shortfall_threshold, seed
+    )
+    if report_currency:
+        result['report_currency'] = report_currency
+    return result
+
+def simulation(expense_schedules, paycheck_schedules, rate, start, end, granularity='month',
+               starting_balance=0, scenarios=1000, paycheck_jitter_days=3, spend_variation=0.25,
+               shortfall_threshold=0, seed=None):
+    """Simulate scenarios of the given schedules over [start, end].
+    
+    Every scenario shifts each paycheck by up to paycheck_jitter_days either
+    way and draws daily discretionary spend around rate, in cents per day,
+    with coefficient of variation spend_variation. Scheduled expenses are the
+    same in every scenario. The scenarios are simulated together as a
+    (scenarios, days) array.
+    """
+    days = (end - start).days + 1
+    rng = np.random.default_rng(seed)
+    
+    refunds, scheduled = daily_flows(expense_schedules, start, end)
+    scheduled -= refunds
+    
+    jitter = paycheck_jitter_days
+    padding = timedelta(days=jitter)
+    pay_offsets, pay_amounts = flow_arrays(paycheck_schedules, start - padding, end + padding)
+    landed = pay_offsets - jitter + rng.integers(-jitter, jitter + 1, size=(scenarios, pay_offsets.size))
+    # Paychecks landing outside the window go to a spare column that is dropped
+    landed = np.where((landed >= 0) & (landed < days), landed, days)
+    cells = landed + np.arange(scenarios)[:, None] * (days + 1)
+    income = np.bincount(cells.ravel(), weights=np.broadcast_to(pay_amounts, cells.shape).ravel(),
+                         minlength=scenarios * (days + 1)).reshape(scenarios, days + 1)[:, :days]
+    
+    # Lognormal multipliers with mean 1 keep spend positive and unbiased
+    sigma = np.sqrt(np.log1p(spend_variation ** 2))
+    discretionary = rate * rng.lognormal(-sigma ** 2 / 2, sigma, size=(scenarios, days))
+    
+    starting, threshold = to_cents(starting_balance), to_cents(shortfall_threshold)
+    balances = starting + np.cumsum(income - scheduled - discretionary, axis=1)
+    lowest = balances.min(axis=1)
+    ending = balances[:, -1]
+    
+    median_path = np.median(balances, axis=0)
+    keys = bucket_keys(start, days, granularity)
+    first, last = bucket_bounds(keys)
+    bucket_p5, bucket_p50, bucket_p95 = _percentiles(balances[:, last], axis=0)
+    
+    def summary(values):
+        p5, p50, p95 = _percentiles(values)
+        return {'p5': _amount(p5), 'p50': _amount(p50), 'p95': _amount(p95)}
+    
+    return {
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'granularity': granularity,
+        'scenarios': scenarios,
+        'starting_balance': _amount(starting),
+        'daily_discretionary_spend': _amount(rate),
+        'shortfall_threshold': _amount(threshold),
+        'shortfall_probability': round(float(np.mean(lowest < threshold)), 4),
+        'ending_balance': summary(ending),
+        'lowest_balance': summary(lowest),
+        'lowest_balance_date': _day(start, np.argmin(median_path)),
+        'buckets': [
+            {
+                'start': str(keys[index]),
+                'balance': {
+                    'p5': _amount(bucket_p5[i]),
+                    'p50': _amount(bucket_p50[i]),
+                    'p95': _amount(bucket_p95[i])
+                }
+            }
+            for i, index in enumerate(first)
+        ]
+    }
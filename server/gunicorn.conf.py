@@ -0,0 +1,57 @@
+# server/gunicorn.conf.py
+# Gunicorn settings for production, all overridable from the environment:
+#
+#   APP_ENV=production SECRET_KEY=... JWT_SECRET_KEY=... gunicorn -c gunicorn.conf.py wsgi:app
+import multiprocessing
+import os
+
+os.environ.setdefault('APP_ENV', 'production')
+
+bind = os.environ.get('GUNICORN_BIND', f"0.0.0.0:{os.environ.get('PORT', '5555')}")
+
+# Processes x threads is the number of requests served at once. Threads suit this
+# I/O bound API; keep DB_POOL_SIZE at least GUNICORN_THREADS so threads never wait
+# for a connection.
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+# Seconds a silent worker lives before being killed, and that in-flight requests
+# get to finish after SIGTERM before workers are stopped
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+# Recycle workers now and then so slow leaks cannot build up; jitter keeps them
+# from all restarting together
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 10000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 1000))
+
+# Importing the app in the master saves memory but shares its state with every fork
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'false').lower() == 'true'
+
+accesslog = os.environ.get('GUNICORN_ACCESSLOG')
+errorlog = '-'
+
+def on_starting(server):
+    # A per-process denylist would let a token revoked in one worker through the others
+    if server.cfg.workers > 1:
+        from config import config_for
+        if config_for().DENYLIST_BACKEND != 'redis':
+            raise RuntimeError('More than one worker needs DENYLIST_BACKEND=redis')
+
+def post_fork(server, worker):
+    if preload_app:
+        from wsgi import release_connections
+        release_connections(close=False)
+
+def worker_exit(server, worker):
+    from wsgi import shutdown
+    shutdown()
+
+def child_exit(server, worker):
+    # With PROMETHEUS_MULTIPROC_DIR set, /metrics adds up every worker's samples,
+    # kept in files there; prometheus_client needs to know when a worker is gone
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
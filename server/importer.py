@@ -0,0 +1,347 @@
+# server/importer.py
+import codecs
+import csv
+import hashlib
+import re
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from sqlalchemy import select, tuple_
+from marshmallow import ValidationError
+
+from models import db, Expense, Paycheck
+from money import to_decimal
+from bulk import batched, insert_rows
+
+IMPORT_FORMATS = ('csv', 'qif', 'ofx')
+STOP = 'stop'
+SKIP = 'skip'
+ON_ERROR_MODES = (STOP, SKIP)
+
+# Cap on the number of errors reported back, so a bad file cannot grow the response
+MAX_REPORTED_ERRORS = 100
+
+# Accepted CSV header names for each normalized record field
+CSV_COLUMNS = {
+    'date': ('date', 'due_date', 'date_received', 'posted', 'posted_date', 'transaction_date'),
+    'amount': ('amount', 'value'),
+    'description': ('description', 'memo', 'payee', 'name', 'details'),
+    'category': ('category',),
+    'currency': ('currency',),
+    'is_recurring': ('is_recurring', 'recurring'),
+    'recurrence_interval': ('recurrence_interval', 'interval'),
+}
+
+# Bank export categories mapped onto the categories used in the app
+CATEGORY_ALIASES = {
+    'groceries': 'Food',
+    'restaurants': 'Food',
+    'dining': 'Food',
+    'food & dining': 'Food',
+    'rent': 'Housing',
+    'mortgage': 'Housing',
+    'home': 'Housing',
+    'electric': 'Utilities',
+    'gas & electric': 'Utilities',
+    'water': 'Utilities',
+    'internet': 'Utilities',
+    'phone': 'Utilities',
+    'auto insurance': 'Insurance',
+    'health insurance': 'Insurance',
+    'life insurance': 'Insurance',
+    'property tax': 'Taxes',
+    'tax': 'Taxes',
+    'movies': 'Entertainment',
+    'music': 'Entertainment',
+    'streaming': 'Entertainment',
+}
+
+DATE_FORMATS = ('%Y-%m-%d', '%m/%d/%Y', '%m/%d/%y', '%d.%m.%Y', '%Y%m%d')
+
+def read_chunks(stream, chunk_size=64 * 1024, encoding='utf-8-sig'):
+    """Yield decoded text chunks from a binary stream."""
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        yield decoder.decode(chunk)
+    tail = decoder.decode(b'', final=True)
+    if tail:
+        yield tail
+
+def iter_lines(chunks):
+    """Yield (line_number, line) pairs from text chunks, one line in memory at a time."""
+    buffer = ''
+    line_number = 0
+    for chunk in chunks:
+        buffer += chunk
+        lines = buffer.splitlines(keepends=True)
+        # The last piece may be an incomplete line; carry it into the next chunk
+        buffer = lines.pop() if lines and not lines[-1].endswith(('\n', '\r')) else ''
+        for line in lines:
+            line_number += 1
+            yield line_number, line.rstrip('\r\n')
+    if buffer:
+        yield line_number + 1, buffer
+
+def parse_date(value):
+    value = (value or '').strip()
+    # QIF writes two digit years after 2000 as 1/15'25
+    value = value.replace("'", '/20') if "'" in value else value
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).date().isoformat()
+        except ValueError:
+            continue
+    return value or None
+
+def parse_amount(value):
+    try:
+        return Decimal((value or '').replace(',', '').replace('$', '').strip())
+    except InvalidOperation:
+        return value
+
+def parse_csv(lines):
+    """Yield (line_number, record) from CSV lines with a header row."""
+    reader = csv.reader(line for _, line in lines)
+    header = None
+    for values in reader:
+        if not any(value.strip() for value in values):
+            continue
+        if header is None:
+            names = [name.strip().lower() for name in values]
+            header = {
+                field: names.index(alias)
+                for field, aliases in CSV_COLUMNS.items()
+                for alias in aliases if alias in names
+            }
+            continue
+        
+        record = {
+            field: values[index].strip()
+            for field, index in header.items() if index < len(values)
+        }
+        record['date'] = parse_date(record.get('date'))
+        record['amount'] = parse_amount(record.get('amount'))
+        yield reader.line_num, record
+
+def parse_qif(lines):
+    """Yield (line_number, record) from QIF lines; amounts are signed."""
+    record = {}
+    start = None
+    for line_number, line in lines:
+        if not line or line.startswith('!'):
+            continue
+        code, value = line[0], line[1:].strip()
+        if start is None:
+            start = line_number
+        if code == '^':
+            if record:
+                yield start, record
+            record, start = {}, None
+        elif code == 'D':
+            record['date'] = parse_date(value)
+        elif code in ('T', 'U'):
+            record['amount'] = parse_amount(value)
+        elif code == 'P':
+            record['description'] = value
+        elif code == 'M':
+            record.setdefault('description', value)
+        elif code == 'L':
+            record['category'] = value.split(':')[0]
+    if record:
+        yield start, record
+
+OFX_TOKEN = re.compile(r'<(/?[A-Za-z0-9.]+)>([^<]*)')
+
+def parse_ofx(chunks):
+    """Yield (line_number, record) for each <STMTTRN> in OFX text; amounts are signed.
+    
+    Works on both SGML (unclosed tags) and XML style files by tokenizing a
+    rolling buffer, so the whole document is never held in memory.
+    """
+    buffer = ''
+    line_number = 1
+    record = None
+    start = None
+    for chunk in chunks:
+        buffer += chunk
+        # Only tokenize up to the last complete tag
+        cut = buffer.rfind('<')
+        text, buffer = buffer[:cut], buffer[cut:]
+        position = 0
+        for match in OFX_TOKEN.finditer(text):
+            line_number += text.count('\n', position, match.start())
+            position = match.start()
+            tag, value = match.group(1).upper(), match.group(2).strip()
+            if tag == 'STMTTRN':
+                record, start = {}, line_number
+            elif tag == '/STMTTRN' and record is not None:
+                yield start, record
+                record = None
+            elif record is not None:
+                if tag == 'DTPOSTED':
+                    record['date'] = parse_date(value[:8])
+                elif tag == 'TRNAMT':
+                    record['amount'] = parse_amount(value)
+                elif tag == 'NAME':
+                    record['description'] = value
+                elif tag == 'MEMO':
+                    record.setdefault('description', value)
+        line_number += text.count('\n', position)
+    if record:
+        yield start, record
+
+def map_category(category):
+    if not category:
+        return None
+    return CATEGORY_ALIASES.get(category.strip().lower(), category.strip())
+
+def to_row(model, record, signed):
+    """Map a parsed record onto schema input for model, or None if it does not apply.
+    
+    Signed formats (QIF/OFX) carry debits as negative amounts: debits become
+    expenses and credits become paychecks.
+    """
+    amount = record.get('amount')
+    if signed and isinstance(amount, Decimal):
+        if (model is Expense) != (amount < 0):
+            return None
+        amount = abs(amount)
+    
+    if model is Expense:
+        row = {
+            'description': record.get('description'),
+            'amount': amount,
+            'due_date': record.get('date'),
+            'category': map_category(record.get('category')),
+        }
+        if record.get('is_recurring'):
+            row['is_recurring'] = record['is_recurring']
+        if record.get('recurrence_interval'):
+            row['recurrence_interval'] = record['recurrence_interval']
+    else:
+        row = {'amount': amount, 'date_received': record.get('date')}
+    if record.get('currency'):
+        row['currency'] = record['currency']
+    return {field: value for field, value in row.items() if value is not None}
+
+def row_hash(row_date, amount, description):
+    """Hash identifying a transaction by (date, amount, description) for dedupe."""
+    key = f"{row_date}|{to_decimal(amount)}|{(description or '').strip().lower()}"
+    return hashlib.sha1(key.encode()).hexdigest()
+
+def _hash_row(model, row):
+    if model is Expense:
+        return row_hash(row.get('due_date'), row['amount'], row.get('description'))
+    return row_hash(row.get('date_received'), row['amount'], None)
+
+def _existing_hashes(model, user_id, rows):
+    """Hashes of the user's stored rows sharing a date and amount with rows.
+    
+    Uses the (user_id, date) index, so the cost depends on the batch, not on
+    the size of the user's history.
+    """
+    if model is Expense:
+        columns = (Expense.due_date, Expense.amount, Expense.description)
+        date_column = Expense.due_date
+    else:
+        columns = (Paycheck.date_received, Paycheck.amount)
+        date_column = Paycheck.date_received
+    
+    date_key = date_column.key
+    result = db.session.execute(
+        select(*columns).where(
+            model.user_id == user_id,
+            # The plain IN lets the (user_id, date) index narrow the scan
+            date_column.in_({row.get(date_key) for row in rows}),
+            tuple_(date_column, model.amount).in_({(row.get(date_key), row['amount']) for row in rows})
+        )
+    )
+    return {
+        row_hash(row[0], row[1], row[2] if len(row) > 2 else None)
+        for row in result
+    }
+
+def run_import(model, schema, records, user_id, time_period_id, signed=False,
+               batch_size=500, start_line=1, on_error=STOP):
+    """Validate, dedupe and insert parsed records in batches, committing each batch.
+    
+    Only one batch is held in memory at a time. Returns a report with counts,
+    errors by line number and, when stopped on an error, the line to resume from.
+    """
+    report = {
+        'imported': 0,
+        'duplicates': 0,
+        'skipped': 0,
+        'errors': [],
+        'last_line': None,
+        'resume_from_line': None,
+    }
+    
+    def add_error(line, messages):
+        if len(report['errors']) < MAX_REPORTED_ERRORS:
+            report['errors'].append({'line': line, 'messages': messages})
+    
+    for batch in batched(((line, record) for line, record in records if line >= start_line), batch_size):
+        lines = []
+        items = []
+        for line, record in batch:
+            row = to_row(model, record, signed)
+            if row is None:
+                report['skipped'] += 1
+                continue
+            row['user_id'] = user_id
+            row['time_period_id'] = time_period_id
+            lines.append(line)
+            items.append(row)
+        
+        rows = []
+        errors = {}
+        if items:
+            try:
+                rows = schema.load(items)
+            except ValidationError as err:
+                errors = err.messages
+                rows = err.valid_data
+        
+        # In stop mode, only keep the rows before the first failing line
+        limit = min(errors) if errors and on_error == STOP else len(items)
+        for index in sorted(errors):
+            add_error(lines[index], errors[index])
+            if on_error == STOP:
+                break
+        
+        valid = [(lines[i], rows[i]) for i in range(limit) if i not in errors]
+        seen = _existing_hashes(model, user_id, [row for _, row in valid]) if valid else set()
+        to_insert = []
+        for line, row in valid:
+            digest = _hash_row(model, row)
+            if digest in seen:
+                report['duplicates'] += 1
+                continue
+            seen.add(digest)
+            to_insert.append(row)
+        
+        if to_insert:
+            insert_rows(model, to_insert)
+            report['imported'] += len(to_insert)
+        db.session.commit()
+        
+        if errors and on_error == STOP:
+            report['resume_from_line'] = lines[limit]
+            report['last_line'] = lines[limit - 1] if limit else None
+            return report
+        report['last_line'] = batch[-1][0]
+    
+    return report
+
+def parse_upload(stream, import_format):
+    """Return a lazy (line_number, record) iterator for an upload, and whether amounts are signed."""
+    chunks = read_chunks(stream)
+    if import_format == 'ofx':
+        return parse_ofx(chunks), True
+    if import_format == 'qif':
+        return parse_qif(iter_lines(chunks)), True
+    return parse_csv(iter_lines(chunks)), False
@@ -0,0 +1,230 @@
+# server/metrics.py
+import hmac
+import json
+import logging
+import os
+import time
+from functools import wraps
+
+from flask import Response, current_app, g, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+try:
+    import prometheus_client
+    from prometheus_client import CollectorRegistry, Counter, Histogram, multiprocess
+except ImportError:  # pragma: no cover - no /metrics endpoint
+    prometheus_client = None
+
+METRICS_EXTENSION = 'request_metrics'
+
+# One JSON object per request, and one per statement over SLOW_QUERY_THRESHOLD_MS
+request_log = logging.getLogger('paycheck_buddy.requests')
+slow_query_log = logging.getLogger('paycheck_buddy.slow_queries')
+
+if prometheus_client is not None:
+    REQUEST_SECONDS = Histogram(
+        'paycheck_buddy_request_duration_seconds', 'Time from the start of a request to its response',
+        ('method', 'endpoint', 'status'),
+    )
+    REQUEST_QUERIES = Histogram(
+        'paycheck_buddy_request_sql_queries', 'SQL statements run by a request', ('endpoint',),
+        buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100, float('inf')),
+    )
+    REQUEST_SQL_SECONDS = Histogram(
+        'paycheck_buddy_request_sql_duration_seconds', 'Time a request spent in SQL statements', ('endpoint',),
+    )
+    REQUEST_SERIALIZE_SECONDS = Histogram(
+        'paycheck_buddy_request_serialize_duration_seconds', 'Time a request spent serializing its response',
+        ('endpoint',),
+    )
+    RESPONSE_BYTES = Histogram(
+        'paycheck_buddy_response_size_bytes', 'Response body size as sent', ('endpoint',),
+        buckets=tuple(4 ** power for power in range(4, 13)) + (float('inf'),),
+    )
+    SLOW_QUERIES = Counter(
+        'paycheck_buddy_slow_queries', 'SQL statements slower than SLOW_QUERY_THRESHOLD_MS', ('endpoint',),
+    )
+    RESPONSE_CACHE_EVENTS = Counter(
+        'paycheck_buddy_response_cache_events', 'Response cache hits, misses, stores, values too large '
+        'to store and evictions', ('event',),
+    )
+    # Children made up front; counters are thread-safe, so gthread workers share them
+    _response_cache_events = {
+        event: RESPONSE_CACHE_EVENTS.labels(event) for event in ('hit', 'miss', 'set', 'too_large', 'eviction')
+    }
+
+class RequestTimings:
+    """What one request has spent so far, kept on g while it runs."""
+    __slots__ = ('started', 'sql_count', 'sql_seconds', 'serialize_seconds', 'serializing')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.serialize_seconds = 0.0
+        self.serializing = False
+
+def current_timings():
+    """The current request's RequestTimings, or None outside a measured request."""
+    return g.get('request_timings') if has_app_context() else None
+
+def count_cache_event(event, amount=1):
+    """Count a response cache 'hit', 'miss', 'set', 'too_large' or 'eviction'."""
+    if prometheus_client is not None and amount:
+        _response_cache_events[event].inc(amount)
+
+def timed_serialization(fn):
+    """Count fn's running time as the request's serialization time.
+
+    Calls nested inside another timed call are counted once, by the outermost.
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        timings = current_timings()
+        if timings is None or timings.serializing:
+            return fn(*args, **kwargs)
+        timings.serializing = True
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            timings.serialize_seconds += time.perf_counter() - started
+            timings.serializing = False
+    return wrapper
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info['query_started'] = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    seconds = time.perf_counter() - conn.info.pop('query_started', time.perf_counter())
+    if has_app_context():
+        metrics = current_app.extensions.get(METRICS_EXTENSION)
+        if metrics is not None:
+            metrics.record_query(statement, seconds, g.get('request_timings'))
+
+def listen_to_cursors():
+    """Time every statement on every engine, including the read and async ones."""
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+def metrics_registry():
+    """The registry /metrics exposes: every worker's samples under PROMETHEUS_MULTIPROC_DIR, else this process's."""
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return prometheus_client.REGISTRY
+
+class RequestMetrics:
+    """Wall time, SQL statements and time, serialization time and size of each request.
+
+    Each request is reported in a Server-Timing header (SERVER_TIMING), as
+    a JSON log line on the paycheck_buddy.requests logger, and in the
+    Prometheus histograms served at /metrics (METRICS_ENDPOINT, when
+    prometheus_client is installed; behind a bearer token when METRICS_TOKEN
+    is set). Statements slower than
+    SLOW_QUERY_THRESHOLD_MS are logged with their SQL and the endpoint that
+    ran them. A streamed response is measured up to its first byte.
+
+    Register it before any after_request hook that changes the body, such
+    as compression, so hooks that run later are not measured but the size
+    is the size sent.
+    """
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        # Labelled histograms per (method, endpoint, status), as labels() costs a lookup under a lock
+        self.histograms = {}
+        self.server_timing = app.config.get('SERVER_TIMING', True)
+        self.slow_query_seconds = app.config.get('SLOW_QUERY_THRESHOLD_MS', 500) / 1000
+        app.before_request(self.start)
+        app.after_request(self.finish)
+        if prometheus_client is not None and app.config.get('METRICS_ENDPOINT', True):
+            app.add_url_rule('/metrics', 'metrics', self.metrics)
+        listen_to_cursors()
+        app.extensions[METRICS_EXTENSION] = self
+
+    @staticmethod
+    def start():
+        g.request_timings = RequestTimings()
+
+    def record_query(self, statement, seconds, timings=None):
+        if timings is not None:
+            timings.sql_count += 1
+            timings.sql_seconds += seconds
+        if self.slow_query_seconds and seconds >= self.slow_query_seconds:
+            endpoint = request.endpoint if timings is not None else None
+            slow_query_log.warning(json.dumps({
+                'endpoint': endpoint,
+                'path': request.path if timings is not None else None,
+                'duration_ms': round(seconds * 1000, 3),
+                'statement': statement,
+            }))
+            if prometheus_client is not None:
+                SLOW_QUERIES.labels(endpoint or 'none').inc()
+
+    def finish(self, response):
+        timings = g.pop('request_timings', None)
+        if timings is None or request.endpoint == 'metrics':
+            return response
+        seconds = time.perf_counter() - timings.started
+        endpoint = request.endpoint or 'unmatched'
+        size = response.content_length
+
+        if self.server_timing:
+            response.headers['Server-Timing'] = (
+                f'app;dur={seconds * 1000:.2f}, '
+                f'db;dur={timings.sql_seconds * 1000:.2f};desc="{timings.sql_count} queries", '
+                f'serialize;dur={timings.serialize_seconds * 1000:.2f}'
+            )
+        if request_log.isEnabledFor(logging.INFO):
+            request_log.info(json.dumps({
+                'method': request.method,
+                'endpoint': endpoint,
+                'path': request.path,
+                'status': response.status_code,
+                'duration_ms': round(seconds * 1000, 3),
+                'sql_queries': timings.sql_count,
+                'sql_ms': round(timings.sql_seconds * 1000, 3),
+                'serialize_ms': round(timings.serialize_seconds * 1000, 3),
+                'response_bytes': size,
+            }))
+        if prometheus_client is not None:
+            request_seconds, queries, sql_seconds, serialize_seconds, response_bytes = \
+                self._histograms(request.method, endpoint, response.status_code)
+            request_seconds.observe(seconds)
+            queries.observe(timings.sql_count)
+            sql_seconds.observe(timings.sql_seconds)
+            serialize_seconds.observe(timings.serialize_seconds)
+            if size is not None:
+                response_bytes.observe(size)
+        return response
+
+    def _histograms(self, method, endpoint, status):
+        key = (method, endpoint, status)
+        histograms = self.histograms.get(key)
+        if histograms is None:
+            histograms = self.histograms[key] = (
+                REQUEST_SECONDS.labels(method, endpoint, status),
+                REQUEST_QUERIES.labels(endpoint),
+                REQUEST_SQL_SECONDS.labels(endpoint),
+                REQUEST_SERIALIZE_SECONDS.labels(endpoint),
+                RESPONSE_BYTES.labels(endpoint),
+            )
+        return histograms
+
+    @staticmethod
+    def metrics():
+        token = current_app.config.get('METRICS_TOKEN')
+        if token:
+            sent = request.headers.get('Authorization', '')
+            if not hmac.compare_digest(sent.encode(), f'Bearer {token}'.encode()):
+                return Response(status=401, headers={'WWW-Authenticate': 'Bearer'})
+        return Response(prometheus_client.generate_latest(metrics_registry()),
+                        content_type=prometheus_client.CONTENT_TYPE_LATEST)
+
+request_metrics = RequestMetrics()
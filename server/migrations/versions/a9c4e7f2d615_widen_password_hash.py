@@ -0,0 +1,33 @@
+"""Widen users.password_hash for scrypt hashes
+
+Revision ID: a9c4e7f2d615
+Revises: d2a7e4c9f316
+Create Date: 2026-10-17 17:21:05.331847
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9c4e7f2d615'
+down_revision = 'd2a7e4c9f316'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Werkzeug's default scrypt hashes are 162 characters
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.alter_column('password_hash',
+                              existing_type=sa.String(length=128),
+                              type_=sa.String(length=256),
+                              existing_nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.alter_column('password_hash',
+                              existing_type=sa.String(length=256),
+                              type_=sa.String(length=128),
+                              existing_nullable=False)
@@ -0,0 +1,48 @@
+"""Store money amounts as integer cents
+
+Revision ID: b8d3f6a1c054
+Revises: f5a0c3e9d812
+Create Date: 2026-10-17 16:02:37.418920
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8d3f6a1c054'
+down_revision = 'f5a0c3e9d812'
+branch_labels = None
+depends_on = None
+
+# Float columns holding dollar amounts, converted to integer minor units
+MONEY_COLUMNS = {
+    'expenses': ('amount',),
+    'paychecks': ('amount',),
+    'period_rollups': ('expense_total', 'income_total'),
+}
+
+
+def upgrade():
+    for table, columns in MONEY_COLUMNS.items():
+        for column in columns:
+            op.execute(f"UPDATE {table} SET {column} = ROUND({column} * 100)")
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            for column in columns:
+                batch_op.alter_column(column,
+                                      existing_type=sa.Float(),
+                                      type_=sa.BigInteger(),
+                                      existing_nullable=False,
+                                      postgresql_using=f'{column}::bigint')
+
+
+def downgrade():
+    for table, columns in MONEY_COLUMNS.items():
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            for column in columns:
+                batch_op.alter_column(column,
+                                      existing_type=sa.BigInteger(),
+                                      type_=sa.Float(),
+                                      existing_nullable=False)
+        for column in columns:
+            op.execute(f"UPDATE {table} SET {column} = {column} / 100.0")
@@ -1,17 +1,21 @@
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy.ext.associationproxy import association_proxy
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy.orm import validates
 from datetime import datetime
 
+from money import Money, to_decimal
+from passwords import password_hasher, HasherBusy
+from engines import RoutingSession
+
 # Initialize SQLAlchemy
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 class User(db.Model):
     __tablename__ = 'users'
     
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
-    password_hash = db.Column(db.String(128), nullable=False)
+    password_hash = db.Column(db.String(256), nullable=False)
     
     # Relationships
     expenses = db.relationship('Expense', back_populates='user', cascade='all, delete-orphan')
@@ -27,10 +31,18 @@ class User(db.Model):
     
     @password.setter
     def password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
     
     def verify_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        """Check a password, rehashing it in place if the hash method or cost has changed."""
+        if not password_hasher.verify(self.password_hash, password):
+            return False
+        if password_hasher.needs_rehash(self.password_hash):
+            try:
+                self.password = password
+            except HasherBusy:
+                pass  # Upgrade on a later login
+        return True
     
     def __repr__(self):
         return f'<User {self.username}>'
@@ -61,17 +73,33 @@ class Expense(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     time_period_id = db.Column(db.Integer, db.ForeignKey('time_periods.id'), nullable=False)
     description = db.Column(db.String(255), nullable=False)
-    amount = db.Column(db.Float, nullable=False)
+    amount = db.Column(Money, nullable=False)  # integer cents, see money.py
     due_date = db.Column(db.Date, nullable=True)
     is_recurring = db.Column(db.Boolean, default=False)
     recurrence_interval = db.Column(db.String(50), nullable=True)
     category = db.Column(db.String(80), nullable=True)
     currency = db.Column(db.String(3), default='USD')
     
+    # Change tracking for delta sync, stamped by versions.py on every write
+    change_seq = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Indexes for the per-user access patterns (by period, by date, by change)
+    __table_args__ = (
+        db.Index('ix_expenses_user_id_time_period_id', 'user_id', 'time_period_id'),
+        db.Index('ix_expenses_user_id_due_date', 'user_id', 'due_date'),
+        db.Index('ix_expenses_user_id_change_seq', 'user_id', 'change_seq'),
+    )
+    
     # Relationships
     user = db.relationship('User', back_populates='expenses')
     time_period = db.relationship('TimePeriod', back_populates='expenses')
     
+    @validates('amount')
+    def validate_amount(self, key, value):
+        # Keep amounts Decimal in the session so rollup deltas never mix in floats
+        return to_decimal(value)
+    
     def __repr__(self):
         return f'<Expense {self.description}: {self.amount}>'
 
@@ -81,13 +109,113 @@ class Paycheck(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     time_period_id = db.Column(db.Integer, db.ForeignKey('time_periods.id'), nullable=False)
-    amount = db.Column(db.Float, nullable=False)
+    amount = db.Column(Money, nullable=False)  # integer cents, see money.py
     date_received = db.Column(db.Date, nullable=True)
     currency = db.Column(db.String(3), default='USD')
     
+    # Change tracking for delta sync, stamped by versions.py on every write
+    change_seq = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Indexes for the per-user access patterns (by period, by date, by change)
+    __table_args__ = (
+        db.Index('ix_paychecks_user_id_time_period_id', 'user_id', 'time_period_id'),
+        db.Index('ix_paychecks_user_id_date_received', 'user_id', 'date_received'),
+        db.Index('ix_paychecks_user_id_change_seq', 'user_id', 'change_seq'),
+    )
+    
     # Relationships
     user = db.relationship('User', back_populates='paychecks')
     time_period = db.relationship('TimePeriod', back_populates='paychecks')
     
+    @validates('amount')
+    def validate_amount(self, key, value):
+        # Keep amounts Decimal in the session so rollup deltas never mix in floats
+        return to_decimal(value)
+    
+    def __repr__(self):
+        return f'<Paycheck {self.amount} on {self.date_received}>'
+
+class PeriodRollup(db.Model):
+    """Running totals per user, time period, category and currency.
+    
+    Maintained incrementally by the session hooks in rollups.py so summary
+    reads scale with the number of categories rather than the number of rows.
+    Paychecks have no category and are stored under the empty category.
+    """
+    __tablename__ = 'period_rollups'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    time_period_id = db.Column(db.Integer, db.ForeignKey('time_periods.id'), nullable=False)
+    category = db.Column(db.String(80), nullable=False, default='')
+    currency = db.Column(db.String(3), nullable=False, default='USD')
+    expense_total = db.Column(Money, nullable=False, default=0)
+    expense_count = db.Column(db.Integer, nullable=False, default=0)
+    income_total = db.Column(Money, nullable=False, default=0)
+    income_count = db.Column(db.Integer, nullable=False, default=0)
+    
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'time_period_id', 'category', 'currency',
+                            name='uq_period_rollups_key'),
+    )
+    
+    def __repr__(self):
+        return f'<PeriodRollup {self.user_id}/{self.time_period_id}/{self.category}/{self.currency}>'
+
+
+class DataVersion(db.Model):
+    """Monotonic version counters used for ETags on read endpoints.
+    
+    One row per user ('user:<id>') bumped on every expense or paycheck write,
+    and global rows bumped when time periods ('time_periods') or exchange
+    rates ('exchange_rates') change.
+    """
+    __tablename__ = 'data_versions'
+    
+    key = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<DataVersion {self.key}: {self.version}>'
+
+
+class DeletedRecord(db.Model):
+    """Tombstone for a deleted expense or paycheck, so sync clients can drop it."""
+    __tablename__ = 'deleted_records'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    record_type = db.Column(db.String(20), nullable=False)  # 'expense' or 'paycheck'
+    record_id = db.Column(db.Integer, nullable=False)
+    change_seq = db.Column(db.Integer, nullable=False)
+    deleted_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('ix_deleted_records_user_id_change_seq', 'user_id', 'change_seq'),
+    )
+    
+    def __repr__(self):
+        return f'<DeletedRecord {self.record_type} {self.record_id}>'
+
+
+class ExchangeRate(db.Model):
+    """Daily exchange rate: one unit of base is worth rate units of quote.
+    
+    Loaded from CSV with 'flask load-exchange-rates' and read through the
+    in-memory as-of cache in rates.py.
+    """
+    __tablename__ = 'exchange_rates'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    date = db.Column(db.Date, nullable=False)
+    base = db.Column(db.String(3), nullable=False)
+    quote = db.Column(db.String(3), nullable=False)
+    rate = db.Column(db.Float, nullable=False)
+    
+    __table_args__ = (
+        db.UniqueConstraint('base', 'quote', 'date', name='uq_exchange_rates_pair_date'),
+    )
+    
     def __repr__(self):
-        return f'<Paycheck {self.amount} on {self.date_received}>'
\ No newline at end of file
+        return f'<ExchangeRate {self.base}/{self.quote} {self.date}: {self.rate}>'
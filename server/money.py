@@ -0,0 +1,47 @@
+# server/money.py
+from decimal import Decimal, ROUND_HALF_UP
+
+from sqlalchemy.types import BigInteger, TypeDecorator
+
+CENT = Decimal('0.01')
+ZERO = Decimal('0.00')
+
+def to_decimal(value):
+    """value as a Decimal rounded to whole cents; floats go through their shortest repr."""
+    if value is None:
+        return None
+    if not isinstance(value, Decimal):
+        value = Decimal(str(value))
+    return value.quantize(CENT, rounding=ROUND_HALF_UP)
+
+def to_cents(value):
+    """value in integer minor units."""
+    return int(to_decimal(value).scaleb(2))
+
+def from_cents(cents):
+    """Integer minor units as a Decimal with two places."""
+    return Decimal(cents).scaleb(-2).quantize(CENT)
+
+def as_number(value):
+    """A Decimal amount as a JSON number.
+
+    The shortest repr of the float nearest a two place decimal is that decimal
+    itself (up to 15 significant digits), so the JSON text stays exact while
+    clients keep receiving numbers.
+    """
+    return None if value is None else float(value)
+
+class Money(TypeDecorator):
+    """Money amounts stored as integer minor units (cents) and exposed as Decimal.
+
+    Comparisons and arithmetic against plain values bind through the same
+    conversion, and SUM over a Money column is an exact integer sum in SQL.
+    """
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else to_cents(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else from_cents(value)
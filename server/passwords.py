@@ -0,0 +1,98 @@
+# server/passwords.py
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from werkzeug.security import generate_password_hash, check_password_hash, DEFAULT_PBKDF2_ITERATIONS
+
+DEFAULT_METHOD = 'scrypt:32768:8:1'
+
+class HasherBusy(Exception):
+    """Raised when every hashing slot is taken, so the request can be shed instead of queued."""
+
+def normalize_method(method):
+    """method with Werkzeug's implicit defaults spelled out, as it appears in stored hashes."""
+    name, *args = method.split(':')
+    if name == 'scrypt' and not args:
+        return DEFAULT_METHOD
+    if name == 'pbkdf2' and len(args) < 2:
+        return f"pbkdf2:{args[0] if args else 'sha256'}:{DEFAULT_PBKDF2_ITERATIONS}"
+    return method
+
+def hash_method(password_hash):
+    """The method and cost parameters a stored hash was made with."""
+    return password_hash.split('$', 1)[0]
+
+def _lower_priority(niceness):
+    if niceness:
+        os.nice(niceness)
+
+class PasswordHasher:
+    """Password hashing on a bounded pool of worker processes.
+
+    Hashing is deliberately CPU heavy. Running it in request threads lets a
+    burst of logins take every core and the GIL away from other endpoints, so
+    hashes run in PASSWORD_HASH_WORKERS processes (at lower priority) while the
+    request thread waits without holding the GIL. At most
+    PASSWORD_HASH_MAX_PENDING hashes may be running or queued; beyond that
+    HasherBusy is raised straight away. PASSWORD_HASH_WORKERS = 0 hashes inline.
+    """
+    def __init__(self, app=None):
+        self.method = DEFAULT_METHOD
+        self.workers = 0
+        self.niceness = 0
+        self.slots = None
+        self.pool = None
+        self.lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.shutdown()
+        self.method = normalize_method(app.config.get('PASSWORD_HASH_METHOD', DEFAULT_METHOD))
+        self.workers = app.config.get('PASSWORD_HASH_WORKERS', 0)
+        self.niceness = app.config.get('PASSWORD_HASH_NICE', 0)
+        self.slots = threading.BoundedSemaphore(max(1, app.config.get('PASSWORD_HASH_MAX_PENDING', 32)))
+        app.extensions['password_hasher'] = self
+
+    def _executor(self):
+        # Started on first use, with spawn so children never inherit request threads or open connections
+        if self.pool is None:
+            with self.lock:
+                if self.pool is None:
+                    self.pool = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context('spawn'),
+                        initializer=_lower_priority,
+                        initargs=(self.niceness,),
+                    )
+        return self.pool
+
+    def _run(self, fn, *args):
+        if not self.workers:
+            return fn(*args)
+        if not self.slots.acquire(blocking=False):
+            raise HasherBusy()
+        try:
+            return self._executor().submit(fn, *args).result()
+        finally:
+            self.slots.release()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """True when a stored hash was made with a different method or cost than configured."""
+        return hash_method(password_hash) != self.method
+
+    def shutdown(self):
+        with self.lock:
+            if self.pool is not None:
+                self.pool.shutdown(wait=True, cancel_futures=True)
+                self.pool = None
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,352 @@
+# server/queries.py
+import base64
+import json
+from collections import defaultdict
+from datetime import date
+
+from sqlalchemy import and_, or_, func, select
+from marshmallow import ValidationError
+
+from models import db, User, TimePeriod, Expense, Paycheck, PeriodRollup, DeletedRecord
+from money import ZERO, as_number
+from rates import rate_cache, convert
+from rollups import DEFAULT_CURRENCY
+from serializers import ROW_SERIALIZERS, expense_rows, paycheck_rows, time_period_rows, dump_user_data, \
+    dump_time_periods
+from versions import current_versions
+
+# Read queries are built from table columns rather than ORM attributes, so they
+# compile and run as plain Core statements: no entities, identity map or loaders.
+USERS = User.__table__.c
+TIME_PERIODS = TimePeriod.__table__.c
+EXPENSES = Expense.__table__.c
+PAYCHECKS = Paycheck.__table__.c
+ROLLUPS = PeriodRollup.__table__.c
+TOMBSTONES = DeletedRecord.__table__.c
+
+# Date column each model is ordered and range-filtered by
+DATE_COLUMNS = {
+    Expense: EXPENSES.due_date,
+    Paycheck: PAYCHECKS.date_received,
+}
+
+def encode_cursor(row_date, row_id):
+    """Encode the (date, id) position of the last row on a page as an opaque token."""
+    payload = json.dumps([row_date.isoformat() if row_date else None, row_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """Decode a token produced by encode_cursor back into (date, id)."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        row_date, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return (date.fromisoformat(row_date) if row_date else None), int(row_id)
+    except (ValueError, TypeError):
+        raise ValidationError({"cursor": ["Invalid cursor."]})
+
+def apply_filters(query, model, filters):
+    """Apply the list filters parsed by ListQuerySchema to an expense or paycheck query."""
+    columns = model.__table__.c
+    date_column = DATE_COLUMNS[model]
+    
+    if 'date_from' in filters:
+        query = query.filter(date_column >= filters['date_from'])
+    if 'date_to' in filters:
+        query = query.filter(date_column <= filters['date_to'])
+    if 'min_amount' in filters:
+        query = query.filter(columns.amount >= filters['min_amount'])
+    if 'max_amount' in filters:
+        query = query.filter(columns.amount <= filters['max_amount'])
+    
+    # Category and recurrence only exist on expenses
+    if model is Expense:
+        if 'category' in filters:
+            query = query.filter(EXPENSES.category == filters['category'])
+        if 'is_recurring' in filters:
+            query = query.filter(EXPENSES.is_recurring == filters['is_recurring'])
+    
+    return query
+
+def keyset_seek(query, model, cursor=None, limit=50):
+    """Order a query by (date, id), skip to the cursor and fetch one row more than limit.
+    
+    Rows without a date sort first on every backend (NULLS FIRST; SQLite's
+    default, where PostgreSQL would otherwise put them last). Seeking
+    past the cursor instead of using OFFSET keeps every page an index range
+    scan, so late pages cost the same as the first one. Works on a Query or
+    a select().
+    """
+    date_column = DATE_COLUMNS[model]
+    id_column = model.__table__.c.id
+    
+    if cursor:
+        last_date, last_id = decode_cursor(cursor)
+        if last_date is None:
+            query = query.filter(or_(
+                and_(date_column.is_(None), id_column > last_id),
+                date_column.isnot(None)
+            ))
+        else:
+            query = query.filter(or_(
+                date_column > last_date,
+                and_(date_column == last_date, id_column > last_id)
+            ))
+    
+    return query.order_by(date_column.asc().nulls_first(), id_column.asc()).limit(limit + 1)
+
+def trim_page(rows, model, limit):
+    """Cut the rows fetched by keyset_seek to one page and return it with the next cursor."""
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, DATE_COLUMNS[model].key), last.id)
+    
+    return rows, next_cursor
+
+def _user_rows(query, model, user_id, args, time_period_id=None):
+    columns = model.__table__.c
+    query = query.filter(columns.user_id == user_id)
+    if time_period_id is not None:
+        query = query.filter(columns.time_period_id == time_period_id)
+    return apply_filters(query, model, args)
+
+def list_rows(model, user_id, args, time_period_id=None):
+    """Filter and paginate a user's expenses or paychecks, optionally within one period.
+    
+    The rows are the columns of the model's row serializer (ROW_SERIALIZERS).
+    """
+    statement = list_statement(model, user_id, args, time_period_id)
+    return trim_page(db.session.execute(statement).all(), model, args['limit'])
+
+def list_statement(model, user_id, args, time_period_id=None):
+    """The select() behind list_rows, whose rows go through trim_page."""
+    statement = select(*ROW_SERIALIZERS[model].columns)
+    statement = _user_rows(statement, model, user_id, args, time_period_id)
+    return keyset_seek(statement, model, args.get('cursor'), args['limit'])
+
+def user_data_statements(user_id):
+    """The user's (id, username), expense and paycheck rows, and every time period, for dump_user_data."""
+    return (
+        select(USERS.id, USERS.username).where(USERS.id == user_id),
+        select(*expense_rows.columns).where(EXPENSES.user_id == user_id),
+        select(*paycheck_rows.columns).where(PAYCHECKS.user_id == user_id),
+        select(*time_period_rows.columns).order_by(TIME_PERIODS.id),
+    )
+
+def user_data(user_id):
+    """The user_data response, or None when the user does not exist."""
+    user, expenses, paychecks, periods = (
+        db.session.execute(statement).all() for statement in user_data_statements(user_id)
+    )
+    if not user:
+        return None
+    return dump_user_data(user[0], expenses, paychecks, periods)
+
+def period_exists_statement(time_period_id):
+    return select(TIME_PERIODS.id).where(TIME_PERIODS.id == time_period_id)
+
+def period_exists(time_period_id):
+    return db.session.execute(period_exists_statement(time_period_id)).first() is not None
+
+def time_periods(user_id, includes=(), time_period_id=None):
+    """Time periods (only time_period_id's, when given) with the user's included rows.
+    
+    Returns None when time_period_id does not exist. Each include costs one
+    query over the user's rows in those periods, as time_period_rows columns
+    and expense_rows or paycheck_rows columns; see dump_time_periods.
+    """
+    statement = select(*time_period_rows.columns)
+    if time_period_id is not None:
+        statement = statement.where(TIME_PERIODS.id == time_period_id)
+    periods = db.session.execute(statement).all()
+    if time_period_id is not None and not periods:
+        return None
+    
+    period_ids = [period.id for period in periods]
+    nested = {}
+    for name, columns, serializer in (('expenses', EXPENSES, expense_rows),
+                                      ('paychecks', PAYCHECKS, paycheck_rows)):
+        if name in includes:
+            nested[name] = db.session.execute(
+                select(*serializer.columns).where(
+                    columns.user_id == user_id,
+                    columns.time_period_id.in_(period_ids)
+                ).order_by(columns.id)
+            ).all()
+    return dump_time_periods(periods, **nested)
+
+def summary_statements(user_id, filters):
+    """The statements behind summarize, by name, for build_summary.
+    
+    Without a date range the totals come from period_rollups ('rollups');
+    otherwise from GROUP BY over the rows ('expenses', 'paychecks' and
+    'categories', each of (key, currency, total, count) rows). 'periods'
+    lists the time periods. None of them depend on each other.
+    """
+    def totals(model, key):
+        columns = model.__table__.c
+        currency = func.coalesce(columns.currency, DEFAULT_CURRENCY)
+        statement = select(columns[key], currency, func.sum(columns.amount), func.count(columns.id))
+        statement = apply_filters(statement.where(columns.user_id == user_id), model, filters)
+        if 'currency' in filters:
+            statement = statement.where(columns.currency == filters['currency'])
+        return statement.group_by(columns[key], currency)
+    
+    if 'date_from' in filters or 'date_to' in filters:
+        statements = {
+            'expenses': totals(Expense, 'time_period_id'),
+            'paychecks': totals(Paycheck, 'time_period_id'),
+            'categories': totals(Expense, 'category'),
+        }
+    else:
+        rollups = select(
+            ROLLUPS.time_period_id, ROLLUPS.currency, ROLLUPS.category,
+            ROLLUPS.expense_total, ROLLUPS.expense_count,
+            ROLLUPS.income_total, ROLLUPS.income_count
+        ).where(ROLLUPS.user_id == user_id)
+        if 'currency' in filters:
+            rollups = rollups.where(ROLLUPS.currency == filters['currency'])
+        statements = {'rollups': rollups}
+    
+    statements['periods'] = select(TIME_PERIODS.id, TIME_PERIODS.type).order_by(TIME_PERIODS.id)
+    return statements
+
+def _split_rollups(rollups):
+    """The (key, currency, total, count) rows of the grouped totals, from period_rollups rows."""
+    expense_totals, paycheck_totals, category_totals = [], [], []
+    for period_id, currency, category, expense_total, expense_count, income_total, income_count in rollups:
+        if expense_count:
+            expense_totals.append((period_id, currency, expense_total, expense_count))
+            category_totals.append((category or None, currency, expense_total, expense_count))
+        if income_count:
+            paycheck_totals.append((period_id, currency, income_total, income_count))
+    return expense_totals, paycheck_totals, category_totals
+
+def _fold(rows, rates=None):
+    """Sum (key, currency, total, count) rows per key into {key: (total, count)}.
+    
+    With rates, each currency subtotal is converted once before it is added.
+    """
+    folded = defaultdict(lambda: [ZERO, 0])
+    for key, currency, total, count in rows:
+        if rates is not None:
+            total = convert(total, rates[currency])
+        folded[key][0] += total
+        folded[key][1] += count
+    return folded
+
+def summarize(user_id, filters):
+    """Compute a user's per-period and per-category totals.
+    
+    Accepts the date range, currency and report_currency filters parsed by
+    SummaryQuerySchema. Without a date range the totals come straight from
+    period_rollups; a date range falls back to SQL GROUP BY over the rows.
+    Either way only grouped totals leave the database, never the individual
+    rows. With report_currency every currency subtotal is converted at the
+    rate in effect on date_to (or today), which raises RateNotFound when a
+    rate is missing.
+    """
+    results = {
+        name: db.session.execute(statement).all()
+        for name, statement in summary_statements(user_id, filters).items()
+    }
+    return build_summary(results, filters)
+
+def build_summary(results, filters):
+    """The summary response from the rows of each of summary_statements' statements."""
+    if 'rollups' in results:
+        expense_totals, paycheck_totals, category_totals = _split_rollups(results['rollups'])
+    else:
+        expense_totals, paycheck_totals, category_totals = (
+            results['expenses'], results['paychecks'], results['categories']
+        )
+    
+    rates = None
+    report_currency = filters.get('report_currency')
+    if report_currency:
+        rates_date = filters.get('date_to') or date.today()
+        currencies = {row[1] for rows in (expense_totals, paycheck_totals) for row in rows}
+        rates = rate_cache.rates(currencies, report_currency, rates_date)
+    
+    expenses_by_period = _fold(expense_totals, rates)
+    paychecks_by_period = _fold(paycheck_totals, rates)
+    categories_totals = _fold(category_totals, rates)
+    
+    # Totals stay Decimal (exact integer cents summed in SQL) until they are written out
+    periods = []
+    income = expenses = ZERO
+    for period_id, period_type in results['periods']:
+        period_expenses, expense_count = expenses_by_period.get(period_id, (ZERO, 0))
+        period_income, paycheck_count = paychecks_by_period.get(period_id, (ZERO, 0))
+        income += period_income
+        expenses += period_expenses
+        periods.append({
+            'time_period_id': period_id,
+            'type': period_type,
+            'income': as_number(period_income),
+            'expenses': as_number(period_expenses),
+            'balance': as_number(period_income - period_expenses),
+            'paycheck_count': paycheck_count,
+            'expense_count': expense_count
+        })
+    
+    # Uncategorized first, matching SQL NULL ordering
+    category_order = sorted(categories_totals, key=lambda category: (category is not None, category or ''))
+    categories = [
+        {'category': category, 'total': as_number(categories_totals[category][0]),
+         'count': categories_totals[category][1]}
+        for category in category_order
+    ]
+    
+    summary = {
+        'totals': {
+            'income': as_number(income),
+            'expenses': as_number(expenses),
+            'balance': as_number(income - expenses),
+            'paycheck_count': sum(period['paycheck_count'] for period in periods),
+            'expense_count': sum(period['expense_count'] for period in periods)
+        },
+        'time_periods': periods,
+        'categories': categories
+    }
+    if report_currency:
+        summary['report_currency'] = report_currency
+        summary['rates_date'] = rates_date.isoformat()
+    return summary
+
+def changes_since(user_id, since=None):
+    """Collect a user's expenses, paychecks and deletions after a sync cursor.
+    
+    The cursor is the user's data version, which every write stamps onto the
+    rows it touches (change_seq) and onto tombstones for deleted rows. Without
+    a cursor, or with one from the future (e.g. after a restore), everything
+    is returned and reset is set so the client replaces its local copy.
+    """
+    # Read the version before the rows: a write landing in between is sent again
+    # next time rather than skipped
+    cursor = current_versions(user_id)[0]
+    reset = not since or since > cursor
+    
+    expenses = select(*expense_rows.columns).where(EXPENSES.user_id == user_id)
+    paychecks = select(*paycheck_rows.columns).where(PAYCHECKS.user_id == user_id)
+    deleted = {'expenses': [], 'paychecks': []}
+    if not reset:
+        expenses = expenses.where(EXPENSES.change_seq > since)
+        paychecks = paychecks.where(PAYCHECKS.change_seq > since)
+        tombstones = db.session.execute(
+            select(TOMBSTONES.record_type, TOMBSTONES.record_id).where(
+                TOMBSTONES.user_id == user_id,
+                TOMBSTONES.change_seq > since
+            ).order_by(TOMBSTONES.change_seq, TOMBSTONES.id)
+        )
+        for record_type, record_id in tombstones:
+            deleted[f'{record_type}s'].append(record_id)
+    
+    return {
+        'cursor': cursor,
+        'reset': reset,
+        'expenses': db.session.execute(expenses.order_by(EXPENSES.change_seq, EXPENSES.id)).all(),
+        'paychecks': db.session.execute(paychecks.order_by(PAYCHECKS.change_seq, PAYCHECKS.id)).all(),
+        'deleted': deleted
+    }
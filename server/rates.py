@@ -0,0 +1,153 @@
+# server/rates.py
+import csv
+import threading
+from bisect import bisect_right
+from datetime import date
+from decimal import Decimal
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import select, tuple_
+
+from models import db, ExchangeRate, DataVersion
+from money import to_decimal
+from bulk import batched
+from versions import EXCHANGE_RATES_KEY, bump_versions
+
+# Cross rates go through this currency when a pair has no direct or inverse rate
+PIVOT_CURRENCY = 'USD'
+
+RATE_COLUMNS = ('date', 'base', 'quote', 'rate')
+
+class RateNotFound(Exception):
+    """Raised when no rate is known for a pair on or before a date."""
+    def __init__(self, base, quote, on):
+        super().__init__(f"No {base}/{quote} exchange rate on or before {on.isoformat()}")
+        self.base = base
+        self.quote = quote
+        self.on = on
+
+class RateCache:
+    """In-memory as-of exchange rate lookups.
+
+    Each (base, quote) pair holds parallel lists of date ordinals and rates
+    sorted by date, so the rate in effect on a date is one bisect away, O(log n)
+    in the length of the pair's history. The table is reloaded when the
+    exchange_rates data version changes.
+    """
+    def __init__(self):
+        self.version = None
+        self.pairs = {}
+        self.lock = threading.Lock()
+
+    def refresh(self):
+        version = db.session.query(DataVersion.version).filter_by(key=EXCHANGE_RATES_KEY).scalar() or 0
+        if version == self.version:
+            return
+        with self.lock:
+            if version != self.version:
+                self.pairs = self._load()
+                self.version = version
+
+    @staticmethod
+    def _load():
+        pairs = {}
+        rows = db.session.execute(
+            select(ExchangeRate.base, ExchangeRate.quote, ExchangeRate.date, ExchangeRate.rate)
+            .order_by(ExchangeRate.base, ExchangeRate.quote, ExchangeRate.date)
+        )
+        for base, quote, day, rate in rows:
+            ordinals, values = pairs.setdefault((base, quote), ([], []))
+            ordinals.append(day.toordinal())
+            values.append(Decimal(str(rate)))
+        return pairs
+
+    def lookup(self, base, quote, on):
+        """Rate for base/quote in effect on a date, from the pair or its inverse, or None."""
+        if base == quote:
+            return Decimal(1)
+        for pair, inverse in (((base, quote), False), ((quote, base), True)):
+            history = self.pairs.get(pair)
+            if history is None:
+                continue
+            index = bisect_right(history[0], on.toordinal()) - 1
+            if index >= 0:
+                rate = history[1][index]
+                return 1 / rate if inverse else rate
+        return None
+
+    def rate(self, base, quote, on):
+        """Rate for base/quote on a date, crossing through PIVOT_CURRENCY if needed."""
+        rate = self.lookup(base, quote, on)
+        if rate is None and PIVOT_CURRENCY not in (base, quote):
+            to_pivot = self.lookup(base, PIVOT_CURRENCY, on)
+            from_pivot = self.lookup(PIVOT_CURRENCY, quote, on)
+            if to_pivot is not None and from_pivot is not None:
+                rate = to_pivot * from_pivot
+        if rate is None:
+            raise RateNotFound(base, quote, on)
+        return rate
+
+    def rates(self, currencies, quote, on):
+        """{currency: rate into quote} for every currency in a result set, looked up once each."""
+        self.refresh()
+        return {currency: self.rate(currency, quote, on) for currency in currencies}
+
+rate_cache = RateCache()
+
+def convert(amount, rate):
+    """amount times rate, rounded to cents."""
+    return to_decimal(amount * rate)
+
+def read_rates(lines):
+    """Yield (date, base, quote, rate) from CSV lines with a date,base,quote,rate header."""
+    reader = csv.DictReader(lines)
+    missing = [column for column in RATE_COLUMNS if column not in (reader.fieldnames or ())]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+    for row in reader:
+        try:
+            day = date.fromisoformat(row['date'].strip())
+            base, quote = row['base'].strip().upper(), row['quote'].strip().upper()
+            rate = float(row['rate'])
+        except (AttributeError, ValueError):
+            raise ValueError(f"Line {reader.line_num}: expected an ISO date, two currency codes and a rate")
+        if len(base) != 3 or len(quote) != 3 or not rate > 0:
+            raise ValueError(f"Line {reader.line_num}: expected three letter currency codes and a positive rate")
+        yield day, base, quote, rate
+
+def load_rates(rows, batch_size=1000):
+    """Upsert (date, base, quote, rate) rows in batches and bump the exchange rate version.
+
+    Everything commits at the end, so a bad row leaves the table unchanged.
+    Returns the number of rates written.
+    """
+    table = ExchangeRate.__table__
+    count = 0
+    for batch in batched(rows, batch_size):
+        # The last rate for a repeated (pair, date) wins
+        by_key = {(base, quote, day): rate for day, base, quote, rate in batch}
+        db.session.execute(table.delete().where(
+            tuple_(table.c.base, table.c.quote, table.c.date).in_(list(by_key))
+        ))
+        db.session.execute(table.insert(), [
+            {'base': base, 'quote': quote, 'date': day, 'rate': rate}
+            for (base, quote, day), rate in by_key.items()
+        ])
+        count += len(by_key)
+    bump_versions(db.session.connection(), {EXCHANGE_RATES_KEY})
+    db.session.commit()
+    return count
+
+@click.command('load-exchange-rates')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@with_appcontext
+def load_exchange_rates_command(path):
+    """Load exchange rates from a date,base,quote,rate CSV file."""
+    with open(path, newline='') as rates_file:
+        try:
+            count = load_rates(read_rates(rates_file))
+        except ValueError as err:
+            db.session.rollback()
+            raise click.ClickException(str(err))
+    click.echo(f"Loaded {count} exchange rates")
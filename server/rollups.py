@@ -0,0 +1,200 @@
+# server/rollups.py
+from collections import defaultdict
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import event, func, inspect, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from models import db, Expense, Paycheck, PeriodRollup
+from money import Money
+
+DEFAULT_CURRENCY = 'USD'
+
+# Totals tracked per rollup key, in column order
+TOTAL_COLUMNS = ('expense_total', 'expense_count', 'income_total', 'income_count')
+
+def _value(obj, attr, old):
+    """Current value of an attribute, or the value it had before this flush when old=True."""
+    if old:
+        history = inspect(obj).attrs[attr].history
+        if history.deleted:
+            return history.deleted[0]
+        if history.unchanged:
+            return history.unchanged[0]
+    return getattr(obj, attr)
+
+def _key_and_delta(obj, old=False):
+    """Rollup key and (expense_total, expense_count, income_total, income_count) for a row."""
+    amount = _value(obj, 'amount', old) or 0
+    key = (
+        _value(obj, 'user_id', old),
+        _value(obj, 'time_period_id', old),
+        (_value(obj, 'category', old) or '') if isinstance(obj, Expense) else '',
+        _value(obj, 'currency', old) or DEFAULT_CURRENCY
+    )
+    if isinstance(obj, Expense):
+        return key, (amount, 1, 0, 0)
+    return key, (0, 0, amount, 1)
+
+def row_deltas(model, rows, sign=1, deltas=None):
+    """Accumulate rollup deltas for plain row mappings, e.g. for bulk writes.
+    
+    Bulk statements bypass the flush, so callers pass the rows they wrote (or the
+    rows as they were before an update or delete) and apply the result with
+    apply_deltas in the same transaction.
+    """
+    if deltas is None:
+        deltas = defaultdict(lambda: [0, 0, 0, 0])
+    for row in rows:
+        amount = row.get('amount') or 0
+        key = (
+            row['user_id'],
+            row['time_period_id'],
+            (row.get('category') or '') if model is Expense else '',
+            row.get('currency') or DEFAULT_CURRENCY
+        )
+        delta = (amount, 1, 0, 0) if model is Expense else (0, 0, amount, 1)
+        totals = deltas[key]
+        for i, value in enumerate(delta):
+            totals[i] += sign * value
+    return deltas
+
+def _collect_deltas(session):
+    deltas = defaultdict(lambda: [0, 0, 0, 0])
+    
+    def add(key, delta, sign):
+        totals = deltas[key]
+        for i, value in enumerate(delta):
+            totals[i] += sign * value
+    
+    for obj in session.new:
+        if isinstance(obj, (Expense, Paycheck)):
+            add(*_key_and_delta(obj), 1)
+    
+    for obj in session.deleted:
+        if isinstance(obj, (Expense, Paycheck)):
+            add(*_key_and_delta(obj, old=True), -1)
+    
+    for obj in session.dirty:
+        if isinstance(obj, (Expense, Paycheck)) and session.is_modified(obj):
+            add(*_key_and_delta(obj, old=True), -1)
+            add(*_key_and_delta(obj), 1)
+    
+    return {key: totals for key, totals in deltas.items() if any(totals)}
+
+def apply_deltas(connection, deltas):
+    """Add per-key deltas to period_rollups, creating missing rows."""
+    table = PeriodRollup.__table__
+    for (user_id, time_period_id, category, currency), totals in deltas.items():
+        if not any(totals):
+            continue
+        key_filter = (
+            (table.c.user_id == user_id) &
+            (table.c.time_period_id == time_period_id) &
+            (table.c.category == category) &
+            (table.c.currency == currency)
+        )
+        values = {
+            column: table.c[column] + delta
+            for column, delta in zip(TOTAL_COLUMNS, totals)
+        }
+        result = connection.execute(table.update().where(key_filter).values(**values))
+        if result.rowcount == 0:
+            connection.execute(table.insert().values(
+                user_id=user_id,
+                time_period_id=time_period_id,
+                category=category,
+                currency=currency,
+                **dict(zip(TOTAL_COLUMNS, totals))
+            ))
+
+@event.listens_for(Session, 'after_flush')
+def update_rollups(session, flush_context):
+    # Runs inside the flush, so rollup changes commit or roll back with the rows
+    deltas = _collect_deltas(session)
+    if deltas:
+        apply_deltas(session.connection(), deltas)
+
+def _rollup_source():
+    """SELECT computing rollup rows from scratch, one row per key."""
+    expense_rows = select(
+        Expense.user_id,
+        Expense.time_period_id,
+        func.coalesce(Expense.category, '').label('category'),
+        func.coalesce(Expense.currency, DEFAULT_CURRENCY).label('currency'),
+        Expense.amount.label('expense_amount'),
+        literal(1).label('expense_row'),
+        literal(0, Money).label('income_amount'),
+        literal(0).label('income_row')
+    )
+    paycheck_rows = select(
+        Paycheck.user_id,
+        Paycheck.time_period_id,
+        literal('').label('category'),
+        func.coalesce(Paycheck.currency, DEFAULT_CURRENCY).label('currency'),
+        literal(0, Money).label('expense_amount'),
+        literal(0).label('expense_row'),
+        Paycheck.amount.label('income_amount'),
+        literal(1).label('income_row')
+    )
+    rows = union_all(expense_rows, paycheck_rows).subquery()
+    return select(
+        rows.c.user_id,
+        rows.c.time_period_id,
+        rows.c.category,
+        rows.c.currency,
+        func.sum(rows.c.expense_amount).label('expense_total'),
+        func.sum(rows.c.expense_row).label('expense_count'),
+        func.sum(rows.c.income_amount).label('income_total'),
+        func.sum(rows.c.income_row).label('income_count')
+    ).group_by(rows.c.user_id, rows.c.time_period_id, rows.c.category, rows.c.currency)
+
+def rebuild_rollups():
+    """Recompute period_rollups from the expenses and paychecks tables."""
+    table = PeriodRollup.__table__
+    db.session.execute(table.delete())
+    db.session.execute(table.insert().from_select(
+        ['user_id', 'time_period_id', 'category', 'currency', *TOTAL_COLUMNS],
+        _rollup_source()
+    ))
+    db.session.commit()
+    return db.session.query(func.count(PeriodRollup.id)).scalar()
+
+def check_rollups():
+    """Compare period_rollups with a fresh aggregation and return the mismatched keys."""
+    expected = {
+        tuple(row[:4]): tuple(row[4:])
+        for row in db.session.execute(_rollup_source())
+    }
+    actual = {
+        (r.user_id, r.time_period_id, r.category, r.currency): tuple(getattr(r, c) for c in TOTAL_COLUMNS)
+        for r in PeriodRollup.query.all()
+    }
+    
+    mismatches = []
+    for key in expected.keys() | actual.keys():
+        want = expected.get(key, (0, 0, 0, 0))
+        have = actual.get(key, (0, 0, 0, 0))
+        # Totals are exact integer cents, so any difference is a real mismatch
+        if any((w or 0) != (h or 0) for w, h in zip(want, have)):
+            mismatches.append({'key': key, 'expected': want, 'actual': have})
+    return mismatches
+
+@click.command('rebuild-rollups')
+@with_appcontext
+def rebuild_rollups_command():
+    """Recompute the period_rollups table from scratch."""
+    count = rebuild_rollups()
+    click.echo(f"Rebuilt {count} rollup rows")
+
+@click.command('check-rollups')
+@with_appcontext
+def check_rollups_command():
+    """Verify period_rollups matches the expenses and paychecks tables."""
+    mismatches = check_rollups()
+    for mismatch in mismatches:
+        click.echo(f"{mismatch['key']}: expected {mismatch['expected']}, found {mismatch['actual']}")
+    if mismatches:
+        raise click.ClickException(f"{len(mismatches)} rollup rows are out of date, run 'flask rebuild-rollups'")
+    click.echo("Rollups are consistent")
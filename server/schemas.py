@@ -1,10 +1,20 @@
 # server/schemas.py
 from flask_marshmallow import Marshmallow
-from marshmallow import fields, validates, ValidationError, post_load
-from models import User, TimePeriod, Expense, Paycheck, db
+from marshmallow import Schema, fields, validate, validates, validates_schema, ValidationError, post_load
+from decimal import ROUND_HALF_UP
+from models import User, TimePeriod, Expense, Paycheck
+from money import as_number
 
 ma = Marshmallow()
 
+class Money(fields.Decimal):
+    """Money amount: loads to a Decimal rounded to cents, dumps as an exact JSON number."""
+    def __init__(self, **kwargs):
+        super().__init__(places=2, rounding=ROUND_HALF_UP, **kwargs)
+    
+    def _serialize(self, value, attr, obj, **kwargs):
+        return as_number(super()._serialize(value, attr, obj, **kwargs))
+
 class UserSchema(ma.SQLAlchemySchema):
     class Meta:
         model = User
@@ -33,7 +43,7 @@ class ExpenseSchema(ma.SQLAlchemySchema):
     user_id = ma.auto_field(required=True)
     time_period_id = ma.auto_field(required=True)
     description = ma.auto_field(required=True)
-    amount = ma.auto_field(required=True)
+    amount = Money(required=True)
     due_date = ma.auto_field()
     is_recurring = ma.auto_field()
     recurrence_interval = ma.auto_field()
@@ -53,7 +63,7 @@ class PaycheckSchema(ma.SQLAlchemySchema):
     id = ma.auto_field(dump_only=True)
     user_id = ma.auto_field(required=True)
     time_period_id = ma.auto_field(required=True)
-    amount = ma.auto_field(required=True)
+    amount = Money(required=True)
     date_received = ma.auto_field()
     currency = ma.auto_field()
     
@@ -70,9 +80,8 @@ class TimePeriodSchema(ma.SQLAlchemySchema):
     id = ma.auto_field(dump_only=True)
     type = ma.auto_field(required=True)
     
-    # Add nested fields for related expenses and paychecks
-    expenses = fields.List(fields.Nested(lambda: ExpenseSchema(exclude=('time_period_id',))), dump_only=True)
-    paychecks = fields.List(fields.Nested(lambda: PaycheckSchema(exclude=('time_period_id',))), dump_only=True)
+    # Related expenses and paychecks are not nested here: they span every user.
+    # Use queries.time_periods to expand the caller's own rows on request.
     
     @validates('type')
     def validate_type(self, value):
@@ -83,37 +92,97 @@ class TimePeriodSchema(ma.SQLAlchemySchema):
             raise ValidationError("Time period type must be between 2 and 50 characters")
         return value
 
-class UserDataSchema(ma.SQLAlchemySchema):
-    class Meta:
-        model = User
+# Shapes of a list page: {"items": [row, ...]} or {"columns": {field: [value, ...]}}
+LIST_LAYOUTS = ('rows', 'columns')
+
+class ListQuerySchema(Schema):
+    """Query string arguments for the paginated expense and paycheck lists."""
+    cursor = fields.String()
+    layout = fields.String(load_default='rows', validate=validate.OneOf(LIST_LAYOUTS))
+    limit = fields.Integer(load_default=50, validate=validate.Range(min=1, max=500))
+    category = fields.String()
+    date_from = fields.Date()
+    date_to = fields.Date()
+    min_amount = Money()
+    max_amount = Money()
+    is_recurring = fields.Boolean()
     
-    id = ma.auto_field()
-    username = ma.auto_field()
+    @validates_schema
+    def validate_ranges(self, data, **kwargs):
+        if 'date_from' in data and 'date_to' in data and data['date_from'] > data['date_to']:
+            raise ValidationError("date_from must not be after date_to", "date_from")
+        if 'min_amount' in data and 'max_amount' in data and data['min_amount'] > data['max_amount']:
+            raise ValidationError("min_amount must not be greater than max_amount", "min_amount")
+
+class SummaryQuerySchema(Schema):
+    """Query string arguments for the aggregated summary."""
+    date_from = fields.Date()
+    date_to = fields.Date()
+    currency = fields.String(validate=validate.Length(equal=3))
+    # Convert every currency into this one, at the rates in effect on date_to (or today)
+    report_currency = fields.String(validate=validate.Length(equal=3))
     
-    # Include time periods with nested expenses and paychecks
-    time_periods = fields.Method('get_time_periods_with_data')
+    @validates_schema
+    def validate_ranges(self, data, **kwargs):
+        if 'date_from' in data and 'date_to' in data and data['date_from'] > data['date_to']:
+            raise ValidationError("date_from must not be after date_to", "date_from")
+
+class ImportQuerySchema(Schema):
+    """Query string arguments for file imports."""
+    format = fields.String(validate=validate.OneOf(('csv', 'qif', 'ofx')))
+    on_error = fields.String(load_default='stop', validate=validate.OneOf(('stop', 'skip')))
+    start_line = fields.Integer(load_default=1, validate=validate.Range(min=1))
+
+class ExportQuerySchema(Schema):
+    """Query string arguments for the streaming export."""
+    format = fields.String(load_default='ndjson', validate=validate.OneOf(('csv', 'ndjson')))
+    date_from = fields.Date()
+    date_to = fields.Date()
+    
+    @validates_schema
+    def validate_ranges(self, data, **kwargs):
+        if 'date_from' in data and 'date_to' in data and data['date_from'] > data['date_to']:
+            raise ValidationError("date_from must not be after date_to", "date_from")
+
+class SyncQuerySchema(Schema):
+    """Query string arguments for delta sync."""
+    since = fields.Integer(validate=validate.Range(min=0))
+
+class ForecastQuerySchema(Schema):
+    """Query string arguments for the recurring cash flow forecast."""
+    start = fields.Date(data_key='from')
+    end = fields.Date(data_key='to')
+    granularity = fields.String(load_default='day', validate=validate.OneOf(('day', 'week', 'month')))
+    starting_balance = Money(load_default=0)
+    report_currency = fields.String(validate=validate.Length(equal=3))
+    # Monte Carlo mode
+    mode = fields.String(load_default='projection', validate=validate.OneOf(('projection', 'monte_carlo')))
+    scenarios = fields.Integer(load_default=1000, validate=validate.Range(min=1, max=10000))
+    paycheck_jitter_days = fields.Integer(load_default=3, validate=validate.Range(min=0, max=31))
+    spend_variation = fields.Float(load_default=0.25, validate=validate.Range(min=0, max=5))
+    shortfall_threshold = Money(load_default=0)
+    seed = fields.Integer()
     
-    def get_time_periods_with_data(self, obj):
-        # Get all time periods
-        all_time_periods = TimePeriod.query.all()
-        user_id = obj.id
-        
-        result = []
-        for period in all_time_periods:
-            # Get user's expenses and paychecks for this period
-            period_expenses = Expense.query.filter_by(user_id=user_id, time_period_id=period.id).all()
-            period_paychecks = Paycheck.query.filter_by(user_id=user_id, time_period_id=period.id).all()
-            
-            # Prepare period data with nested relationships
-            period_data = {
-                'id': period.id,
-                'type': period.type,
-                'expenses': ExpenseSchema(many=True, exclude=('time_period_id',)).dump(period_expenses),
-                'paychecks': PaycheckSchema(many=True, exclude=('time_period_id',)).dump(period_paychecks)
-            }
-            result.append(period_data)
-            
-        return result
+    @validates_schema
+    def validate_ranges(self, data, **kwargs):
+        if 'start' in data and 'end' in data:
+            if data['start'] > data['end']:
+                raise ValidationError("from must not be after to", "from")
+            if (data['end'] - data['start']).days > 366 * 50:
+                raise ValidationError("Forecasts are limited to 50 years", "to")
+
+# Relationships that can be expanded on time period reads via ?include=
+TIME_PERIOD_INCLUDES = ('expenses', 'paychecks')
+
+def parse_includes(value):
+    """Parse a comma separated ?include= value into a set of relationship names."""
+    includes = {name.strip() for name in (value or '').split(',') if name.strip()}
+    unknown = includes - set(TIME_PERIOD_INCLUDES)
+    if unknown:
+        raise ValidationError(
+            {"include": [f"Unknown include: {name}" for name in sorted(unknown)]}
+        )
+    return includes
 
 # Initialize schema instances
 user_schema = UserSchema()
@@ -124,4 +193,16 @@ expense_schema = ExpenseSchema()
 expenses_schema = ExpenseSchema(many=True)
 paycheck_schema = PaycheckSchema()
 paychecks_schema = PaycheckSchema(many=True)
-user_data_schema = UserDataSchema()
\ No newline at end of file
+period_expenses_schema = ExpenseSchema(many=True, exclude=('time_period_id',))
+period_paychecks_schema = PaycheckSchema(many=True, exclude=('time_period_id',))
+# Bulk writes validate to plain dicts that go straight into executemany statements
+bulk_expenses_schema = ExpenseSchema(many=True, load_instance=False)
+bulk_expense_updates_schema = ExpenseSchema(many=True, partial=True, load_instance=False)
+bulk_paychecks_schema = PaycheckSchema(many=True, load_instance=False)
+bulk_paycheck_updates_schema = PaycheckSchema(many=True, partial=True, load_instance=False)
+list_query_schema = ListQuerySchema()
+summary_query_schema = SummaryQuerySchema()
+import_query_schema = ImportQuerySchema()
+export_query_schema = ExportQuerySchema()
+sync_query_schema = SyncQuerySchema()
+forecast_query_schema = ForecastQuerySchema()
\ No newline at end of file
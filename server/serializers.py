@@ -0,0 +1,173 @@
+# server/serializers.py
+import json
+
+from flask import current_app, make_response
+from flask_restful.representations.json import output_json as restful_output_json
+from marshmallow import fields
+from sqlalchemy import BigInteger, type_coerce
+
+from metrics import timed_serialization
+from models import Expense, Paycheck, TimePeriod
+from schemas import Money, expenses_schema, paychecks_schema, period_expenses_schema, \
+    period_paychecks_schema, time_periods_schema
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+def dumps(data, default=None):
+    """Compact UTF-8 JSON plus a newline, from orjson when it is installed.
+
+    The stdlib fallback is given the same separators and escaping, so both
+    produce the same bytes (apart from the exponent spelling of floats
+    beyond 1e16 or below 1e-4, which no money amount reaches). default
+    converts values neither encoder supports, as in json.dumps.
+    """
+    if orjson is not None:
+        return orjson.dumps(data, default=default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(data, default=default, separators=(',', ':'), ensure_ascii=False) + '\n').encode()
+
+@timed_serialization
+def output_json(data, code, headers=None):
+    """The API's JSON representation.
+    
+    flask-restful's own output (json.dumps with its default separators and
+    ASCII escapes, indented in debug), byte for byte what the schemas always
+    sent, unless JSON_COMPACT is set; then dumps.
+    """
+    if current_app.debug or not current_app.config.get('JSON_COMPACT', False):
+        return restful_output_json(data, code, headers)
+    response = make_response(dumps(data), code)
+    response.headers.extend(headers or {})
+    return response
+
+def _cents(column):
+    # The stored integer, without the Decimal the Money type would build per row
+    return type_coerce(column, BigInteger).label(column.key)
+
+# How each field type writes a non-null column value, as an expression of {value};
+# None for values written as they come. Functions an expression calls are passed
+# to the generated code under the given names. The last item, when set, wraps the
+# table column in what is selected for it.
+FIELD_EXPRESSIONS = (
+    # Integer cents / 100 is the float nearest the amount, the same one the
+    # schema's Money field dumps from a Decimal
+    (Money, '{value} / 100', {}, _cents),
+    (fields.Integer, None, {}, None),
+    (fields.String, None, {}, None),
+    (fields.Boolean, None, {}, None),
+    # Date and DateTime, in their default ISO format
+    (fields.DateTime, '{value}.isoformat()', {}, None),
+)
+
+class RowSerializer:
+    """A schema's dump compiled into one function over rows of its columns.
+
+    columns are the table columns behind the schema's dump fields, in dump
+    order; select(*serializer.columns) is a Core statement whose Row tuples
+    dump() turns into the same dicts schema.dump() makes from model
+    instances, without loading entities into a session or walking
+    marshmallow fields per row. Pass another serializer's columns to read
+    rows selected for that one. dump_columns() writes the same values as
+    one list per field instead.
+    """
+    def __init__(self, schema, model, columns=None):
+        table = model.__table__.c
+        dump_fields = []
+        for name, field in schema.dump_fields.items():
+            expression, helpers, select_as = self._expression(field)
+            column = table[field.attribute or name]
+            if select_as is not None:
+                column = select_as(column)
+            dump_fields.append((field.data_key or name, column, expression, helpers))
+        self.columns = list(columns or (column for _, column, _, _ in dump_fields))
+        positions = {column.key: index for index, column in enumerate(self.columns)}
+        items = []
+        lists = []
+        namespace = {}
+        for key, column, expression, helpers in dump_fields:
+            namespace.update(helpers)
+            value = f'row[{positions[column.key]}]'
+            if expression is not None:
+                value = f'(None if {value} is None else {expression.format(value=value)})'
+            items.append(f'{key!r}: {value}')
+            lists.append(f'{key!r}: [{value} for row in rows]')
+
+        source = (f"def dump_row(row):\n    return {{{', '.join(items)}}}\n"
+                  f"def dump_columns(rows):\n    return {{{', '.join(lists)}}}\n")
+        exec(compile(source, f'<{type(schema).__name__} row serializer>', 'exec'), namespace)
+        self.dump_row = namespace['dump_row']
+        self.dump_columns = namespace['dump_columns']
+
+    @staticmethod
+    def _expression(field):
+        for field_class, expression, helpers, select_as in FIELD_EXPRESSIONS:
+            if isinstance(field, field_class):
+                return expression, helpers, select_as
+        raise TypeError(f'No row serializer for {type(field).__name__} fields')
+
+    @timed_serialization
+    def dump(self, rows):
+        return list(map(self.dump_row, rows))
+
+    @timed_serialization
+    def dump_page(self, rows, next_cursor, layout='rows'):
+        """A list response: {"items": [...]} or, for the 'columns' layout, {"columns": {...}}."""
+        if layout == 'columns':
+            return {"columns": self.dump_columns(rows), "next_cursor": next_cursor}
+        return {"items": self.dump(rows), "next_cursor": next_cursor}
+
+expense_rows = RowSerializer(expenses_schema, Expense)
+paycheck_rows = RowSerializer(paychecks_schema, Paycheck)
+# Nested under their period in user_data, from the same rows as the flat lists
+period_expense_rows = RowSerializer(period_expenses_schema, Expense, expense_rows.columns)
+period_paycheck_rows = RowSerializer(period_paychecks_schema, Paycheck, paycheck_rows.columns)
+time_period_rows = RowSerializer(time_periods_schema, TimePeriod)
+
+# Model each list endpoint pages through, and its serializer
+ROW_SERIALIZERS = {Expense: expense_rows, Paycheck: paycheck_rows}
+
+@timed_serialization
+def dump_user_data(user, expenses, paychecks, periods):
+    """The user_data response from rows: (id, username), expense_rows and paycheck_rows
+    columns, and time_period_rows columns in id order. Same output as
+    benchmarks.reference.user_data_schema.
+    """
+    expense_periods = {}
+    for row, data in zip(expenses, period_expense_rows.dump(expenses)):
+        expense_periods.setdefault(row.time_period_id, []).append(data)
+    paycheck_periods = {}
+    for row, data in zip(paychecks, period_paycheck_rows.dump(paychecks)):
+        paycheck_periods.setdefault(row.time_period_id, []).append(data)
+
+    time_periods = []
+    for period in time_period_rows.dump(periods):
+        period['expenses'] = expense_periods.get(period['id'], [])
+        period['paychecks'] = paycheck_periods.get(period['id'], [])
+        time_periods.append(period)
+
+    return {
+        'id': user.id,
+        'username': user.username,
+        'expenses': expense_rows.dump(expenses),
+        'paychecks': paycheck_rows.dump(paychecks),
+        'time_periods': time_periods,
+    }
+
+@timed_serialization
+def dump_time_periods(periods, expenses=None, paychecks=None):
+    """Time periods from time_period_rows columns, with the given expense_rows or
+    paycheck_rows rows nested under their period. Rows are kept in the order given.
+    """
+    result = time_period_rows.dump(periods)
+    for name, rows, serializer in (('expenses', expenses, period_expense_rows),
+                                   ('paychecks', paychecks, period_paycheck_rows)):
+        if rows is None:
+            continue
+        by_period = {}
+        for row, data in zip(rows, serializer.dump(rows)):
+            by_period.setdefault(row.time_period_id, []).append(data)
+        for period in result:
+            period[name] = by_period.get(period['id'], [])
+    return result
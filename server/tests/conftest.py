@@ -0,0 +1,28 @@
+# server/tests/conftest.py
+import pytest
+
+from app import create_app
+from config import TestingConfig
+from models import db
+
+@pytest.fixture
+def app():
+    app = create_app(TestingConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def register(client):
+    """Register a user and return the Authorization header for their access token."""
+    def register(username='alice', password='correct horse'):
+        response = client.post('/api/auth/register', json={'username': username, 'password': password})
+        assert response.status_code == 201, response.get_json()
+        return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+    return register
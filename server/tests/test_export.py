@@ -0,0 +1,43 @@
+# server/tests/test_export.py
+import csv
+import io
+import json
+
+from serializers import dumps
+
+EXPENSES = (
+    {'description': 'Rent', 'amount': 1200.5, 'due_date': '2025-01-01', 'category': 'Housing',
+     'is_recurring': True, 'recurrence_interval': 'monthly'},
+    {'description': 'Café', 'amount': 4.25, 'due_date': '2025-01-02', 'category': 'Food',
+     'is_recurring': False},
+)
+
+def add_expenses(client, headers):
+    client.post('/api/time_periods', json={'type': 'monthly'}, headers=headers)
+    for expense in EXPENSES:
+        assert client.post('/api/time_periods/1/expenses', json=expense, headers=headers).status_code == 201
+
+def expenses(client, headers):
+    fields = ('description', 'amount', 'due_date', 'category', 'is_recurring', 'recurrence_interval')
+    rows = client.get('/api/expenses', headers=headers).get_json()['items']
+    return [{field: row[field] for field in fields} for row in rows]
+
+def test_ndjson_lines_are_compact_json(client, register):
+    headers = register()
+    add_expenses(client, headers)
+    lines = client.get('/api/export?format=ndjson', headers=headers).get_data().splitlines(keepends=True)
+    assert len(lines) == len(EXPENSES)
+    for line in lines:
+        assert line == dumps(json.loads(line))
+    assert json.loads(lines[0])['amount'] == 1200.5
+
+def test_csv_export_imports_again(client, register):
+    headers = register()
+    add_expenses(client, headers)
+    body = client.get('/api/export?format=csv', headers=headers).get_data()
+    assert [row['is_recurring'] for row in csv.DictReader(io.StringIO(body.decode()))] == ['true', 'false']
+
+    other = register('bob')
+    response = client.post('/api/time_periods/1/expenses/import', data=body, headers=other)
+    assert response.get_json()['imported'] == len(EXPENSES)
+    assert expenses(client, other) == expenses(client, headers)
@@ -0,0 +1,46 @@
+# server/tests/test_forecast.py
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from forecast import project
+from models import db, User, TimePeriod, Paycheck
+
+START, END = date(2025, 3, 1), date(2025, 3, 31)
+
+@pytest.fixture
+def add_paychecks(app):
+    """Add paychecks received on the given days to a weekly time period and return the user id."""
+    def add_paychecks(*days, amount='1000.00'):
+        user = User(username='alice', password_hash='-')
+        period = TimePeriod(type='weekly')
+        db.session.add_all((user, period))
+        db.session.flush()
+        db.session.add_all(
+            Paycheck(user_id=user.id, time_period_id=period.id, amount=Decimal(amount), date_received=day)
+            for day in days)
+        db.session.commit()
+        return user.id
+    return add_paychecks
+
+def test_a_single_paycheck_is_not_projected_forward(add_paychecks):
+    user_id = add_paychecks(date(2025, 2, 28))
+    assert project(user_id, START, END)['total_income'] == 0
+
+def test_paychecks_one_period_apart_recur_from_the_latest(add_paychecks):
+    user_id = add_paychecks(date(2025, 2, 21), date(2025, 2, 28))
+    result = project(user_id, START, END)
+    assert [bucket['start'] for bucket in result['buckets']] == \
+        ['2025-03-07', '2025-03-14', '2025-03-21', '2025-03-28']
+    assert result['total_income'] == 4000
+
+def test_paychecks_off_the_period_cadence_do_not_recur(add_paychecks):
+    user_id = add_paychecks(date(2025, 2, 1), date(2025, 2, 28))
+    assert project(user_id, START, END)['total_income'] == 0
+
+def test_paychecks_in_the_window_count_once_without_a_cadence(add_paychecks):
+    user_id = add_paychecks(date(2025, 3, 3), date(2025, 3, 20))
+    result = project(user_id, START, END)
+    assert [bucket['start'] for bucket in result['buckets']] == ['2025-03-03', '2025-03-20']
+    assert result['total_income'] == 2000
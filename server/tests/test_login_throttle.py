@@ -0,0 +1,32 @@
+# server/tests/test_login_throttle.py
+ATTACKER = {'REMOTE_ADDR': '203.0.113.7'}
+OWNER = {'REMOTE_ADDR': '198.51.100.20'}
+
+def login(client, password, environ):
+    return client.post('/api/auth/login', json={'username': 'alice', 'password': password},
+                       environ_base=environ)
+
+def test_failures_from_one_address_do_not_lock_the_owner_out(app, client, register):
+    register()
+    for _ in range(app.config['LOGIN_MAX_FAILURES']):
+        assert login(client, 'wrong', ATTACKER).status_code == 401
+
+    throttled = login(client, 'correct horse', ATTACKER)
+    assert throttled.status_code == 429
+    assert int(throttled.headers['Retry-After']) > 0
+    assert login(client, 'correct horse', OWNER).status_code == 200
+
+def test_failures_spread_over_addresses_hit_the_username_limit(app, client, register):
+    register()
+    app.extensions['login_throttle'].max_failures_per_user = 3
+    for octet in range(3):
+        assert login(client, 'wrong', {'REMOTE_ADDR': f'192.0.2.{octet}'}).status_code == 401
+
+    assert login(client, 'correct horse', OWNER).status_code == 429
+
+def test_success_clears_the_address_counter(app, client, register):
+    register()
+    for _ in range(app.config['LOGIN_MAX_FAILURES'] - 1):
+        login(client, 'wrong', OWNER)
+    assert login(client, 'correct horse', OWNER).status_code == 200
+    assert login(client, 'wrong', OWNER).status_code == 401
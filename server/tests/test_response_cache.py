@@ -0,0 +1,28 @@
+# server/tests/test_response_cache.py
+import pytest
+
+pytest.importorskip('prometheus_client')
+
+from cache import ResponseCache
+from metrics import RESPONSE_CACHE_EVENTS
+
+def events():
+    return {sample.labels['event']: sample.value for sample in RESPONSE_CACHE_EVENTS.collect()[0].samples
+            if sample.name.endswith('_total')}
+
+def test_hits_misses_stores_and_evictions_are_counted(app):
+    app.config.update(CACHE_BACKEND='memory', CACHE_MAX_ENTRIES=1, CACHE_MAX_VALUE_BYTES=20)
+    cache = ResponseCache(app)
+    versions = {'time_periods': 1}
+    before = events()
+
+    assert cache.get(('time_periods',), '/a', versions) is None
+    assert cache.set(('time_periods',), '/a', [1], versions=versions)
+    assert cache.get(('time_periods',), '/a', versions) == [1]
+    assert cache.set(('time_periods',), '/b', [2], versions=versions)
+    assert not cache.set(('time_periods',), '/c', ['x' * 50], versions=versions)
+
+    after = events()
+    assert {event: after[event] - before.get(event, 0) for event in after} == {
+        'hit': 1, 'miss': 1, 'set': 2, 'too_large': 1, 'eviction': 1,
+    }
@@ -0,0 +1,91 @@
+# server/tests/test_serializers.py
+# The compiled row serializers against the marshmallow schemas they are
+# compiled from, compared as encoded bytes, and the bytes the API sends.
+import json
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+
+import serializers
+from models import db, User, TimePeriod, Expense, Paycheck
+from queries import time_periods
+from schemas import expenses_schema, paychecks_schema, time_periods_schema, \
+    period_expenses_schema, period_paychecks_schema
+from serializers import expense_rows, paycheck_rows, time_period_rows, dumps
+
+DESCRIPTIONS = ('Rent', 'Café "Le Zinc"', 'Tab\tand\nnewline', 'Back\\slash', '日本語', 'Control \x01 char', '')
+AMOUNTS = (Decimal('0.01'), Decimal('0.1'), Decimal('0.5'), Decimal('1'), Decimal('19.99'), Decimal('20.005'),
+           Decimal('1234.5'), Decimal('999999.99'), Decimal('12345678901.23'))
+
+@pytest.fixture
+def user_id(app):
+    db.session.add_all(TimePeriod(type=kind) for kind in ('weekly', 'monthly', 'Ünïcode'))
+    user = User(username='ünïcode', password_hash='-')
+    db.session.add(user)
+    db.session.flush()
+    for index, amount in enumerate(AMOUNTS):
+        db.session.add(Expense(
+            user_id=user.id, time_period_id=index % 3 + 1,
+            description=DESCRIPTIONS[index % len(DESCRIPTIONS)], amount=amount,
+            due_date=None if index % 3 == 0 else date(2025, 1, index + 1),
+            is_recurring=index % 2 == 0, recurrence_interval='monthly' if index % 2 == 0 else None,
+            category=(None, 'food', 'Ünïcode')[index % 3], currency=(None, 'USD', 'EUR')[index % 3],
+        ))
+        db.session.add(Paycheck(
+            user_id=user.id, time_period_id=index % 2 + 1, amount=amount,
+            date_received=None if index % 4 == 0 else date(2025, 2, index + 1),
+            currency=(None, 'GBP')[index % 2],
+        ))
+    db.session.commit()
+    return user.id
+
+def encodings(data):
+    """data as the API encodes it by default, with JSON_COMPACT, and with JSON_COMPACT without orjson."""
+    orjson, serializers.orjson = serializers.orjson, None
+    try:
+        fallback = dumps(data)
+    finally:
+        serializers.orjson = orjson
+    return json.dumps(data), dumps(data), fallback
+
+def assert_same(expected, actual):
+    expected, actual = encodings(expected), encodings(actual)
+    assert actual == expected
+    assert actual[1] == actual[2]
+
+@pytest.mark.parametrize('model, schema, serializer', [
+    (Expense, expenses_schema, expense_rows),
+    (Paycheck, paychecks_schema, paycheck_rows),
+    (TimePeriod, time_periods_schema, time_period_rows),
+])
+def test_row_serializers_match_the_schemas(user_id, model, schema, serializer):
+    instances = model.query.order_by(model.id).all()
+    rows = db.session.execute(select(*serializer.columns).order_by(model.__table__.c.id)).all()
+    assert len(rows) == len(instances) > 0
+    assert_same(schema.dump(instances), serializer.dump(rows))
+
+def test_time_periods_with_rows_match_the_schemas(user_id):
+    expected = time_periods_schema.dump(TimePeriod.query.order_by(TimePeriod.id).all())
+    for data in expected:
+        data['expenses'] = period_expenses_schema.dump(
+            Expense.query.filter_by(user_id=user_id, time_period_id=data['id']).order_by(Expense.id).all())
+        data['paychecks'] = period_paychecks_schema.dump(
+            Paycheck.query.filter_by(user_id=user_id, time_period_id=data['id']).order_by(Paycheck.id).all())
+    assert_same(expected, time_periods(user_id, ('expenses', 'paychecks')))
+
+def test_responses_keep_the_stdlib_encoding(app, client, register):
+    headers = register('ünïcode reader')
+    client.post('/api/time_periods', json={'type': 'monthly'}, headers=headers)
+    client.post('/api/time_periods/1/expenses', headers=headers, json={
+        'description': 'Café', 'amount': 12.5, 'due_date': '2025-01-01', 'category': '日本語'})
+
+    body = client.get('/api/expenses', headers=headers).get_data()
+    assert body == (json.dumps(json.loads(body)) + '\n').encode()
+    assert b'Caf\\u00e9' in body and b'", "' in body
+
+    app.config['JSON_COMPACT'] = True
+    body = client.get('/api/expenses', headers=headers).get_data()
+    assert body == dumps(json.loads(body))
+    assert 'Café'.encode() in body
@@ -0,0 +1,22 @@
+# server/tests/test_tokens.py
+# CachingJWTManager hooks a private flask-jwt-extended method; these fail
+# if a release stops calling it or moves the revocation check behind it.
+from flask_jwt_extended import JWTManager
+
+def test_repeat_requests_reuse_the_verified_claims(monkeypatch, client, register):
+    headers = register()
+    assert client.get('/api/user_data', headers=headers).status_code == 200
+
+    def decode(*args, **kwargs):
+        raise AssertionError('verified token decoded again')
+    monkeypatch.setattr(JWTManager, '_decode_jwt_from_config', decode)
+    assert client.get('/api/user_data', headers=headers).status_code == 200
+
+def test_revoked_tokens_are_rejected_from_the_cache(app, client, register):
+    headers = register()
+    token = headers['Authorization'].split()[1]
+    assert client.get('/api/user_data', headers=headers).status_code == 200
+
+    assert client.post('/api/auth/logout', headers=headers).status_code == 200
+    assert app.extensions['flask-jwt-extended'].verified.get(token) is not None
+    assert client.get('/api/user_data', headers=headers).status_code == 401
@@ -0,0 +1,58 @@
+# server/tests/test_user_data_queries.py
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import event, insert
+from sqlalchemy.engine import Engine
+
+from models import db, User, TimePeriod, Expense, Paycheck
+
+@contextmanager
+def count_queries():
+    """Count the statements run on any engine, the read and write ones alike."""
+    statements = []
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(Engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(Engine, 'before_cursor_execute', before_cursor_execute)
+
+def seed(user_id, periods, rows):
+    """Add time periods, and rows expenses and rows paychecks for the user spread over them."""
+    db.session.add_all(TimePeriod(type=f'period {index}') for index in range(periods))
+    db.session.flush()
+    period_ids = [period.id for period in TimePeriod.query.order_by(TimePeriod.id).all()[-periods:]]
+    start = date(2025, 1, 1)
+    db.session.execute(insert(Expense), [
+        {'user_id': user_id, 'time_period_id': period_ids[index % periods], 'description': f'Expense {index}',
+         'amount': '12.34', 'due_date': start + timedelta(days=index), 'is_recurring': False}
+        for index in range(rows)
+    ])
+    db.session.execute(insert(Paycheck), [
+        {'user_id': user_id, 'time_period_id': period_ids[index % periods], 'amount': '2500.00',
+         'date_received': start + timedelta(days=index)}
+        for index in range(rows)
+    ])
+    db.session.commit()
+
+def user_data_queries(client, headers):
+    with count_queries() as statements:
+        response = client.get('/api/user_data', headers=headers)
+    assert response.status_code == 200
+    return response.get_json(), len(statements)
+
+@pytest.mark.parametrize('periods, rows', [(1, 1), (25, 500)])
+def test_user_data_query_count_does_not_grow_with_data(client, register, periods, rows):
+    empty_headers = register('empty')
+    _, baseline = user_data_queries(client, empty_headers)
+
+    headers = register('busy')
+    seed(User.query.filter_by(username='busy').one().id, periods, rows)
+    data, count = user_data_queries(client, headers)
+
+    assert len(data['expenses']) == rows and len(data['paychecks']) == rows
+    assert len(data['time_periods']) == periods
+    assert count == baseline, f"{count} queries for {rows} rows, {baseline} for none"
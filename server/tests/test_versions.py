@@ -0,0 +1,10 @@
+# server/tests/test_versions.py
+from models import db, DataVersion
+from versions import bump_versions
+
+def test_bump_versions_creates_then_increments(app):
+    connection = db.session.connection()
+    assert bump_versions(connection, {'user:1', 'time_periods'}) == {'user:1': 1, 'time_periods': 1}
+    assert bump_versions(connection, {'user:1'}) == {'user:1': 2}
+    db.session.commit()
+    assert db.session.get(DataVersion, 'user:1').version == 2
@@ -0,0 +1,125 @@
+# server/throttle.py
+import math
+import threading
+import time
+from collections import OrderedDict
+
+class MemoryCounters:
+    """Fixed-window counters in an in-process LRU.
+
+    The LRU bound keeps a flood of distinct usernames from growing memory
+    without limit; evicting a counter only forgets some failures early.
+    """
+    def __init__(self, max_keys=100_000):
+        self.max_keys = max_keys
+        self.counters = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """(count, seconds left in the window) for key."""
+        with self.lock:
+            entry = self.counters.get(key)
+            if entry is None:
+                return 0, 0
+            count, expires_at = entry
+            remaining = expires_at - time.monotonic()
+            if remaining <= 0:
+                del self.counters[key]
+                return 0, 0
+            return count, remaining
+
+    def incr(self, key, window):
+        with self.lock:
+            now = time.monotonic()
+            count, expires_at = self.counters.get(key, (0, 0))
+            if expires_at <= now:
+                count, expires_at = 0, now + window
+            self.counters[key] = (count + 1, expires_at)
+            self.counters.move_to_end(key)
+            while len(self.counters) > self.max_keys:
+                self.counters.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.counters.pop(key, None)
+
+class RedisCounters:
+    """Fixed-window counters in Redis, shared by every worker process."""
+    def __init__(self, client, prefix='paycheck-buddy:login:'):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        pipe = self.client.pipeline()
+        pipe.get(self.prefix + key)
+        pipe.ttl(self.prefix + key)
+        count, ttl = pipe.execute()
+        return int(count or 0), max(ttl, 0)
+
+    def incr(self, key, window):
+        pipe = self.client.pipeline()
+        pipe.incr(self.prefix + key)
+        pipe.expire(self.prefix + key, window, nx=True)
+        pipe.execute()
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+class LoginThrottle:
+    """Failed login counters per username and client address, per username and per address.
+
+    Checked before the user is loaded or any hash is computed, so a
+    brute-force burst costs one counter lookup per key. Each key allows its
+    limit of failures per LOGIN_FAILURE_WINDOW seconds, counted from the
+    first failure; a successful login clears its (username, address) counter.
+
+    The strict limit is on the (username, address) pair, so failures from one
+    address cannot lock the account's owner out everywhere else. The limit per
+    username alone is looser than the one per address, so it only stops
+    guessing spread over many addresses.
+    """
+    def __init__(self, app=None):
+        self.counters = MemoryCounters()
+        self.max_failures = 5
+        self.max_failures_per_user = 200
+        self.max_failures_per_address = 50
+        self.window = 900
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        backend = app.config.get('LOGIN_THROTTLE_BACKEND', 'memory')
+        if backend == 'redis':
+            import redis
+            self.counters = RedisCounters(redis.Redis.from_url(app.config['CACHE_REDIS_URL']))
+        else:
+            self.counters = MemoryCounters(app.config.get('LOGIN_THROTTLE_MAX_KEYS', 100_000))
+        self.max_failures = app.config.get('LOGIN_MAX_FAILURES', 5)
+        self.max_failures_per_user = app.config.get('LOGIN_MAX_FAILURES_PER_USER', 200)
+        self.max_failures_per_address = app.config.get('LOGIN_MAX_FAILURES_PER_ADDRESS', 50)
+        self.window = app.config.get('LOGIN_FAILURE_WINDOW', 900)
+        app.extensions['login_throttle'] = self
+
+    @staticmethod
+    def _keys(username, address):
+        username = username.lower()
+        return f'pair:{address}:{username}', f'user:{username}', f'addr:{address}'
+
+    def retry_after(self, username, address):
+        """Seconds until another attempt is allowed, or 0 if it is allowed now."""
+        wait = 0
+        limits = (self.max_failures, self.max_failures_per_user, self.max_failures_per_address)
+        for key, limit in zip(self._keys(username, address), limits):
+            count, remaining = self.counters.get(key)
+            if count >= limit:
+                wait = max(wait, math.ceil(remaining), 1)
+        return wait
+
+    def failed(self, username, address):
+        for key in self._keys(username, address):
+            self.counters.incr(key, self.window)
+
+    def succeeded(self, username, address):
+        self.counters.delete(self._keys(username, address)[0])
+
+login_throttle = LoginThrottle()
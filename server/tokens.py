@@ -0,0 +1,161 @@
+# server/tokens.py
+import heapq
+import threading
+import time
+
+from flask_jwt_extended import JWTManager
+
+from cache import MemoryBackend
+
+class MemoryStore:
+    """In-process key/value entries with TTL eviction.
+
+    Lookups are a dict probe. Expiry times also go on a heap, so each write
+    evicts whatever has expired in O(log n) without scanning the table.
+    """
+    # Whether calls wait on the network (see asgi.off_loop)
+    blocking = False
+
+    def __init__(self):
+        self.entries = {}
+        self.expiries = []
+        self.lock = threading.Lock()
+
+    def _evict(self, now):
+        while self.expiries and self.expiries[0][0] <= now:
+            expires_at, key = heapq.heappop(self.expiries)
+            entry = self.entries.get(key)
+            if entry is not None and entry[1] == expires_at:
+                del self.entries[key]
+
+    def set(self, key, value, ttl):
+        with self.lock:
+            now = time.time()
+            self._evict(now)
+            expires_at = now + ttl
+            self.entries[key] = (value, expires_at)
+            heapq.heappush(self.expiries, (expires_at, key))
+
+    def get_many(self, keys):
+        now = time.time()
+        values = []
+        for key in keys:
+            entry = self.entries.get(key)
+            values.append(entry[0] if entry is not None and entry[1] > now else None)
+        return values
+
+    def __len__(self):
+        return len(self.entries)
+
+class RedisStore:
+    """Entries in Redis, shared by every worker process; one round trip per check."""
+    blocking = True
+
+    def __init__(self, client, prefix='paycheck-buddy:revoked:'):
+        self.client = client
+        self.prefix = prefix
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, value, ex=max(1, int(ttl)))
+
+    def get_many(self, keys):
+        values = self.client.mget([self.prefix + key for key in keys])
+        return [value.decode() if isinstance(value, bytes) else value for value in values]
+
+class TokenDenylist:
+    """Revoked JWTs, checked on every authenticated request.
+
+    A token is revoked when its jti is listed, or when it was issued before
+    its user's "revoke everything" cutoff. Both are keyed lookups on claims
+    Flask-JWT-Extended has already decoded, so the check never touches the
+    database. Entries live only as long as the tokens they revoke could still
+    be accepted. DENYLIST_BACKEND 'redis' (CACHE_REDIS_URL) shares them
+    between processes; production requires it, and gunicorn.conf.py will not
+    start more than one worker without it.
+    """
+    def __init__(self, app=None):
+        self.store = MemoryStore()
+        self.max_token_lifetime = 30 * 24 * 3600
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        backend = app.config.get('DENYLIST_BACKEND', 'memory')
+        if backend == 'redis':
+            import redis
+            self.store = RedisStore(redis.Redis.from_url(app.config['CACHE_REDIS_URL']))
+        else:
+            self.store = MemoryStore()
+        # How long a per-user cutoff must outlive the tokens it revokes
+        lifetimes = [app.config.get(key) for key in ('JWT_ACCESS_TOKEN_EXPIRES', 'JWT_REFRESH_TOKEN_EXPIRES')]
+        lifetimes = [int(lifetime.total_seconds()) for lifetime in lifetimes if lifetime]
+        if lifetimes:
+            self.max_token_lifetime = max(lifetimes)
+        app.extensions['token_denylist'] = self
+
+    def _ttl(self, claims):
+        if 'exp' not in claims:
+            return self.max_token_lifetime
+        return claims['exp'] - time.time()
+
+    def revoke(self, claims):
+        """Revoke one decoded token until it would have expired anyway."""
+        ttl = self._ttl(claims)
+        if ttl > 0:
+            self.store.set(f"jti:{claims['jti']}", '1', ttl)
+
+    def revoke_user(self, user_id):
+        """Revoke every token issued to a user up to now."""
+        self.store.set(f'user:{user_id}', repr(time.time()), self.max_token_lifetime)
+
+    def is_revoked(self, claims):
+        revoked, cutoff = self.store.get_many((f"jti:{claims['jti']}", f"user:{claims['sub']}"))
+        # iat has whole-second resolution, so tokens from the cutoff's own second are revoked too
+        return revoked is not None or (cutoff is not None and claims.get('iat', 0) <= float(cutoff))
+
+    def blocklist_loader(self, jwt_header, jwt_payload):
+        """Callback for JWTManager.token_in_blocklist_loader."""
+        return self.is_revoked(jwt_payload)
+
+class CachingJWTManager(JWTManager):
+    """JWTManager that remembers the claims of tokens it has already verified.
+
+    Flask-JWT-Extended keeps the decoded claims for the rest of a request, but
+    decodes and verifies the same bearer token again on every request, which
+    costs far more than the rest of authentication. Verified claims are kept
+    in an LRU keyed by the encoded token (signature included) until the token
+    expires, so repeat requests skip decoding. Anything unusual (CSRF checks,
+    expired tokens, cache misses) goes through the normal path. Revocation is
+    still checked on every request.
+
+    The library has no public hook around decoding, so this overrides the
+    private _decode_jwt_from_config that decode_token and the view decorators
+    call. The Pipfile pins flask-jwt-extended to the release this was written
+    against, and init_app refuses to start if the method has gone.
+    """
+    def __init__(self, app=None, add_context_processor=False):
+        self.verified = None
+        super().__init__(app, add_context_processor)
+
+    def init_app(self, app, add_context_processor=False):
+        if not callable(getattr(JWTManager, '_decode_jwt_from_config', None)):
+            raise RuntimeError('flask-jwt-extended no longer has JWTManager._decode_jwt_from_config; '
+                               'CachingJWTManager needs updating for this release')
+        super().init_app(app, add_context_processor)
+        size = app.config.get('JWT_DECODE_CACHE_SIZE', 4096)
+        self.verified = MemoryBackend(size) if size else None
+
+    def _decode_jwt_from_config(self, encoded_token, csrf_value=None, allow_expired=False):
+        cacheable = self.verified is not None and csrf_value is None
+        if cacheable:
+            claims = self.verified.get(encoded_token)
+            if claims is not None:
+                return dict(claims)
+        claims = super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+        if cacheable and 'exp' in claims:
+            ttl = claims['exp'] - time.time()
+            if ttl > 0:
+                self.verified.set(encoded_token, dict(claims), ttl)
+        return claims
+
+token_denylist = TokenDenylist()
@@ -0,0 +1,210 @@
+# server/versions.py
+import hashlib
+from datetime import datetime
+from functools import wraps
+
+from flask import Response, g, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import event, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from models import db, TimePeriod, Expense, Paycheck, DataVersion, DeletedRecord
+
+TIME_PERIODS_KEY = 'time_periods'
+EXCHANGE_RATES_KEY = 'exchange_rates'
+
+# Let browsers keep responses but always revalidate them with If-None-Match
+CACHE_CONTROL = 'private, no-cache'
+
+def user_key(user_id):
+    return f'user:{int(user_id)}'
+
+# Tombstone record_type for each tracked model
+RECORD_TYPES = {Expense: 'expense', Paycheck: 'paycheck'}
+
+# INSERT ... ON CONFLICT DO UPDATE, for the backends that have it
+UPSERTS = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}
+
+def bump_versions(connection, keys):
+    """Increment the version counters for keys, creating missing rows.
+    
+    Returns the new version for each key. Each bump is a single upsert, so
+    two first writes for a new key cannot both try to create its row; the row
+    lock it takes is held until commit, so writes for the same key are
+    numbered in commit order. Other backends update, then insert on a miss.
+    """
+    table = DataVersion.__table__
+    upsert = UPSERTS.get(connection.dialect.name)
+    versions = {}
+    for key in sorted(keys):
+        if upsert is not None:
+            statement = upsert(table).values(key=key, version=1).on_conflict_do_update(
+                index_elements=[table.c.key], set_={'version': table.c.version + 1}
+            ).returning(table.c.version)
+            versions[key] = connection.execute(statement).scalar_one()
+            continue
+        result = connection.execute(
+            table.update().where(table.c.key == key).values(version=table.c.version + 1)
+        )
+        if result.rowcount == 0:
+            connection.execute(table.insert().values(key=key, version=1))
+        versions[key] = connection.execute(
+            table.select().with_only_columns(table.c.version).where(table.c.key == key)
+        ).scalar()
+    return versions
+
+def bump_user_versions(connection, user_ids):
+    """Bump the given users' versions and return {user_id: new version}."""
+    versions = bump_versions(connection, {user_key(user_id) for user_id in user_ids})
+    return {int(user_id): versions[user_key(user_id)] for user_id in user_ids}
+
+def tombstones(model, rows, change_seq):
+    """Tombstone mappings for deleted rows, for bulk deletes that bypass the flush."""
+    return [
+        {
+            'user_id': row['user_id'],
+            'record_type': RECORD_TYPES[model],
+            'record_id': row['id'],
+            'change_seq': change_seq,
+            'deleted_at': datetime.utcnow()
+        }
+        for row in rows
+    ]
+
+@event.listens_for(Session, 'before_flush')
+def stamp_changes(session, flush_context, instances):
+    # Same transaction as the write, so a version is never ahead of the data
+    changed = []
+    deleted = []
+    keys = set()
+    for obj in (*session.new, *session.dirty):
+        if isinstance(obj, (Expense, Paycheck)):
+            if obj in session.dirty and not session.is_modified(obj):
+                continue
+            changed.append(obj)
+            keys.add(user_key(obj.user_id))
+        elif isinstance(obj, TimePeriod):
+            keys.add(TIME_PERIODS_KEY)
+    for obj in session.deleted:
+        if isinstance(obj, (Expense, Paycheck)):
+            deleted.append(obj)
+            keys.add(user_key(obj.user_id))
+        elif isinstance(obj, TimePeriod):
+            keys.add(TIME_PERIODS_KEY)
+    if not keys:
+        return
+    
+    versions = bump_versions(session.connection(), keys)
+    
+    # Stamp rows with the user's new version, which is their sync cursor
+    for obj in changed:
+        obj.change_seq = versions[user_key(obj.user_id)]
+    for obj in deleted:
+        session.add(DeletedRecord(
+            user_id=obj.user_id,
+            record_type=RECORD_TYPES[type(obj)],
+            record_id=obj.id,
+            change_seq=versions[user_key(obj.user_id)]
+        ))
+
+def versions_statement(user_id):
+    """SELECT of the version rows current_versions reads, for callers with their own connection."""
+    columns = DataVersion.__table__.c
+    return select(columns.key, columns.version).where(
+        columns.key.in_((user_key(user_id), TIME_PERIODS_KEY, EXCHANGE_RATES_KEY))
+    )
+
+def versions_from_rows(user_id, rows):
+    """(user, time period, exchange rate) versions from the rows of versions_statement."""
+    versions = dict(rows)
+    return tuple(versions.get(key, 0) for key in (user_key(user_id), TIME_PERIODS_KEY, EXCHANGE_RATES_KEY))
+
+def current_versions(user_id):
+    """The caller's data version, the time period version and the exchange rate version.
+    
+    All three come from one primary key lookup.
+    """
+    return versions_from_rows(user_id, db.session.execute(versions_statement(user_id)).all())
+
+def etag_for(full_path, user_id, versions):
+    """Strong ETag for a request URL and the versions returned by current_versions."""
+    user_version, time_periods_version, rates_version = versions
+    digest = hashlib.sha1(
+        f'{full_path}|{user_id}|{user_version}|{time_periods_version}|{rates_version}'.encode()
+    ).hexdigest()
+    return digest[:32]
+
+def versions_by_key(user_id, versions):
+    """current_versions' tuple as {data_versions key: version}."""
+    user_version, time_periods_version, rates_version = versions
+    return {user_key(user_id): user_version, TIME_PERIODS_KEY: time_periods_version,
+            EXCHANGE_RATES_KEY: rates_version}
+
+def remember_versions(user_id, versions):
+    """Keep the versions read for this request, for request_versions."""
+    g.data_versions = versions_by_key(user_id, versions)
+
+def request_versions():
+    """The caller's versions by key, as conditional_get read them, or read now."""
+    versions = g.get('data_versions')
+    if versions is None:
+        user_id = get_jwt_identity()
+        remember_versions(user_id, current_versions(user_id))
+        versions = g.data_versions
+    return versions
+
+def make_etag(user_id):
+    """Strong ETag for the current request URL and the versions it depends on."""
+    versions = current_versions(user_id)
+    remember_versions(user_id, versions)
+    return etag_for(request.full_path, user_id, versions)
+
+def etag_matches(etag):
+    """Whether If-None-Match lists etag.
+    
+    Compared weakly, as RFC 9110 asks, so the weak tag sent with a compressed
+    body (see compression.py) matches as well.
+    """
+    return request.if_none_match.contains_weak(etag)
+
+def not_modified(etag):
+    """The 304 response for a matching If-None-Match."""
+    response = Response(status=304)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    return response
+
+def tag_result(result, etag):
+    """Add the ETag and Cache-Control headers to a 200 resource result.
+    
+    A response that already carries a Content-Encoding, like the gzipped
+    export, gets a weak tag, since its bytes differ from the identity body's.
+    """
+    if isinstance(result, Response):
+        if result.status_code == 200:
+            result.set_etag(etag, weak='Content-Encoding' in result.headers)
+            result.headers['Cache-Control'] = CACHE_CONTROL
+        return result
+    
+    if not isinstance(result, tuple):
+        result = (result, 200)
+    data, status = result[0], result[1]
+    headers = dict(result[2]) if len(result) > 2 else {}
+    if status == 200:
+        headers['ETag'] = f'"{etag}"'
+        headers['Cache-Control'] = CACHE_CONTROL
+    return data, status, headers
+
+def conditional_get(fn):
+    """Answer If-None-Match with 304 before the handler runs, and tag 200 responses.
+    
+    Must be applied inside @jwt_required() so the caller's identity is known.
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        etag = make_etag(get_jwt_identity())
+        if etag_matches(etag):
+            return not_modified(etag)
+        return tag_result(fn(*args, **kwargs), etag)
+    return wrapper
@@ -0,0 +1,26 @@
+# server/wsgi.py
+# Production entry point, with APP_ENV=production:
+#
+#   gunicorn -c gunicorn.conf.py wsgi:app
+from app import app
+from models import db
+from engines import READ_ENGINE_EXTENSION
+from passwords import password_hasher
+
+def release_connections(close=True):
+    """Drop this process's pooled database connections.
+
+    With close=False the connections are only forgotten, which is what a
+    freshly forked worker must do with sockets it shares with its parent.
+    """
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose(close=close)
+    read_engine = app.extensions.get(READ_ENGINE_EXTENSION)
+    if read_engine is not None:
+        read_engine.dispose(close=close)
+
+def shutdown():
+    """Release the worker's database connections and hashing processes once requests have drained."""
+    release_connections()
+    password_hasher.shutdown()
@@ -93,8 +93,8 @@ export const AuthProvider = ({ children }) => {
     }
   };
   
-  // Logout function
-  const logout = () => {
+  // Forget the session locally
+  const clearSession = () => {
     localStorage.removeItem('token');
     localStorage.removeItem('user');
     
@@ -105,6 +105,20 @@ export const AuthProvider = ({ children }) => {
     setIsAuthenticated(false);
   };
   
+  // Logout function
+  const logout = () => {
+    const token = localStorage.getItem('token');
+    
+    // Revoke the token server side; the local session ends either way
+    if (token) {
+      axios.post('/api/auth/logout', null, {
+        headers: { Authorization: `Bearer ${token}` }
+      }).catch(() => {});
+    }
+    
+    clearSession();
+  };
+  
   // Refresh token function
   const refreshToken = async () => {
     try {
@@ -118,7 +132,7 @@ export const AuthProvider = ({ children }) => {
       
       return true;
     } catch (err) {
-      logout();
+      clearSession();
       return false;
     }
   };
@@ -2,6 +2,7 @@
 import React, { createContext, useState, useContext, useEffect, useCallback, useMemo } from 'react';
 import axios from 'axios';
 import { AuthContext } from './AuthContext';
+import { sumAmounts, subtractAmounts } from '../utils/money';
 
 export const DataContext = createContext();
 
@@ -166,13 +167,13 @@ export const DataProvider = ({ children }) => {
     const periodExpenses = getExpensesByTimePeriod(timePeriodId);
     const periodPaychecks = getPaychecksByTimePeriod(timePeriodId);
 
-    const totalExpenses = periodExpenses.reduce((total, expense) => total + expense.amount, 0);
-    const totalIncome = periodPaychecks.reduce((total, paycheck) => total + paycheck.amount, 0);
+    const totalExpenses = sumAmounts(periodExpenses);
+    const totalIncome = sumAmounts(periodPaychecks);
 
     return {
       income: totalIncome,
       expenses: totalExpenses,
-      balance: totalIncome - totalExpenses
+      balance: subtractAmounts(totalIncome, totalExpenses)
     };
   }, [getExpensesByTimePeriod, getPaychecksByTimePeriod]);
 
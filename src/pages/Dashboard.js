@@ -2,6 +2,7 @@ import React, { useContext, useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
 import { DataContext } from '../context/DataContext';
 import { AuthContext } from '../context/AuthContext';
+import { sumAmounts, subtractAmounts } from '../utils/money';
 import { Bar } from 'react-chartjs-2';
 import { 
   Chart as ChartJS, 
@@ -114,9 +115,9 @@ const Dashboard = () => {
   };
   
   // Calculate overall summary
-  const totalIncome = paychecks.reduce((sum, paycheck) => sum + paycheck.amount, 0);
-  const totalExpenses = expenses.reduce((sum, expense) => sum + expense.amount, 0);
-  const overallBalance = totalIncome - totalExpenses;
+  const totalIncome = sumAmounts(paychecks);
+  const totalExpenses = sumAmounts(expenses);
+  const overallBalance = subtractAmounts(totalIncome, totalExpenses);
   
   // Get unique time period types for filter buttons
   const uniqueTimeFrames = [...new Set(timePeriods.map(period => period.type))].filter(Boolean);
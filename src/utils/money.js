@@ -0,0 +1,12 @@
+// src/utils/money.js
+
+// Amounts arrive as exact two-decimal numbers; summing them as floats drifts,
+// so totals are accumulated in integer cents and converted back once.
+export const toCents = (amount) => Math.round(Number(amount) * 100);
+
+export const fromCents = (cents) => cents / 100;
+
+export const sumAmounts = (items) =>
+  fromCents(items.reduce((total, item) => total + toCents(item.amount), 0));
+
+export const subtractAmounts = (a, b) => fromCents(toCents(a) - toCents(b));